@@ -155,6 +155,30 @@ class ABM2McpBridge {
                     properties: {}
                 }
             },
+            {
+                name: 'abm2_run_simulation',
+                description: 'Run N simulation steps in one call and return the final state (skips intermediate reports)',
+                inputSchema: {
+                    type: 'object',
+                    properties: {
+                        steps: {
+                            type: 'number',
+                            description: 'Number of steps to run'
+                        },
+                        history_every: {
+                            type: 'number',
+                            description: 'Store every n-th step in the history (0 = final step only)',
+                            default: 0
+                        },
+                        broadcast_every: {
+                            type: 'number',
+                            description: 'Broadcast every n-th step over the WebSocket (0 = final step only)',
+                            default: 0
+                        }
+                    },
+                    required: ['steps']
+                }
+            },
             {
                 name: 'abm2_get_simulation_data',
                 description: 'Get current simulation state without advancing (includes all metrics, agents, biomes)',
@@ -662,6 +686,48 @@ class ABM2McpBridge {
                     required: ['experiment_id']
                 }
             },
+            {
+                name: 'abm2_submit_experiment_job',
+                description: 'Run an experiment as a background job; returns a job ID immediately (no request timeout)',
+                inputSchema: {
+                    type: 'object',
+                    properties: {
+                        experiment_id: {
+                            type: 'string',
+                            description: 'Experiment UUID'
+                        }
+                    },
+                    required: ['experiment_id']
+                }
+            },
+            {
+                name: 'abm2_get_experiment_job',
+                description: 'Get progress of an experiment job (runs per treatment, ETA, steps/sec)',
+                inputSchema: {
+                    type: 'object',
+                    properties: {
+                        job_id: {
+                            type: 'string',
+                            description: 'Job UUID'
+                        }
+                    },
+                    required: ['job_id']
+                }
+            },
+            {
+                name: 'abm2_cancel_experiment_job',
+                description: 'Cancel a queued or running experiment job',
+                inputSchema: {
+                    type: 'object',
+                    properties: {
+                        job_id: {
+                            type: 'string',
+                            description: 'Job UUID'
+                        }
+                    },
+                    required: ['job_id']
+                }
+            },
             {
                 name: 'abm2_get_experiment_results',
                 description: 'Get complete results of a completed experiment with statistical tests',
@@ -803,6 +869,12 @@ class ABM2McpBridge {
                     result = await makeHttpRequest('/api/simulation/step', 'POST', null, true);
                     break;
 
+                case 'abm2_run_simulation':
+                    result = await makeHttpRequest(
+                        `/api/simulation/run?steps=${args.steps}&history_every=${args.history_every || 0}&broadcast_every=${args.broadcast_every || 0}`,
+                        'POST', null, true);
+                    break;
+
                 case 'abm2_get_simulation_data':
                     result = await makeHttpRequest('/api/simulation/data', 'GET');
                     break;
@@ -977,6 +1049,18 @@ class ABM2McpBridge {
                     result = await makeHttpRequest(`/api/experiments/${args.experiment_id}/run`, 'POST', null, true);
                     break;
 
+                case 'abm2_submit_experiment_job':
+                    result = await makeHttpRequest(`/api/experiments/${args.experiment_id}/jobs`, 'POST', null, true);
+                    break;
+
+                case 'abm2_get_experiment_job':
+                    result = await makeHttpRequest(`/api/experiment-jobs/${args.job_id}`, 'GET');
+                    break;
+
+                case 'abm2_cancel_experiment_job':
+                    result = await makeHttpRequest(`/api/experiment-jobs/${args.job_id}/cancel`, 'POST', null, true);
+                    break;
+
                 case 'abm2_get_experiment_results':
                     result = await makeHttpRequest(`/api/experiments/${args.experiment_id}/results`, 'GET');
                     break;
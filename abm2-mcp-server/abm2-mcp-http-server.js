@@ -176,6 +176,19 @@ const MCP_TOOLS = [
         description: 'Advance simulation by one step',
         inputSchema: { type: 'object', properties: {} }
     },
+    {
+        name: 'abm2_run_simulation',
+        description: 'Run N steps in one call and return the final state',
+        inputSchema: {
+            type: 'object',
+            properties: {
+                steps: { type: 'number', description: 'Number of steps to run' },
+                history_every: { type: 'number', default: 0, description: 'Store every n-th step in the history (0 = final step only)' },
+                broadcast_every: { type: 'number', default: 0, description: 'Broadcast every n-th step over the WebSocket (0 = final step only)' }
+            },
+            required: ['steps']
+        }
+    },
     {
         name: 'abm2_get_simulation_data',
         description: 'Get current simulation state',
@@ -240,6 +253,14 @@ const MCP_TOOLS = [
                     type: 'array',
                     items: { type: 'string' },
                     description: 'Aggregations to compute: "count", "mean_<field>", "sum_<field>", "std_<field>", "min_<field>", "max_<field>", "distribution_<field>", "percentile_<N>_<field>"'
+                },
+                group_by: {
+                    type: 'string',
+                    description: 'Compute the aggregations per value of this field (e.g. "region", "milieu")'
+                },
+                order_by: {
+                    type: 'string',
+                    description: 'Return the top agents sorted by this field, "-<field>" for descending (e.g. "-vermoegen" for the richest)'
                 }
             }
         }
@@ -324,7 +345,8 @@ const MCP_TOOLS = [
                         }
                     }
                 },
-                target_steps: { type: 'number', description: 'Number of simulation steps', default: 100 }
+                target_steps: { type: 'number', description: 'Number of simulation steps', default: 100 },
+                seed: { type: 'number', description: 'Experiment seed for reproducible runs (default: derived from baseline_config, treatments and target_steps, so identical definitions reuse cached runs)' }
             },
             required: ['name', 'description', 'baseline_config', 'treatments']
         }
@@ -367,6 +389,39 @@ const MCP_TOOLS = [
             required: ['experiment_id']
         }
     },
+    {
+        name: 'abm2_submit_experiment_job',
+        description: 'Run an experiment as a background job; returns a job ID immediately',
+        inputSchema: {
+            type: 'object',
+            properties: {
+                experiment_id: { type: 'string', description: 'Experiment UUID' }
+            },
+            required: ['experiment_id']
+        }
+    },
+    {
+        name: 'abm2_get_experiment_job',
+        description: 'Get progress of an experiment job (runs per treatment, ETA, steps/sec)',
+        inputSchema: {
+            type: 'object',
+            properties: {
+                job_id: { type: 'string', description: 'Job UUID' }
+            },
+            required: ['job_id']
+        }
+    },
+    {
+        name: 'abm2_cancel_experiment_job',
+        description: 'Cancel a queued or running experiment job',
+        inputSchema: {
+            type: 'object',
+            properties: {
+                job_id: { type: 'string', description: 'Job UUID' }
+            },
+            required: ['job_id']
+        }
+    },
     {
         name: 'abm2_compare_treatments',
         description: 'Get statistical comparison between treatments for a specific metric',
@@ -450,6 +505,15 @@ async function handleToolCall(toolName, args, requestId = null) {
                 );
                 break;
 
+            case 'abm2_run_simulation': {
+                const query = `steps=${args.steps}&history_every=${args.history_every || 0}&broadcast_every=${args.broadcast_every || 0}`;
+                result = await retryWithBackoff(
+                    () => makeHttpRequest(`/api/simulation/run?${query}`, 'POST', null, true, requestId),
+                    getRetryOptions('write')
+                );
+                break;
+            }
+
             case 'abm2_get_simulation_data':
                 result = await retryWithBackoff(
                     () => makeHttpRequest('/api/simulation/data', 'GET', null, false, requestId),
@@ -507,7 +571,9 @@ async function handleToolCall(toolName, args, requestId = null) {
                             filters: args.filters || null,
                             fields: args.fields || null,
                             limit: args.limit || 100,
-                            aggregations: args.aggregations || null
+                            aggregations: args.aggregations || null,
+                            group_by: args.group_by || null,
+                            order_by: args.order_by || null
                         }), true, requestId),
                     getRetryOptions('read')
                 );
@@ -565,7 +631,8 @@ async function handleToolCall(toolName, args, requestId = null) {
                             description: args.description,
                             baseline_config: args.baseline_config,
                             treatments: args.treatments,
-                            target_steps: args.target_steps || 100
+                            target_steps: args.target_steps || 100,
+                            seed: args.seed ?? null
                         }), true, requestId),
                     getRetryOptions('write')
                 );
@@ -609,6 +676,36 @@ async function handleToolCall(toolName, args, requestId = null) {
                 );
                 break;
 
+            case 'abm2_submit_experiment_job':
+                if (!args.experiment_id) {
+                    throw new Error('experiment_id is required');
+                }
+                result = await retryWithBackoff(
+                    () => makeHttpRequest(`/api/experiments/${args.experiment_id}/jobs`, 'POST', null, true, requestId),
+                    getRetryOptions('write')
+                );
+                break;
+
+            case 'abm2_get_experiment_job':
+                if (!args.job_id) {
+                    throw new Error('job_id is required');
+                }
+                result = await retryWithBackoff(
+                    () => makeHttpRequest(`/api/experiment-jobs/${args.job_id}`, 'GET', null, false, requestId),
+                    getRetryOptions('read')
+                );
+                break;
+
+            case 'abm2_cancel_experiment_job':
+                if (!args.job_id) {
+                    throw new Error('job_id is required');
+                }
+                result = await retryWithBackoff(
+                    () => makeHttpRequest(`/api/experiment-jobs/${args.job_id}/cancel`, 'POST', null, true, requestId),
+                    getRetryOptions('write')
+                );
+                break;
+
             case 'abm2_compare_treatments':
                 if (!args.experiment_id) {
                     throw new Error('experiment_id is required');
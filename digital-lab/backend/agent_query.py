@@ -0,0 +1,307 @@
+"""
+Vectorized agent query engine behind /api/agents/query.
+
+Queries run directly on the AgentStore columns:
+- filters compile into one boolean mask (range, in-list and exact conditions;
+  categorical fields are matched on their int codes),
+- all aggregations are evaluated in one grouped pass over the matching rows:
+  every referenced column is gathered once, sums and counts are bincounts over the
+  group codes, and min/max/percentile share one (group, value) sort per field,
+- `order_by` ("field" ascending, "-field" descending) selects the top `limit` rows
+  with a partial sort instead of sorting the whole population.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from political_abm.agent_store import CATEGORICAL_FIELDS, FLOAT_FIELDS, INT_FIELDS
+
+NUMERIC_FIELDS = FLOAT_FIELDS + INT_FIELDS
+DEFAULT_FIELDS = ('id', 'vermoegen', 'einkommen', 'region', 'milieu', 'political_position')
+AGGREGATION_OPS = ('mean', 'sum', 'std', 'min', 'max', 'distribution')
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+class QueryError(ValueError):
+    """Invalid query (unknown field, malformed aggregation, filter value of the wrong type)."""
+
+
+def parse_aggregation(name: str) -> Tuple[str, Optional[str], Optional[float]]:
+    """Splits an aggregation name into (op, field, percentile), e.g. "percentile_90_vermoegen"."""
+    if name == 'count':
+        return 'count', None, None
+    if name.startswith('percentile_'):
+        parts = name.split('_')
+        if len(parts) < 3:
+            raise QueryError(f"Invalid aggregation '{name}'. Expected percentile_<N>_<field>.")
+        try:
+            percentile = float(parts[1])
+        except ValueError:
+            raise QueryError(f"Invalid percentile in aggregation '{name}'.")
+        if not 0 <= percentile <= 100:
+            raise QueryError(f"Percentile in aggregation '{name}' must be between 0 and 100.")
+        return 'percentile', '_'.join(parts[2:]), percentile
+    op, _, field = name.partition('_')
+    if op not in AGGREGATION_OPS or not field:
+        raise QueryError(
+            f"Unknown aggregation '{name}'. Expected count, <op>_<field> with op in "
+            f"{AGGREGATION_OPS} or percentile_<N>_<field>."
+        )
+    return op, field, None
+
+
+class AgentQueryEngine:
+    """Evaluates agent queries on a model's AgentStore (call under the manager lock)."""
+
+    def __init__(self, model):
+        self.model = model
+        self.store = model.agent_store
+        self._ids: Optional[np.ndarray] = None
+
+    # --- Columns ---
+    def _ids_column(self) -> np.ndarray:
+        if self._ids is None:
+            self._ids = np.array([a.unique_id for a in self.model.agent_set])
+        return self._ids
+
+    def _is_numeric(self, field: str) -> bool:
+        return field in NUMERIC_FIELDS or field == 'id'
+
+    def _column(self, field: str) -> np.ndarray:
+        """Numeric column, or category codes for categorical fields."""
+        if field in NUMERIC_FIELDS:
+            return self.store.column(field)
+        if field in CATEGORICAL_FIELDS:
+            return self.store.codes[field]
+        if field == 'id':
+            return self._ids_column()
+        raise QueryError(f"Unknown agent field '{field}'.")
+
+    def _codes_for(self, field: str, labels: Sequence[Any]) -> np.ndarray:
+        index = {label: code for code, label in enumerate(self.store.categories[field])}
+        return np.array([index[label] for label in labels if label in index], dtype=np.int32)
+
+    # --- Filters ---
+    def mask(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Boolean mask of the agents matching all filter conditions."""
+        mask = np.ones(len(self.store), dtype=bool)
+        for field, condition in (filters or {}).items():
+            column = self._column(field)
+            categorical = field in CATEGORICAL_FIELDS
+            if isinstance(condition, dict):
+                # Range filter: {"min": 50000, "max": 100000} (inclusive)
+                values = self._labels(field) if categorical else column
+                for bound in ('min', 'max'):
+                    if bound not in condition:
+                        continue
+                    limit = condition[bound]
+                    if not (isinstance(limit, str) if categorical else _is_number(limit)):
+                        expected = 'a string' if categorical else 'a number'
+                        raise QueryError(f"Filter '{field}': {bound} must be {expected}, got {limit!r}.")
+                    mask &= (values >= limit) if bound == 'min' else (values <= limit)
+            elif isinstance(condition, list):
+                # In-list filter: ["Rechts-Konservativ", "Links-Liberal"]; values of
+                # another type than the field can never match
+                if categorical:
+                    wanted = self._codes_for(field, [v for v in condition if isinstance(v, str)])
+                else:
+                    wanted = np.array([v for v in condition if _is_number(v)], dtype=float)
+                mask &= np.isin(column, wanted)
+            elif categorical:
+                code = self._codes_for(field, [condition] if isinstance(condition, str) else [])
+                mask &= (column == code[0]) if len(code) else False
+            else:
+                mask &= (column == condition) if _is_number(condition) else False
+        return mask
+
+    def _labels(self, field: str) -> np.ndarray:
+        return np.array(self.store.categories[field], dtype=object)[self.store.codes[field]]
+
+    # --- Aggregations ---
+    def _groups(self, rows: np.ndarray, group_by: Optional[str]) -> Tuple[np.ndarray, List[Any]]:
+        """Dense group index per selected row and the label of every group."""
+        if group_by is None:
+            return np.zeros(len(rows), dtype=np.intp), ['all']
+        column = self._column(group_by)[rows]
+        keys, inverse = np.unique(column, return_inverse=True)
+        if group_by in CATEGORICAL_FIELDS:
+            labels = [self.store.categories[group_by][code] for code in keys.tolist()]
+        else:
+            labels = keys.tolist()
+        return inverse.astype(np.intp), labels
+
+    def aggregate(self, rows: np.ndarray, aggregations: Sequence[str],
+                  group_by: Optional[str] = None) -> Dict[str, Any]:
+        """
+        All aggregations over the selected rows, per group if `group_by` is set.
+        Returns {aggregation: value}, or {group label: {aggregation: value}} with group_by.
+        """
+        specs = [(name, *parse_aggregation(name)) for name in aggregations]
+        for name, op, field, _ in specs:
+            if field is None:
+                continue
+            self._column(field)  # Unknown fields raise
+            if op != 'distribution' and not self._is_numeric(field):
+                raise QueryError(f"Aggregation '{name}' needs a numeric field; use distribution_{field}.")
+        group, labels = self._groups(rows, group_by)
+        num_groups = len(labels)
+        counts = np.bincount(group, minlength=num_groups)
+
+        # Per-field intermediates, computed once and shared by all aggregations of a field
+        cache: Dict[Tuple[str, str], Any] = {}
+
+        def values(field):
+            key = ('values', field)
+            if key not in cache:
+                cache[key] = self._column(field)[rows]
+            return cache[key]
+
+        def sums(field):
+            key = ('sum', field)
+            if key not in cache:
+                cache[key] = np.bincount(group, weights=values(field), minlength=num_groups)
+            return cache[key]
+
+        def sorted_segments(field):
+            """Field values sorted by (group, value) plus the start offset of every group."""
+            key = ('sorted', field)
+            if key not in cache:
+                x = values(field).astype(float)
+                order = np.lexsort((x, group))
+                starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+                cache[key] = (x[order], starts)
+            return cache[key]
+
+        results: List[Dict[str, Any]] = [{} for _ in range(num_groups)]
+        present = counts > 0
+        for name, op, field, percentile in specs:
+            if op == 'count':
+                per_group = counts.tolist()
+            elif op == 'distribution':
+                per_group = self._distributions(field, values(field), group, num_groups)
+            else:
+                per_group = self._numeric_aggregate(
+                    op, field, percentile, counts, present, values, sums, sorted_segments, group
+                ).tolist()
+            for result, value in zip(results, per_group):
+                result[name] = value
+
+        if group_by is None:
+            return results[0]
+        return {str(label): result for label, result, n in zip(labels, results, counts.tolist()) if n}
+
+    def _numeric_aggregate(self, op, field, percentile, counts, present, values, sums, sorted_segments, group):
+        out = np.zeros(len(counts), dtype=float)
+        if not present.any():
+            return out
+        if op == 'sum':
+            out[present] = sums(field)[present]
+        elif op in ('mean', 'std'):
+            mean = np.zeros(len(counts))
+            mean[present] = sums(field)[present] / counts[present]
+            if op == 'mean':
+                out = mean
+            else:
+                deviation = values(field) - mean[group]
+                squares = np.bincount(group, weights=deviation * deviation, minlength=len(counts))
+                out[present] = np.sqrt(squares[present] / counts[present])
+        else:
+            sorted_values, starts = sorted_segments(field)
+            first = starts[present]
+            last = first + counts[present] - 1
+            if op == 'min':
+                out[present] = sorted_values[first]
+            elif op == 'max':
+                out[present] = sorted_values[last]
+            else:
+                # Linear interpolation between closest ranks (numpy's default percentile method)
+                position = first + (counts[present] - 1) * (percentile / 100.0)
+                lower = np.floor(position).astype(np.intp)
+                upper = np.minimum(lower + 1, last)
+                fraction = position - lower
+                out[present] = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+        return out
+
+    def _distributions(self, field, column, group, num_groups) -> List[Dict[str, int]]:
+        """Value counts per group ({str(value): count}) from one bincount over (group, value) pairs."""
+        if field in CATEGORICAL_FIELDS:
+            keys = np.array(self.store.categories[field], dtype=object)
+            num_keys = len(keys)
+            codes = column.astype(np.intp)
+        else:
+            keys, codes = np.unique(column, return_inverse=True)
+            num_keys = len(keys)
+        table = np.bincount(group * num_keys + codes, minlength=num_groups * num_keys).reshape(num_groups, num_keys)
+        key_labels = [str(k) for k in keys.tolist()]
+        return [
+            {key_labels[k]: int(n) for k, n in zip(np.flatnonzero(row).tolist(), row[row > 0].tolist())}
+            for row in table
+        ]
+
+    # --- Selection & Records ---
+    def select(self, rows: np.ndarray, limit: int, order_by: Optional[str] = None) -> np.ndarray:
+        """The first `limit` rows, or the top `limit` by `order_by` ("field" or "-field" for descending)."""
+        limit = max(0, min(limit, len(rows)))
+        if not order_by:
+            return rows[:limit]
+        descending = order_by.startswith('-')
+        field = order_by.lstrip('-+')
+        key = self._column(field)[rows]
+        if field in CATEGORICAL_FIELDS:
+            # Order categories by label
+            rank = np.argsort(np.argsort(np.array(self.store.categories[field], dtype=object)))
+            key = rank[key]
+        key = key.astype(float)
+        if descending:
+            key = -key
+        if limit < len(rows):
+            top = np.argpartition(key, limit - 1)[:limit] if limit else np.zeros(0, dtype=np.intp)
+        else:
+            top = np.arange(len(rows))
+        # Ties keep population order
+        top = top[np.lexsort((rows[top], key[top]))]
+        return rows[top]
+
+    def records(self, rows: np.ndarray, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Agent dicts for the selected rows; unknown fields are None."""
+        fields = list(fields) if fields else list(DEFAULT_FIELDS)
+        columns: Dict[str, List[Any]] = {}
+        for field in fields:
+            if field == 'id':
+                columns[field] = [self.model.agent_set[i].unique_id for i in rows.tolist()]
+            elif field in NUMERIC_FIELDS:
+                columns[field] = self.store.column(field)[rows].tolist()
+            elif field in CATEGORICAL_FIELDS:
+                categories = self.store.categories[field]
+                columns[field] = [categories[code] for code in self.store.codes[field][rows].tolist()]
+            elif field == 'political_position':
+                columns[field] = self.store.political_positions()[rows].tolist()
+            elif field == 'position':
+                columns[field] = [tuple(p) for p in self.store.position[rows].tolist()]
+            elif field == 'position_history':
+                columns[field] = [self.store.position_history[i] for i in rows.tolist()]
+            else:
+                columns[field] = [None] * len(rows)
+        return [dict(zip(fields, row)) for row in zip(*(columns[f] for f in fields))] if len(rows) else []
+
+    # --- Query ---
+    def run(self, filters: Optional[Dict[str, Any]] = None, fields: Optional[Sequence[str]] = None,
+            limit: int = 100, aggregations: Optional[Sequence[str]] = None,
+            group_by: Optional[str] = None, order_by: Optional[str] = None) -> Dict[str, Any]:
+        if group_by is not None:
+            self._column(group_by)  # Validate before doing any work
+        rows = np.flatnonzero(self.mask(filters))
+        selected = self.select(rows, limit, order_by)
+        result = {
+            'count': len(rows),
+            'returned': len(selected),
+            'agents': self.records(selected, fields),
+            'aggregations': self.aggregate(rows, aggregations, group_by) if aggregations else {},
+        }
+        if group_by is not None:
+            result['group_by'] = group_by
+        return result
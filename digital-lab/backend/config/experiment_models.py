@@ -29,6 +29,10 @@ class ExperimentRun(BaseModel):
     """Results from a single simulation run"""
     run_number: int
     simulation_steps: int
+    seed: Optional[int] = Field(
+        default=None,
+        description="Seed of this run (derived from the experiment seed, treatment and run number)"
+    )
     final_metrics: Dict[str, float] = Field(
         ...,
         description="Final state metrics: {gini: 0.35, avg_wealth: 1000, ...}"
@@ -62,10 +66,18 @@ class ExperimentDefinition(BaseModel):
         ge=1,
         description="Number of simulation steps to run"
     )
+    seed: Optional[int] = Field(
+        default=None,
+        description="Experiment seed; every run seed is derived from it (None = derived from the baseline config, treatments and steps)"
+    )
     created_at: datetime
     status: str = Field(
         default="pending",
-        description="Status: pending, running, completed, failed"
+        description="Status: pending, queued, running, completed, failed, cancelled"
+    )
+    job_id: Optional[str] = Field(
+        default=None,
+        description="Background job that last executed (or is executing) this experiment"
     )
 
 class StatisticalTest(BaseModel):
@@ -96,3 +108,4 @@ class CreateExperimentRequest(BaseModel):
     baseline_config: Dict[str, Any]
     treatments: List[TreatmentConfig]
     target_steps: int = 100
+    seed: Optional[int] = None
@@ -20,6 +20,9 @@ OUTPUT_SCHABLONEN_PATH = Path(__file__).parent.parent / "political_abm" / "outpu
 class ConfigManager:
     def __init__(self, path: Path = CONFIG_PATH):
         self.path = path
+        # Bumped on every save so running models can rebuild derived lookup structures
+        self.output_schablonen_version = 0
+        self.milieus_version = 0
 
     def get_config(self) -> FullConfig:
         """Reads, validates, and returns the current config."""
@@ -125,6 +128,7 @@ class ConfigManager:
         validated_schablonen = [OutputSchabloneConfig(**s).model_dump() for s in schablonen_data]
         with open(OUTPUT_SCHABLONEN_PATH, 'w') as f:
             yaml.dump(validated_schablonen, f, indent=2)
+        self.output_schablonen_version += 1
 
     def get_milieus(self) -> List[MilieuConfig]:
         """Reads, validates, and returns the current milieus config."""
@@ -180,6 +184,7 @@ class ConfigManager:
         validated_milieus = [MilieuConfig(**m).model_dump() for m in milieus_data]
         with open(MILIEUS_PATH, 'w') as f:
             yaml.dump(validated_milieus, f, indent=2)
+        self.milieus_version += 1
 
 
 manager = ConfigManager()
\ No newline at end of file
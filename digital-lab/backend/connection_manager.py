@@ -1,19 +1,144 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
 from fastapi import WebSocket
-from typing import List
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+import metrics
+
+Frame = Union[Dict[str, Any], bytes]
+Encoded = Union[str, bytes]
+
+# What to do when a slow client's queue is full:
+#   drop_oldest - discard the oldest queued broadcast
+#   coalesce    - keep only the newest broadcast (everything still queued is discarded)
+SLOW_CONSUMER_POLICIES = ('drop_oldest', 'coalesce')
+
+
+def encode_frames(frames: List[Frame]) -> List[Encoded]:
+    """Serializes frames once: dicts to compact JSON text (as send_json would), bytes unchanged."""
+    return [
+        frame if isinstance(frame, bytes) else json.dumps(frame, separators=(",", ":"), ensure_ascii=False)
+        for frame in frames
+    ]
+
+
+class _Client:
+    """A connection with its bounded queue of pending broadcasts and its writer task."""
+
+    def __init__(self, websocket: WebSocket, agent_format: str):
+        self.websocket = websocket
+        self.agent_format = agent_format
+        # Each entry is one broadcast: frames that must reach the client together
+        self.queue: Deque[List[Encoded]] = deque()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    """
+    Fan-out of WebSocket messages without letting one client slow down the others.
 
-    async def connect(self, websocket: WebSocket):
+    Every broadcast is serialized once and appended to a bounded per-connection queue;
+    a writer task per connection drains its queue concurrently with all others. When a
+    queue is full the slow-consumer policy drops the oldest broadcast or coalesces to the
+    latest one. A failed send evicts the connection. Dropped report deltas are recovered
+    by the client's resync request.
+    """
+
+    def __init__(self, max_queue: Optional[int] = None, policy: Optional[str] = None):
+        self.max_queue = max_queue or int(os.getenv('WS_QUEUE_SIZE', '8'))
+        self.policy = policy or os.getenv('WS_SLOW_CONSUMER_POLICY', 'drop_oldest')
+        if self.policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy '{self.policy}'. Expected one of {SLOW_CONSUMER_POLICIES}.")
+        self.clients: Dict[WebSocket, _Client] = {}
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.clients)
+
+    async def connect(self, websocket: WebSocket, agent_format: str = "json"):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = _Client(websocket, agent_format)
+        self.clients[websocket] = client
+        client.task = asyncio.create_task(self._writer(client))
+        self._update_gauges()
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        client = self.clients.pop(websocket, None)
+        if client and client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+        self._update_gauges()
+
+    def queue_depth(self) -> int:
+        return sum(len(client.queue) for client in self.clients.values())
+
+    async def send_frames(self, websocket: WebSocket, frames: List[Frame]):
+        """Queues frames for one connection (kept in order with broadcasts)."""
+        client = self.clients.get(websocket)
+        if client:
+            self._enqueue(client, encode_frames(frames))
+            self._update_gauges()
 
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            await connection.send_json(message)
+        batch = encode_frames([message])
+        for client in list(self.clients.values()):
+            self._enqueue(client, batch)
+        self._update_gauges()
+
+    async def broadcast_report(self, frames: List[Dict[str, Any]], adapt: Callable[[List[Dict[str, Any]], str], List[Frame]]):
+        """Queues report frames for every connection, adapted and serialized once per agent format."""
+        encoded: Dict[str, List[Encoded]] = {}
+        for client in list(self.clients.values()):
+            if client.agent_format not in encoded:
+                encoded[client.agent_format] = encode_frames(adapt(frames, client.agent_format))
+            self._enqueue(client, encoded[client.agent_format])
+        self._update_gauges()
+
+    def _enqueue(self, client: _Client, batch: List[Encoded]):
+        dropped = 0
+        if self.policy == 'coalesce':
+            dropped = len(client.queue)
+            client.queue.clear()
+        elif len(client.queue) >= self.max_queue:
+            client.queue.popleft()
+            dropped = 1
+        if dropped:
+            metrics.inc_ws_dropped(self.policy, dropped)
+        client.queue.append(batch)
+        client.ready.set()
+
+    async def _writer(self, client: _Client):
+        websocket = client.websocket
+        try:
+            while True:
+                await client.ready.wait()
+                while client.queue:
+                    batch = client.queue.popleft()
+                    for message in batch:
+                        start = time.perf_counter()
+                        if isinstance(message, bytes):
+                            await websocket.send_bytes(message)
+                        else:
+                            await websocket.send_text(message)
+                        metrics.observe_ws_send(time.perf_counter() - start)
+                    self._update_gauges()
+                client.ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Dead or broken socket: evict it so it never blocks or fails a broadcast again
+            print(f"Evicting WebSocket client after failed send: {e}")
+            metrics.inc_ws_evicted()
+            self.disconnect(websocket)
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+
+    def _update_gauges(self):
+        metrics.set_ws_queue_depth(self.queue_depth(), len(self.clients))
 
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
@@ -0,0 +1,151 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from experiment_service import ExperimentCancelled, experiment_service
+
+TERMINAL_STATES = ('completed', 'failed', 'cancelled')
+
+
+class ExperimentJob:
+    """Progress of one background experiment execution."""
+
+    def __init__(self, definition):
+        self.id = str(uuid.uuid4())
+        self.experiment_id = definition.id
+        self.state = 'queued'
+        self.submitted_at = datetime.now()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.target_steps = definition.target_steps
+        self.treatments = {t.name: {"completed": 0, "total": t.num_runs} for t in definition.treatments}
+        self.total_runs = sum(t.num_runs for t in definition.treatments)
+        self.completed_runs = 0
+        self.steps_completed = 0
+        # Bumped on every change, so progress channels only emit when something happened
+        self.version = 0
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+
+    def record_run(self, treatment_name: str, run):
+        self.treatments[treatment_name]["completed"] += 1
+        self.completed_runs += 1
+        self.steps_completed += run.simulation_steps
+        self.version += 1
+
+    def finish(self, state: str, error: Optional[str] = None):
+        self.state = state
+        self.error = error
+        self.finished_at = time.monotonic()
+        self.version += 1
+
+    def status(self) -> Dict[str, Any]:
+        elapsed = None
+        steps_per_second = None
+        eta_seconds = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+            if elapsed > 0:
+                steps_per_second = round(self.steps_completed / elapsed, 2)
+            if self.state == 'running' and self.completed_runs:
+                remaining = self.total_runs - self.completed_runs
+                eta_seconds = round(elapsed / self.completed_runs * remaining, 1)
+        return {
+            "job_id": self.id,
+            "experiment_id": self.experiment_id,
+            "state": self.state,
+            "submitted_at": self.submitted_at.isoformat(),
+            "completed_runs": self.completed_runs,
+            "total_runs": self.total_runs,
+            "treatments": {name: dict(progress) for name, progress in self.treatments.items()},
+            "steps_completed": self.steps_completed,
+            "elapsed_seconds": round(elapsed, 1) if elapsed is not None else None,
+            "steps_per_second": steps_per_second,
+            "eta_seconds": eta_seconds,
+            "error": self.error,
+            "version": self.version,
+        }
+
+
+class ExperimentJobManager:
+    """
+    Runs experiments as background jobs, one at a time (each already fans its runs out
+    over the experiment service's process pool). Jobs are queued FIFO, report progress
+    per completed run and can be cancelled while queued or running.
+    """
+
+    def __init__(self, experiment_service, max_finished_jobs: int = 100):
+        self.experiment_service = experiment_service
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, ExperimentJob] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="experiment-job")
+        self._lock = threading.Lock()
+
+    def submit(self, experiment_id: str) -> ExperimentJob:
+        definition = self.experiment_service.get_experiment(experiment_id)
+        if not definition:
+            raise ValueError(f"Experiment {experiment_id} not found")
+        with self._lock:
+            active = [j for j in self.jobs.values()
+                      if j.experiment_id == experiment_id and j.state not in TERMINAL_STATES]
+            if active:
+                raise RuntimeError(f"Experiment {experiment_id} is already {active[0].state} as job {active[0].id}.")
+            job = ExperimentJob(definition)
+            self.jobs[job.id] = job
+            self._prune()
+        self.experiment_service.set_status(experiment_id, "queued", job_id=job.id)
+        job.future = self._executor.submit(self._execute, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExperimentJob]:
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[ExperimentJob]:
+        return sorted(self.jobs.values(), key=lambda j: j.submitted_at, reverse=True)
+
+    def cancel(self, job_id: str) -> ExperimentJob:
+        job = self.jobs.get(job_id)
+        if not job:
+            raise ValueError(f"Job {job_id} not found")
+        if job.state in TERMINAL_STATES:
+            raise RuntimeError(f"Job {job_id} is already {job.state}.")
+        job.cancel_event.set()
+        if job.future and job.future.cancel():
+            # Never started: finish it here, the worker will not see it
+            self.experiment_service.set_status(job.experiment_id, "cancelled")
+            job.finish('cancelled')
+        return job
+
+    def _execute(self, job: ExperimentJob):
+        if job.cancel_event.is_set():
+            # Cancelled just as it was picked up
+            self.experiment_service.set_status(job.experiment_id, "cancelled")
+            job.finish('cancelled')
+            return
+        job.state = 'running'
+        job.started_at = time.monotonic()
+        job.version += 1
+        try:
+            self.experiment_service.run_experiment(
+                job.experiment_id, on_run=job.record_run, cancel_event=job.cancel_event
+            )
+            job.finish('completed')
+        except ExperimentCancelled:
+            job.finish('cancelled')
+        except Exception as e:
+            print(f"Experiment job {job.id} failed: {e}")
+            job.finish('failed', str(e))
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished_jobs."""
+        finished = [j for j in self.jobs.values() if j.state in TERMINAL_STATES]
+        finished.sort(key=lambda j: j.submitted_at)
+        for job in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self.jobs[job.id]
+
+
+job_manager = ExperimentJobManager(experiment_service)
@@ -3,11 +3,17 @@ Experiment Service for ABM² Digital Lab
 Enables controlled computational experiments for causal inference
 """
 
+import hashlib
 import json
+import multiprocessing
+import os
+import threading
 import uuid
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
 import copy
 
 from config.experiment_models import (
@@ -25,22 +31,36 @@ from utils.statistics import (
     descriptive_stats,
     aggregate_time_series
 )
-from simulation_manager import SimulationManager
-from political_abm.model import PoliticalModel
+from experiment_worker import execute_run, init_worker, run_seed
+from run_cache import RunCache, code_version, run_key
+from config.manager import manager as config_manager
+from formula_registry import registry as formula_registry
+
+
+class ExperimentCancelled(Exception):
+    """Raised by run_experiment when its cancel event is set"""
 
 
 class ExperimentService:
     """
     Manages computational experiments:
     - Creates and stores experiment definitions
-    - Runs multiple simulations per treatment
+    - Runs multiple simulations per treatment (in parallel across a process pool),
+      reusing identical runs from the run cache
     - Aggregates results
     - Performs statistical comparisons
     """
 
-    def __init__(self, experiments_dir: Path):
+    def __init__(self, experiments_dir: Path, max_workers: Optional[int] = None,
+                 max_retries: Optional[int] = None, run_cache: Optional[RunCache] = None):
         self.experiments_dir = experiments_dir
         self.experiments_dir.mkdir(exist_ok=True)
+        # Finished runs by content hash (None if disabled via EXPERIMENT_CACHE_MAX_MB=0)
+        self.run_cache = run_cache if run_cache is not None else RunCache.from_env(experiments_dir / ".run_cache")
+        # Worker processes for runs (1 = sequential in the calling thread)
+        self.max_workers = max_workers or int(os.getenv('EXPERIMENT_WORKERS', '0')) or os.cpu_count() or 1
+        # Extra attempts for a failed run (same seed, so a retry reproduces the same result)
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('EXPERIMENT_RUN_RETRIES', '2'))
 
     def create_experiment(self, request: CreateExperimentRequest) -> ExperimentDefinition:
         """
@@ -61,6 +81,7 @@ class ExperimentService:
             baseline_config=request.baseline_config,
             treatments=request.treatments,
             target_steps=request.target_steps,
+            seed=request.seed,
             created_at=datetime.now(),
             status="pending"
         )
@@ -74,12 +95,23 @@ class ExperimentService:
 
         return definition
 
-    def run_experiment(self, experiment_id: str) -> ExperimentResults:
+    def run_experiment(
+        self,
+        experiment_id: str,
+        on_run: Optional[Callable[[str, ExperimentRun], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> ExperimentResults:
         """
         Execute all treatments of an experiment
 
+        Runs are distributed over `max_workers` processes. Each run is saved and
+        passed to `on_run(treatment_name, run)` as soon as it completes.
+
         Args:
             experiment_id: UUID of experiment
+            on_run: Optional callback for every completed run
+            cancel_event: Optional event; setting it aborts the experiment with
+                ExperimentCancelled (status "cancelled")
 
         Returns:
             ExperimentResults with all runs and statistical tests
@@ -92,27 +124,28 @@ class ExperimentService:
         definition.status = "running"
         self._save_definition(definition)
 
-        treatment_results = []
-
-        # Run each treatment
-        for treatment in definition.treatments:
-            print(f"Running treatment: {treatment.name} ({treatment.num_runs} runs)")
-
-            runs = []
-            for run_num in range(treatment.num_runs):
-                print(f"  Run {run_num + 1}/{treatment.num_runs}")
-
-                run_data = self._run_single_simulation(
-                    baseline_config=definition.baseline_config,
-                    modifications=treatment.config_modifications,
-                    target_steps=definition.target_steps,
-                    run_number=run_num
-                )
-
-                runs.append(run_data)
+        runs_by_treatment: Dict[str, List[ExperimentRun]] = {t.name: [] for t in definition.treatments}
+        try:
+            for treatment_name, run_data in self.iter_runs(definition, cancel_event):
+                runs_by_treatment[treatment_name].append(run_data)
 
                 # Save individual run
-                self._save_run(experiment_id, treatment.name, run_num, run_data)
+                self._save_run(experiment_id, treatment_name, run_data.run_number, run_data)
+                if on_run:
+                    on_run(treatment_name, run_data)
+        except ExperimentCancelled:
+            definition.status = "cancelled"
+            self._save_definition(definition)
+            raise
+        except Exception:
+            definition.status = "failed"
+            self._save_definition(definition)
+            raise
+
+        treatment_results = []
+        for treatment in definition.treatments:
+            # Runs complete out of order: restore run order before aggregating
+            runs = sorted(runs_by_treatment[treatment.name], key=lambda run: run.run_number)
 
             # Aggregate results for this treatment
             aggregated = self._aggregate_runs(runs)
@@ -143,79 +176,173 @@ class ExperimentService:
 
         return results
 
-    def _run_single_simulation(
+    def iter_runs(
         self,
-        baseline_config: Dict[str, Any],
-        modifications: Dict[str, Any],
-        target_steps: int,
-        run_number: int
-    ) -> ExperimentRun:
+        definition: ExperimentDefinition,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[str, ExperimentRun]]:
         """
-        Run a single simulation with modified config
+        Execute every treatment x run of an experiment, yielding (treatment name, run)
+        in completion order
 
         Args:
-            baseline_config: Base configuration
-            modifications: Parameter changes for this treatment
-            target_steps: Number of steps to simulate
-            run_number: Run index
+            definition: Experiment to execute
+            cancel_event: Optional event; once set, no further runs are started,
+                runs in flight are abandoned and ExperimentCancelled is raised
 
-        Returns:
-            ExperimentRun with metrics and time series
+        Yields:
+            (treatment_name, ExperimentRun) as each run completes
         """
-        # Merge modifications into baseline
-        config = self._merge_config(baseline_config, modifications)
+        cancel_event = cancel_event or threading.Event()
+        tasks = self._build_tasks(definition)
+
+        # Cached runs come back immediately; only the rest is simulated
+        keys = {}
+        if self.run_cache:
+            context = self._cache_context()
+            uncached = []
+            for task in tasks:
+                treatment_name, config, target_steps, run_num, seed = task
+                key = run_key(config, target_steps, seed, context)
+                cached = self.run_cache.get(key)
+                if cached is None:
+                    keys[(treatment_name, run_num)] = key
+                    uncached.append(task)
+                else:
+                    yield treatment_name, ExperimentRun(**{**cached, "run_number": run_num})
+            tasks = uncached
+
+        print(f"Running experiment {definition.id}: {len(tasks)} runs on {self.max_workers} worker(s)")
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            runs = self._iter_runs_sequential(tasks, cancel_event)
+        else:
+            runs = self._iter_runs_parallel(tasks, cancel_event)
+        for treatment_name, run_data in runs:
+            if self.run_cache:
+                self.run_cache.put(keys[(treatment_name, run_data.run_number)], run_data.model_dump())
+            yield treatment_name, run_data
+
+    def _cache_context(self) -> Dict[str, Any]:
+        """Run cache inputs besides config, steps and seed: code, model configuration, formula pins"""
+        return {
+            "code_version": code_version(),
+            "engine": os.getenv('SIMULATION_ENGINE', 'vectorized').lower(),
+            "model_config": config_manager.get_config().model_dump(mode='json'),
+            "media_sources": [m.model_dump(mode='json') for m in config_manager.get_media_sources()],
+            "milieus": [m.model_dump(mode='json') for m in config_manager.get_milieus()],
+            "output_schablonen": [s.model_dump(mode='json') for s in config_manager.get_output_schablonen()],
+            "formula_pins": formula_registry.pinned_artifact_hashes() if formula_registry.enabled else {},
+        }
 
-        # Create isolated simulation (not using global manager to avoid conflicts)
-        # Extract parameters from config
-        num_agents = config.get('num_agents', 100)
-        network_connections = config.get('network_connections', 5)
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Run cache size and hit/miss counters (None if the cache is disabled)"""
+        return self.run_cache.stats() if self.run_cache else None
 
-        model = PoliticalModel(
-            num_agents=num_agents,
-            network_connections=network_connections
-        )
+    def _build_tasks(self, definition: ExperimentDefinition) -> List[Tuple[str, Dict[str, Any], int, int, int]]:
+        """One (treatment name, merged config, target steps, run number, seed) task per run"""
+        experiment_seed = self._experiment_seed(definition)
+        tasks = []
+        for treatment_index, treatment in enumerate(definition.treatments):
+            config = self._merge_config(definition.baseline_config, treatment.config_modifications)
+            for run_num in range(treatment.num_runs):
+                seed = run_seed(experiment_seed, treatment_index, run_num)
+                tasks.append((treatment.name, config, definition.target_steps, run_num, seed))
+        return tasks
 
-        # Run simulation
-        time_series = {
-            "gini": [],
-            "avg_wealth": [],
-            "avg_income": [],
-            "mean_altruism": []
+    @staticmethod
+    def _experiment_seed(definition: ExperimentDefinition) -> int:
+        """
+        Explicit experiment seed, or one derived from the definition's content (baseline
+        config, treatment modifications and run counts, steps), so rerunning the same
+        definition as a new experiment reuses the run seeds and hits the run cache.
+        """
+        if definition.seed is not None:
+            return definition.seed
+        content = {
+            "baseline_config": definition.baseline_config,
+            "treatments": [
+                {"config_modifications": t.config_modifications, "num_runs": t.num_runs}
+                for t in definition.treatments
+            ],
+            "target_steps": definition.target_steps,
         }
-
-        for step in range(target_steps):
-            model.step()
-
-            # Collect metrics
-            report = model.get_model_report()
-
-            if report and 'model_report' in report:
-                mr = report['model_report']
-                time_series["gini"].append(mr.get('Gini_Vermoegen', 0))
-                time_series["avg_wealth"].append(mr.get('Mean_Vermoegen', 0))
-                time_series["avg_income"].append(mr.get('Mean_Einkommen', 0))
-                time_series["mean_altruism"].append(mr.get('Mean_Altruism', 0))
-
-        # Get final metrics
-        final_report = model.get_model_report()
-        final_metrics = {}
-
-        if final_report and 'model_report' in final_report:
-            mr = final_report['model_report']
-            final_metrics = {
-                "gini": mr.get('Gini_Vermoegen', 0),
-                "avg_wealth": mr.get('Mean_Vermoegen', 0),
-                "avg_income": mr.get('Mean_Einkommen', 0),
-                "mean_altruism": mr.get('Mean_Altruism', 0),
-                "top10_share": mr.get('Top10Share_Vermoegen', 0)
-            }
-
-        return ExperimentRun(
-            run_number=run_number,
-            simulation_steps=target_steps,
-            final_metrics=final_metrics,
-            time_series=time_series
-        )
+        digest = hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).digest()
+        return int.from_bytes(digest[:4], 'little')
+
+    def _iter_runs_sequential(self, tasks, cancel_event: threading.Event) -> Iterator[Tuple[str, ExperimentRun]]:
+        for task in tasks:
+            if cancel_event.is_set():
+                raise ExperimentCancelled()
+            yield task[0], self._run_with_retries(task)
+
+    def _run_with_retries(self, task) -> ExperimentRun:
+        """Runs a task in this process, retrying failures up to max_retries times"""
+        treatment_name, config, target_steps, run_num, seed = task
+        for attempt in range(self.max_retries + 1):
+            try:
+                return ExperimentRun(**execute_run(config, target_steps, run_num, seed))
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"  Run {run_num} of '{treatment_name}' failed ({e}), retrying")
+
+    def _iter_runs_parallel(self, tasks, cancel_event: threading.Event) -> Iterator[Tuple[str, ExperimentRun]]:
+        # spawn: the API process runs threads, which fork() would copy in an undefined state
+        context = multiprocessing.get_context('spawn')
+        workers = min(self.max_workers, len(tasks))
+        # Shared with the workers, which stop their current run at the next step once set
+        worker_cancel = context.Event()
+
+        def new_executor():
+            return ProcessPoolExecutor(
+                max_workers=workers, mp_context=context,
+                initializer=init_worker, initargs=(worker_cancel,)
+            )
+
+        executor = new_executor()
+        attempts = {i: 0 for i in range(len(tasks))}
+        pending = {}
+        try:
+            for i, task in enumerate(tasks):
+                pending[executor.submit(execute_run, *task[1:])] = i
+            while pending:
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if cancel_event.is_set():
+                    # Runs take minutes: drop queued runs and have running ones stop at their next step
+                    worker_cancel.set()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise ExperimentCancelled()
+                failed = []
+                for future in done:
+                    i = pending.pop(future)
+                    try:
+                        run_data = ExperimentRun(**future.result())
+                    except Exception as e:
+                        failed.append((i, e))
+                        continue
+                    yield tasks[i][0], run_data
+
+                requeue = []
+                if any(isinstance(e, BrokenProcessPool) for _, e in failed):
+                    # A crashed worker breaks the whole pool: restart it and requeue the
+                    # unfinished tasks too (without counting an attempt against them)
+                    requeue = list(pending.values())
+                    pending.clear()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_executor()
+                for i in requeue:
+                    pending[executor.submit(execute_run, *tasks[i][1:])] = i
+                for i, e in failed:
+                    treatment_name, _, _, run_num, _ = tasks[i]
+                    attempts[i] += 1
+                    if attempts[i] > self.max_retries:
+                        raise RuntimeError(
+                            f"Run {run_num} of '{treatment_name}' failed after {attempts[i]} attempts: {e}"
+                        ) from e
+                    print(f"  Run {run_num} of '{treatment_name}' failed ({e}), retrying")
+                    pending[executor.submit(execute_run, *tasks[i][1:])] = i
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def _merge_config(
         self,
@@ -325,6 +452,16 @@ class ExperimentService:
             data = json.load(f)
             return ExperimentDefinition(**data)
 
+    def set_status(self, experiment_id: str, status: str, job_id: Optional[str] = None):
+        """Update the status (and optionally the executing job) of an experiment definition"""
+        definition = self.get_experiment(experiment_id)
+        if not definition:
+            raise ValueError(f"Experiment {experiment_id} not found")
+        definition.status = status
+        if job_id is not None:
+            definition.job_id = job_id
+        self._save_definition(definition)
+
     def get_results(self, experiment_id: str) -> Optional[ExperimentResults]:
         """Load experiment results"""
         results_path = self.experiments_dir / experiment_id / "results.json"
@@ -0,0 +1,73 @@
+"""
+Single experiment run, executable in a worker process.
+
+Kept separate from experiment_service so process-pool workers only import the model,
+not the API-level services.
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+from political_abm.model import PoliticalModel
+
+# Metrics recorded per step for every run; the first four form the time series
+TIME_SERIES_METRICS = ('gini', 'avg_wealth', 'avg_income', 'mean_altruism')
+RUN_METRICS = TIME_SERIES_METRICS + ('top10_share',)
+
+# Set by init_worker in process-pool workers; checked before every step
+_cancel_event = None
+
+
+class RunCancelled(Exception):
+    """Raised by execute_run when the worker's cancel event is set."""
+
+
+def init_worker(cancel_event):
+    """ProcessPoolExecutor initializer: shares the experiment's cancel event with the worker."""
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def run_seed(experiment_seed: int, treatment_index: int, run_number: int) -> int:
+    """Deterministic, independent 32-bit seed for one run of one treatment."""
+    sequence = np.random.SeedSequence(experiment_seed, spawn_key=(treatment_index, run_number))
+    return int(sequence.generate_state(1)[0])
+
+
+def execute_run(config: Dict[str, Any], target_steps: int, run_number: int, seed: int) -> Dict[str, Any]:
+    """
+    Runs one isolated simulation with a merged config and returns the ExperimentRun fields.
+
+    All randomness comes from the model's seeded streams, so a run produces the same
+    result in any worker process.
+    """
+    # Create isolated simulation (not using global manager to avoid conflicts)
+    # Extract parameters from config
+    num_agents = config.get('num_agents', 100)
+    network_connections = config.get('network_connections', 5)
+
+    model = PoliticalModel(
+        num_agents=num_agents,
+        network_connections=network_connections,
+        seed=seed
+    )
+
+    # Run simulation; metrics are recorded from the agent arrays after every step
+    collector = model.add_metrics_collector(RUN_METRICS, capacity=max(1, target_steps))
+    for step in range(target_steps):
+        if _cancel_event is not None and _cancel_event.is_set():
+            raise RunCancelled(f"Run {run_number} cancelled at step {step}")
+        model.step()
+
+    time_series = {name: collector.series(name).tolist() for name in TIME_SERIES_METRICS}
+    # Final metrics of the last step (of the initial state for zero-step runs)
+    final_metrics = collector.latest()
+
+    return {
+        "run_number": run_number,
+        "simulation_steps": target_steps,
+        "seed": seed,
+        "final_metrics": final_metrics,
+        "time_series": time_series
+    }
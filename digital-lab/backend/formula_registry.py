@@ -173,6 +173,14 @@ class FormulaRegistry:
         }, sort_keys=True).encode("utf-8"))
         return "sha256:" + m.hexdigest()
 
+    def pinned_artifact_hashes(self) -> Dict[str, str]:
+        """{formula: "version@artifact hash"} for every pin, identifying the exact formulas a model uses."""
+        out: Dict[str, str] = {}
+        for name, ver in sorted(self._pins.items()):
+            data = self._load_version(name, ver) if ver else None
+            out[name] = f"{ver}@{self._artifact_hash(data) if data else 'missing'}"
+        return out
+
     def _cache_path(self, name: str, version: str, artifact_hash: str) -> Path:
         safe_hash = artifact_hash.split(":")[-1]
         return CACHE_DIR / f"{name}@{version}-{safe_hash}.pkl"
@@ -2,11 +2,12 @@ import uvicorn
 import asyncio
 import os
 import json
+import time
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Body, Query, Request, Depends
 import uuid
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Any, Dict
+from typing import Callable, List, Optional, Any, Dict
 from pydantic import BaseModel
 from pathlib import Path
 from dotenv import load_dotenv
@@ -16,7 +17,10 @@ load_dotenv()
 
 # Import application modules
 from simulation_manager import manager as simulation_manager
+from agent_query import QueryError
 from connection_manager import manager as connection_manager
+from report_stream import stream as report_stream, AGENT_FORMATS
+from simulation_runner import SimulationRunner
 from config.manager import manager as config_manager
 from formula_registry import registry as formula_registry
 from config.models import FullConfig
@@ -24,6 +28,7 @@ from metrics import export_prometheus, CONTENT_TYPE as METRICS_CONTENT_TYPE
 from authz import check_role
 from simple_auth import authenticate_user, get_current_user_info
 from experiment_service import experiment_service
+from experiment_jobs import job_manager as experiment_jobs, TERMINAL_STATES as JOB_TERMINAL_STATES
 from config.experiment_models import CreateExperimentRequest
 
 # --- FastAPI App Initialization and CORS ---
@@ -47,6 +52,9 @@ app.add_middleware(
 PRESETS_DIR = Path(__file__).parent / "presets"
 PRESETS_DIR.mkdir(exist_ok=True)
 
+# --- Continuous Simulation Runner ---
+simulation_runner = SimulationRunner(simulation_manager, connection_manager, report_stream)
+
 # --- Background Tasks ---
 async def ping_clients():
     while True:
@@ -132,35 +140,141 @@ async def audit_mark(request: Request, payload: dict = Body()):
 class ResetPayload(BaseModel):
     num_agents: int = 100
     network_connections: int = 5
+    seed: Optional[int] = None  # None = random seed
+
+def _advance_and_publish(advance: Callable[[], Optional[Dict[str, Any]]]):
+    """Runs `advance` (reset or step) and encodes its frames in one critical section.
+
+    Called via asyncio.to_thread: holding simulation_manager.lock keeps runner steps
+    and connecting clients (keyframe_frames) from touching the model or the report
+    stream in between. Returns (report, frames) or (None, None).
+    """
+    with simulation_manager.lock:
+        data = advance()
+        if not data:
+            return None, None
+        return data, report_stream.publish(simulation_manager.model, data)
 
 @app.post("/api/simulation/reset")
 async def reset_simulation(payload: ResetPayload, user: dict = Depends(get_current_user_info)):
     """Resets the simulation and returns the initial state."""
-    simulation_manager.reset_model(
-        num_agents=payload.num_agents,
-        network_connections=payload.network_connections
-    )
+    if simulation_runner.state != 'stopped':
+        await simulation_runner.stop()
+
+    def reset():
+        simulation_manager.reset_model(
+            num_agents=payload.num_agents,
+            network_connections=payload.network_connections,
+            seed=payload.seed
+        )
+        return simulation_manager.get_model_data()
+
     # NEU: Gebe den initialen Zustand direkt zurück
-    initial_data = simulation_manager.get_model_data()
+    initial_data, frames = await asyncio.to_thread(_advance_and_publish, reset)
     if initial_data:
-        # Optional: Sende den ersten Zustand auch per WebSocket
-        await connection_manager.broadcast(initial_data)
+        # Optional: Sende den ersten Zustand auch per WebSocket (new model -> keyframe)
+        await connection_manager.broadcast_report(frames, report_stream.for_agent_format)
         return initial_data
     raise HTTPException(status_code=500, detail="Failed to create initial model state.")
 
 @app.post("/api/simulation/step")
 async def step_simulation(user: dict = Depends(get_current_user_info)):
     """Advances the simulation by one step and broadcasts the new state."""
-    new_data = simulation_manager.step_model()
+    if simulation_runner.state != 'stopped':
+        raise HTTPException(status_code=409, detail=f"Simulation runner is {simulation_runner.state}; stop it before stepping manually.")
+    # Step off the event loop so other requests are served meanwhile
+    new_data, frames = await asyncio.to_thread(_advance_and_publish, simulation_manager.step_model)
     if new_data:
-        await connection_manager.broadcast(new_data)
+        await connection_manager.broadcast_report(frames, report_stream.for_agent_format)
         return {"message": f"Simulation advanced to step {new_data.get('step', -1)}."}
     raise HTTPException(status_code=500, detail="Simulation model not available.")
 
+@app.post("/api/simulation/run")
+async def run_simulation(
+    steps: int = Query(..., ge=1, le=100000, description="Number of steps to run"),
+    history_every: int = Query(0, ge=0, description="Store every n-th step in the history (0 = final step only)"),
+    broadcast_every: int = Query(0, ge=0, description="Broadcast every n-th step over the WebSocket (0 = final step only)"),
+    user: dict = Depends(get_current_user_info)
+):
+    """Runs `steps` steps in one tight loop and returns the final state.
+
+    Intermediate reports are only built for the sampled steps, so batch workflows do
+    not pay per-step HTTP and report overhead.
+    """
+    if simulation_runner.state != 'stopped':
+        raise HTTPException(status_code=409, detail=f"Simulation runner is {simulation_runner.state}; stop it before running steps.")
+    loop = asyncio.get_running_loop()
+
+    def publish(report: Dict[str, Any]):
+        # Called in the worker thread with the model lock held: encode here, send on the loop
+        frames = report_stream.publish(simulation_manager.model, report)
+        asyncio.run_coroutine_threadsafe(
+            connection_manager.broadcast_report(frames, report_stream.for_agent_format), loop
+        )
+
+    start = time.perf_counter()
+    final_data = await asyncio.to_thread(
+        simulation_manager.run_steps, steps,
+        history_every=history_every, broadcast_every=broadcast_every, on_broadcast=publish
+    )
+    elapsed = time.perf_counter() - start
+    if not final_data:
+        raise HTTPException(status_code=500, detail="Simulation model not available.")
+    return {
+        "steps_run": steps,
+        "step": final_data.get("step"),
+        "elapsed_seconds": round(elapsed, 4),
+        "steps_per_second": round(steps / max(elapsed, 1e-9), 2),
+        "final_state": final_data,
+    }
+
+class RunnerStartPayload(BaseModel):
+    steps_per_second: Optional[float] = None  # None = as fast as possible
+    max_steps: Optional[int] = None           # None = until stopped
+    ui_fps: Optional[float] = None            # Broadcast frame rate (default SIMULATION_UI_FPS)
+
+@app.post("/api/simulation/start")
+async def start_simulation(payload: Optional[RunnerStartPayload] = None, user: dict = Depends(get_current_user_info)):
+    """Starts continuous stepping in a background worker; frames are broadcast at ui_fps."""
+    payload = payload or RunnerStartPayload()
+    try:
+        return simulation_runner.start(
+            steps_per_second=payload.steps_per_second,
+            max_steps=payload.max_steps,
+            ui_fps=payload.ui_fps
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/api/simulation/pause")
+async def pause_simulation(user: dict = Depends(get_current_user_info)):
+    try:
+        return simulation_runner.pause()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/api/simulation/resume")
+async def resume_simulation(user: dict = Depends(get_current_user_info)):
+    try:
+        return simulation_runner.resume()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/api/simulation/stop")
+async def stop_simulation(user: dict = Depends(get_current_user_info)):
+    """Stops continuous stepping and broadcasts the final state."""
+    return await simulation_runner.stop()
+
+@app.get("/api/simulation/runner")
+async def get_runner_status():
+    return simulation_runner.status()
+
 @app.get("/api/simulation/data")
 async def get_simulation_data():
     """Gets the current state of the simulation without advancing it."""
-    data = simulation_manager.get_model_data()
+    data = await asyncio.to_thread(simulation_manager.get_model_data)
     if data:
         return data
     raise HTTPException(status_code=500, detail="Simulation model not available.")
@@ -177,15 +291,22 @@ async def query_agents(payload: dict = Body()):
         },
         "fields": ["id", "vermoegen", "einkommen", "region"],
         "limit": 50,
-        "aggregations": ["count", "mean_vermoegen", "distribution_milieu"]
+        "order_by": "-vermoegen",
+        "aggregations": ["count", "mean_vermoegen", "percentile_90_einkommen", "distribution_milieu"],
+        "group_by": "region"
     }
     """
     filters = payload.get('filters', None)
     fields = payload.get('fields', None)
     limit = payload.get('limit', 100)
     aggregations = payload.get('aggregations', None)
+    group_by = payload.get('group_by', None)
+    order_by = payload.get('order_by', None)
 
-    result = simulation_manager.query_agents(filters, fields, limit, aggregations)
+    try:
+        result = simulation_manager.query_agents(filters, fields, limit, aggregations, group_by, order_by)
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if result:
         return result
     raise HTTPException(status_code=500, detail="Simulation model not available.")
@@ -206,6 +327,14 @@ async def get_time_series(
         return result
     raise HTTPException(status_code=500, detail="No simulation history available.")
 
+@app.get("/api/simulation/agent-snapshots")
+async def get_agent_snapshot(step: Optional[int] = Query(None, description="Recorded step (null = latest snapshot)")):
+    """Agent states of a recent recorded step (only the last HISTORY_AGENT_SNAPSHOTS steps are kept)."""
+    snapshot = simulation_manager.get_agent_snapshot(step)
+    if snapshot:
+        return snapshot
+    raise HTTPException(status_code=404, detail="No agent snapshot stored for this step.")
+
 # --- Recording Management Endpoints ---
 
 @app.post("/api/recording/start")
@@ -615,17 +744,124 @@ async def get_experiment(experiment_id: str):
 async def run_experiment(experiment_id: str, user: dict = Depends(get_current_user_info)):
     """Execute all treatments of an experiment.
 
-    WARNING: This can take several minutes for experiments with many runs!
+    Runs are distributed over a process pool (EXPERIMENT_WORKERS); this can still take
+    several minutes for experiments with many runs!
     Returns full results including statistical tests.
     """
     try:
-        results = experiment_service.run_experiment(experiment_id)
+        results = await asyncio.to_thread(experiment_service.run_experiment, experiment_id)
         return results.model_dump()
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error running experiment: {e}")
 
+@app.post("/api/experiments/{experiment_id}/run/stream")
+async def run_experiment_stream(experiment_id: str, user: dict = Depends(get_current_user_info)):
+    """Execute an experiment, streaming every run as it completes (NDJSON).
+
+    Lines: {"type": "run", "treatment": ..., "run": {...}} per completed run, then
+    {"type": "results", "results": {...}} or {"type": "error", "detail": ...}.
+    """
+    if not experiment_service.get_experiment(experiment_id):
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_run(treatment_name, run):
+        item = {"type": "run", "treatment": treatment_name, "run": run.model_dump()}
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    async def execute():
+        try:
+            results = await asyncio.to_thread(experiment_service.run_experiment, experiment_id, on_run)
+            await queue.put({"type": "results", "results": results.model_dump()})
+        except Exception as e:
+            await queue.put({"type": "error", "detail": f"Error running experiment: {e}"})
+        await queue.put(None)
+
+    async def lines():
+        task = asyncio.create_task(execute())
+        while (item := await queue.get()) is not None:
+            yield json.dumps(item, default=str) + "\n"
+        await task
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post("/api/experiments/{experiment_id}/jobs", status_code=202)
+async def submit_experiment_job(experiment_id: str, user: dict = Depends(get_current_user_info)):
+    """Queue an experiment as a background job and return immediately with its job ID.
+
+    Poll GET /api/experiment-jobs/{job_id} or follow /api/experiment-jobs/{job_id}/events;
+    results are available from /api/experiments/{experiment_id}/results once completed.
+    """
+    try:
+        job = experiment_jobs.submit(experiment_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return job.status()
+
+@app.get("/api/experiment-jobs")
+async def list_experiment_jobs():
+    """List background experiment jobs (newest first)."""
+    return [job.status() for job in experiment_jobs.list()]
+
+@app.get("/api/experiment-jobs/{job_id}")
+async def get_experiment_job(job_id: str):
+    """Progress of a background experiment job: runs per treatment, ETA, steps/sec."""
+    job = experiment_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.status()
+
+@app.get("/api/experiment-jobs/{job_id}/events")
+async def experiment_job_events(job_id: str):
+    """Server-sent events with the job status on every change, until the job finishes."""
+    job = experiment_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        version = None
+        while True:
+            if job.version != version:
+                status = job.status()
+                version = status["version"]
+                yield f"event: progress\ndata: {json.dumps(status)}\n\n"
+                if status["state"] in JOB_TERMINAL_STATES:
+                    break
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/api/experiment-jobs/{job_id}/cancel")
+async def cancel_experiment_job(job_id: str, user: dict = Depends(get_current_user_info)):
+    """Cancel a queued or running experiment job."""
+    try:
+        return experiment_jobs.cancel(job_id).status()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/api/experiment-cache")
+async def get_experiment_cache_stats():
+    """Experiment run cache: entries, size on disk, hits/misses and evictions."""
+    stats = experiment_service.cache_stats()
+    if stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **stats}
+
+@app.delete("/api/experiment-cache")
+async def clear_experiment_cache(user: dict = Depends(get_current_user_info)):
+    """Delete all cached experiment runs."""
+    if experiment_service.run_cache:
+        experiment_service.run_cache.clear()
+    return {"ok": True}
+
 @app.get("/api/experiments/{experiment_id}/results")
 async def get_experiment_results(experiment_id: str):
     """Get results of a completed experiment."""
@@ -657,11 +893,36 @@ async def compare_treatments_endpoint(experiment_id: str, metric: str = "gini"):
 # --- WebSocket Endpoint ---
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await connection_manager.connect(websocket)
+    # Opt-in binary columnar agent frames: /ws?agent_format=binary (JSON by default)
+    agent_format = websocket.query_params.get("agent_format", "json")
+    if agent_format not in AGENT_FORMATS:
+        agent_format = "json"
+    await connection_manager.connect(websocket, agent_format)
+
+    def keyframe_frames():
+        # The runner may be stepping in its worker thread
+        with simulation_manager.lock:
+            frames = report_stream.connect_frames(simulation_manager.model)
+            return report_stream.for_agent_format(frames, agent_format)
+
+    async def send_keyframe():
+        await connection_manager.send_frames(websocket, await asyncio.to_thread(keyframe_frames))
+
     try:
+        # Full keyframe on connect; the step broadcasts after that are deltas
+        await send_keyframe()
         while True:
-            await websocket.receive_text()
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "resync":
+                await send_keyframe()
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Also covers sockets the broadcaster already evicted
         connection_manager.disconnect(websocket)
 
 # --- Main Entry Point ---
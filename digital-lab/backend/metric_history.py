@@ -0,0 +1,106 @@
+"""
+Columnar ring buffer for the simulation history.
+
+Every recorded report is reduced to its numeric scalars, addressed by the same dot
+paths the time-series API uses ("model_report.Gini_Vermoegen",
+"model_report.Regions.Urban", ...), and written as one row of a preallocated
+(capacity x metrics) float matrix. Once full, the oldest row is overwritten in O(1).
+A time-series query is a gather of the requested columns in chronological order
+instead of a walk over nested report dicts.
+
+Columns are added when a report contains a path for the first time; rows recorded
+before that hold NaN for it (returned as None).
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def flatten_scalars(data: Dict[str, Any], prefix: str) -> Iterator[Tuple[str, float]]:
+    """Yields (dot path, value) for every numeric leaf of a nested dict (lists, strings and booleans are skipped)."""
+    for key, value in data.items():
+        path = f"{prefix}.{key}"
+        if isinstance(value, dict):
+            yield from flatten_scalars(value, path)
+        elif isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_)):
+            yield path, float(value)
+
+
+class MetricHistory:
+    """Ring buffer of (step, scalar metrics) rows with a fixed capacity."""
+
+    def __init__(self, capacity: int = 1000, initial_columns: int = 64):
+        self.capacity = max(1, capacity)
+        self.steps = np.zeros(self.capacity, dtype=np.int64)
+        self.values = np.full((self.capacity, max(1, initial_columns)), np.nan)
+        self.columns: Dict[str, int] = {}
+        self._start = 0  # Row of the oldest entry
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+        self.values[:] = np.nan
+
+    def append(self, report: Dict[str, Any]):
+        """Records the numeric scalars of a get_model_report() dict as the newest row."""
+        if self._size < self.capacity:
+            row = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            row = self._start
+            self._start = (self._start + 1) % self.capacity
+        self.steps[row] = report.get('step', 0)
+        self.values[row] = np.nan
+        for path, value in flatten_scalars(report.get('model_report', {}), 'model_report'):
+            j = self._column(path)  # May grow (replace) self.values
+            self.values[row, j] = value
+
+    def _column(self, path: str) -> int:
+        j = self.columns.get(path)
+        if j is None:
+            j = len(self.columns)
+            if j == self.values.shape[1]:
+                grown = np.full((self.capacity, 2 * j), np.nan)
+                grown[:, :j] = self.values
+                self.values = grown
+            self.columns[path] = j
+        return j
+
+    def _rows(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Buffer rows of history positions start..end (0 = oldest), in chronological order."""
+        return (self._start + np.arange(self._size)[start:end]) % self.capacity
+
+    def step_list(self) -> List[int]:
+        return self.steps[self._rows()].tolist()
+
+    def latest_step(self) -> Optional[int]:
+        return int(self.steps[self._rows()[-1]]) if self._size else None
+
+    def series(self, metrics: Sequence[str], start: int = 0,
+               end: Optional[int] = None) -> Tuple[List[int], Dict[str, List[Optional[float]]]]:
+        """
+        Steps and values of `metrics` for history positions start..end. "step" is
+        accepted as a metric; unknown paths and missing values are None.
+        """
+        rows = self._rows(start, end)
+        steps = self.steps[rows]
+        result: Dict[str, List[Optional[float]]] = {}
+        for metric in metrics:
+            if metric == 'step':
+                result[metric] = steps.tolist()
+                continue
+            j = self.columns.get(metric)
+            if j is None:
+                result[metric] = [None] * len(rows)
+                continue
+            column = self.values[rows, j]
+            values = column.tolist()
+            if np.isnan(column).any():
+                values = [None if v != v else v for v in values]
+            result[metric] = values
+        return steps.tolist(), result
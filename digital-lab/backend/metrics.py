@@ -1,11 +1,11 @@
 from typing import Dict, Any
 try:
-    from prometheus_client import CollectorRegistry, Gauge, Counter, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client import CollectorRegistry, Gauge, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
     _PROM_AVAILABLE = True
 except Exception:
     _PROM_AVAILABLE = False
     CollectorRegistry = object  # type: ignore
-    Gauge = Counter = object     # type: ignore
+    Gauge = Counter = Histogram = object     # type: ignore
     def generate_latest(*args, **kwargs):  # type: ignore
         return b""
     CONTENT_TYPE_LATEST = "text/plain"
@@ -20,6 +20,17 @@ if _PROM_AVAILABLE:
     # Counters for events
     C_AUDIT_FAILED = Counter('audit_failed_total', 'Total failed audit operations', ['action'], registry=METRICS_REGISTRY)
     C_PIN_UPDATE_REJECTED = Counter('pin_update_rejected_total', 'Total rejected pin updates', registry=METRICS_REGISTRY)
+    # WebSocket broadcaster
+    H_WS_SEND_SECONDS = Histogram('ws_send_seconds', 'Time to send one queued message to a WebSocket client', registry=METRICS_REGISTRY)
+    G_WS_QUEUE_DEPTH = Gauge('ws_queue_depth', 'Messages queued across all WebSocket clients', registry=METRICS_REGISTRY)
+    G_WS_CONNECTIONS = Gauge('ws_connections', 'Active WebSocket connections', registry=METRICS_REGISTRY)
+    C_WS_DROPPED = Counter('ws_messages_dropped_total', 'Messages dropped for slow WebSocket clients', ['policy'], registry=METRICS_REGISTRY)
+    C_WS_EVICTED = Counter('ws_connections_evicted_total', 'WebSocket clients evicted after a failed send', registry=METRICS_REGISTRY)
+    # Experiment run cache
+    C_RUN_CACHE_LOOKUPS = Counter('experiment_run_cache_lookups_total', 'Experiment run cache lookups', ['result'], registry=METRICS_REGISTRY)
+    C_RUN_CACHE_EVICTED = Counter('experiment_run_cache_evictions_total', 'Experiment runs evicted from the cache', registry=METRICS_REGISTRY)
+    G_RUN_CACHE_BYTES = Gauge('experiment_run_cache_bytes', 'Size of the experiment run cache on disk', registry=METRICS_REGISTRY)
+    G_RUN_CACHE_ENTRIES = Gauge('experiment_run_cache_entries', 'Cached experiment runs', registry=METRICS_REGISTRY)
 else:
     METRICS_REGISTRY = None  # type: ignore
 
@@ -54,6 +65,50 @@ def inc_pin_update_rejected() -> None:
     C_PIN_UPDATE_REJECTED.inc()
 
 
+def observe_ws_send(seconds: float) -> None:
+    if not _PROM_AVAILABLE:
+        return
+    H_WS_SEND_SECONDS.observe(seconds)
+
+
+def set_ws_queue_depth(depth: int, connections: int) -> None:
+    if not _PROM_AVAILABLE:
+        return
+    G_WS_QUEUE_DEPTH.set(depth)
+    G_WS_CONNECTIONS.set(connections)
+
+
+def inc_ws_dropped(policy: str, count: int = 1) -> None:
+    if not _PROM_AVAILABLE:
+        return
+    C_WS_DROPPED.labels(policy=policy).inc(count)
+
+
+def inc_ws_evicted() -> None:
+    if not _PROM_AVAILABLE:
+        return
+    C_WS_EVICTED.inc()
+
+
+def inc_run_cache(result: str) -> None:
+    if not _PROM_AVAILABLE:
+        return
+    C_RUN_CACHE_LOOKUPS.labels(result=result).inc()
+
+
+def inc_run_cache_evicted(count: int = 1) -> None:
+    if not _PROM_AVAILABLE or not count:
+        return
+    C_RUN_CACHE_EVICTED.inc(count)
+
+
+def set_run_cache_size(size_bytes: int, entries: int) -> None:
+    if not _PROM_AVAILABLE:
+        return
+    G_RUN_CACHE_BYTES.set(size_bytes)
+    G_RUN_CACHE_ENTRIES.set(entries)
+
+
 def export_prometheus() -> bytes:
     return generate_latest(METRICS_REGISTRY)
 
@@ -1,14 +1,19 @@
-import random
 import numpy as np
-import networkx as nx
 from .agents import PoliticalAgent
-from .utils import generate_attribute_value
+from .agent_store import AgentStore, group_rows
+from .types import AgentState
+from .samplers import compile_sampler
+from .social_network import SocialNetwork
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from backend.config.models import DistributionConfig
 
 
+# Base cognitive capacity, identical for every biome
+KOGNITIVE_KAPAZITAET_VERTEILUNG = DistributionConfig(type='normal', mean=0.5, std_dev=0.15)
+
+
 class AgentInitializer:
     """
     Handles the complex three-stage agent initialization process:
@@ -23,82 +28,90 @@ class AgentInitializer:
     def create_agents(self):
         """
         Creates and returns a list of fully initialized PoliticalAgent instances.
-        Implements the 3-step causal logic from the original PoliticalModel.
+        Implements the 3-step causal logic from the original PoliticalModel in bulk:
+        milieus and biomes are drawn as categorical code arrays, every attribute is
+        drawn once per milieu/biome group, and derived attributes and positions are
+        computed as whole columns of the AgentStore.
         """
-        agents = []
-        
-        # Create social network
-        # Ensure m < n for barabasi_albert_graph
-        network_connections = min(5, max(1, self.model.num_agents - 1))
-        self.model.G = nx.barabasi_albert_graph(self.model.num_agents, network_connections)
-        
-        # --- Agent Creation Loop (3-Step Causal Logic) ---
-        for i in range(self.model.num_agents):
-            agent_state_args = {}
-
-            # --- Step 1: Ideology & Social Attributes from Milieu ---
-            assigned_milieu = random.choices(
-                self.model.milieus, 
-                weights=[m.proportion for m in self.model.milieus], 
-                k=1
-            )[0]
-            agent_state_args['initial_milieu'] = assigned_milieu.name
-            
-            for attr, dist in assigned_milieu.attribute_distributions.__dict__.items():
-                agent_state_args[attr] = generate_attribute_value(dist)
-
-            # --- Step 2: Economy & Base Cognition from Biome ---
-            assigned_biome = random.choice(self.model.biomes)
-            agent_state_args['region'] = assigned_biome.name
-            
-            agent_state_args['einkommen'] = generate_attribute_value(
-                assigned_biome.einkommen_verteilung
-            )
-            agent_state_args['vermoegen'] = generate_attribute_value(
-                assigned_biome.vermoegen_verteilung
-            )
-            # Base cognitive capacity influenced by biome
-            agent_state_args['kognitive_kapazitaet_basis'] = generate_attribute_value(
-                DistributionConfig(type='normal', mean=0.5, std_dev=0.15)
-            )
-
-            # --- Step 3: Calculate Derived Psychological Attributes ---
-            agent_state_args = self._calculate_derived_attributes(
-                agent_state_args, 
-                self.model.global_model_parameters
-            )
-
-            # --- Final Assembly ---
-            # Position assignment within the biome
-            biome_layout = next(
-                l for l in self.model.layout 
-                if l['name'] == assigned_biome.name
-            )
-            pos_x = random.uniform(biome_layout['x_min'], biome_layout['x_max'])
-            pos_y = random.uniform(0, 100)
-            agent_state_args['position'] = (pos_x, pos_y)
-            
-            # Initialize additional state variables
-            agent_state_args['sozialleistungen'] = 0.0
-            agent_state_args['konsumquote'] = 0.0
-            agent_state_args['ersparnis'] = 0.0
-            agent_state_args['schablone'] = 'Unclassified'
-            agent_state_args['milieu'] = 'Unassigned'  # Set by dynamic classification
-            
-            # Add age attribute if missing
-            if 'alter' not in agent_state_args:
-                agent_state_args['alter'] = random.randint(18, 65)
-            
-            # Create agent with the final state
-            agent = PoliticalAgent(i, self.model, **agent_state_args)
-            agents.append(agent)
-
-        return agents
+        n = self.model.num_agents
+        rng = self.model.streams['initialization']
+        milieus = self.model.milieus
+        biome_table = self.model.biome_table
+
+        # Create social network (CSR adjacency over agent rows, preferential attachment)
+        self.model.network = SocialNetwork.preferential_attachment(
+            n, self.model.network_connections, self.model.streams['network']
+        )
+        milieu_weights = np.array([m.proportion for m in milieus], dtype=float)
+        milieu_weights /= milieu_weights.sum()
+
+        # --- Categorical Assignment ---
+        milieu_codes = rng.choice(len(milieus), size=n, p=milieu_weights)
+        biome_codes = rng.integers(len(biome_table), size=n)
+        columns = {}
+
+        # --- Step 1: Ideology & Social Attributes from Milieu ---
+        for milieu, rows in zip(milieus, group_rows(milieu_codes, len(milieus))):
+            for attr, dist in milieu.attribute_distributions.__dict__.items():
+                column = columns.setdefault(attr, np.zeros(n))
+                if len(rows):
+                    column[rows] = compile_sampler(dist).sample(rng, len(rows))
+
+        # --- Step 2: Economy & Base Cognition from Biome ---
+        columns['einkommen'] = np.zeros(n)
+        columns['vermoegen'] = np.zeros(n)
+        for code, rows in enumerate(biome_table.groups(biome_codes)):
+            if len(rows):
+                columns['einkommen'][rows] = biome_table.income_samplers[code].sample(rng, len(rows))
+                columns['vermoegen'][rows] = biome_table.wealth_samplers[code].sample(rng, len(rows))
+        # Base cognitive capacity influenced by biome
+        columns['kognitive_kapazitaet_basis'] = compile_sampler(KOGNITIVE_KAPAZITAET_VERTEILUNG).sample(rng, n)
+
+        # --- Step 3: Calculate Derived Psychological Attributes ---
+        columns = self._calculate_derived_attributes(columns, self.model.global_model_parameters)
+
+        # --- Final Assembly ---
+        # Position assignment within the biome sector (layout is in biome code order)
+        x_min = np.array([l['x_min'] for l in self.model.layout], dtype=float)
+        x_max = np.array([l['x_max'] for l in self.model.layout], dtype=float)
+        position = np.column_stack((
+            rng.uniform(x_min[biome_codes], x_max[biome_codes]),
+            rng.uniform(0, 100, size=n),
+        ))
+
+        # Initialize additional state variables
+        columns['sozialleistungen'] = 0.0
+        columns['konsumquote'] = 0.0
+        columns['ersparnis'] = 0.0
+
+        # Add age attribute if missing
+        if 'alter' not in columns:
+            columns['alter'] = rng.integers(18, 66, size=n)
+
+        # --- Columnar Store & Agent Views ---
+        # Seed category codes in config order so that code i == biome/milieu/schablone i;
+        # milieu and schablone are set by the first dynamic classification
+        store = AgentStore.from_columns(n, columns, codes={
+            'region': biome_codes,
+            'initial_milieu': milieu_codes,
+        }, position=position, categories={
+            'region': biome_table.names,
+            'initial_milieu': [m.name for m in milieus],
+            'milieu': [m.name for m in milieus],
+            'schablone': [s.name for s in self.model.output_schablonen],
+        })
+        self.model.agent_store = store
+
+        return [
+            PoliticalAgent(i, self.model, state=AgentState(store, i))
+            for i in range(n)
+        ]
 
     def _calculate_derived_attributes(self, agent_state_args: dict, params: dict) -> dict:
         """
         Calculates derived attributes based on already generated base attributes.
-        This implements the economic-psychological coupling logic.
+        This implements the economic-psychological coupling logic; values may be
+        scalars or whole columns.
         """
         # Risikoaversion = f(vermoegen)
         vermoegen = agent_state_args['vermoegen']
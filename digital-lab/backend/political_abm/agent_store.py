@@ -0,0 +1,239 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Any
+
+
+# --- Column Layout ---
+FLOAT_FIELDS = (
+    'bildung',
+    'einkommen',
+    'vermoegen',
+    'sozialleistungen',
+    'kognitive_kapazitaet_basis',
+    'effektive_kognitive_kapazitaet',
+    'freedom_preference',
+    'altruism_factor',
+    'risikoaversion',
+    'zeitpraeferenzrate',
+    'politische_wirksamkeit',
+    'sozialkapital',
+    'konsumquote',
+    'ersparnis',
+)
+INT_FIELDS = ('alter',)
+CATEGORICAL_FIELDS = ('region', 'initial_milieu', 'milieu', 'schablone')
+
+# Defaults for fields that AgentState historically declared as optional
+FIELD_DEFAULTS = {
+    'initial_milieu': 'Unknown',
+    'milieu': 'Unassigned',
+    'schablone': 'Unclassified',
+    'konsumquote': 0.0,
+    'ersparnis': 0.0,
+}
+
+# Inputs of the political position; writing any of them invalidates the cached positions
+POSITION_INPUT_FIELDS = ('vermoegen', 'altruism_factor', 'freedom_preference')
+
+ALL_FIELDS = FLOAT_FIELDS + INT_FIELDS + CATEGORICAL_FIELDS + ('position', 'position_history')
+
+
+class AgentStore:
+    """
+    Columnar (structure-of-arrays) storage for the complete agent population.
+
+    Every numeric attribute lives in one contiguous NumPy array indexed by the
+    agent's row. String attributes (region, milieu, ...) are stored as int32 codes
+    into a per-field category list. Phases operate on whole columns; per-agent
+    code reads and writes single rows through AgentState views.
+
+    Political positions are derived from vermoegen/altruism/freedom and cached as
+    one (N, 2) array. Column assignments (`store.vermoegen = ...`, `+=`) and AgentState
+    writes invalidate the cache; element writes into a column array
+    (`store.vermoegen[mask] = ...`) must call invalidate_political_positions().
+    """
+
+    def __init__(self, size: int = 0, categories: Optional[Dict[str, Sequence[str]]] = None):
+        self.size = size
+        self._columns: Dict[str, np.ndarray] = {}
+        for field in FLOAT_FIELDS:
+            self._columns[field] = np.zeros(size, dtype=np.float64)
+        for field in INT_FIELDS:
+            self._columns[field] = np.zeros(size, dtype=np.int64)
+        self.codes: Dict[str, np.ndarray] = {
+            field: np.zeros(size, dtype=np.int32) for field in CATEGORICAL_FIELDS
+        }
+        self.categories: Dict[str, List[str]] = {field: [] for field in CATEGORICAL_FIELDS}
+        self._category_index: Dict[str, Dict[str, int]] = {field: {} for field in CATEGORICAL_FIELDS}
+        self.position = np.zeros((size, 2), dtype=np.float64)
+        self.position_history: List[list] = [[] for _ in range(size)]
+        self._political_positions: Optional[np.ndarray] = None
+
+        for field, labels in (categories or {}).items():
+            self.register_categories(field, labels)
+
+    def __len__(self) -> int:
+        return self.size
+
+    # --- Construction ---
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]],
+                     categories: Optional[Dict[str, Sequence[str]]] = None) -> 'AgentStore':
+        """Builds a store from a list of per-agent attribute dicts (AgentState kwargs)."""
+        store = cls(len(records), categories=categories)
+        if not records:
+            return store
+
+        unknown = set().union(*(r.keys() for r in records)) - set(ALL_FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown agent attributes: {sorted(unknown)}")
+
+        for field in FLOAT_FIELDS + INT_FIELDS:
+            default = FIELD_DEFAULTS.get(field)
+            values = [r.get(field, default) for r in records]
+            if any(v is None for v in values):
+                raise TypeError(f"Missing agent attribute: '{field}'")
+            store._columns[field][:] = values
+
+        for field in CATEGORICAL_FIELDS:
+            default = FIELD_DEFAULTS.get(field)
+            labels = [r.get(field, default) for r in records]
+            if any(label is None for label in labels):
+                raise TypeError(f"Missing agent attribute: '{field}'")
+            store.codes[field][:] = store.encode_many(field, labels)
+
+        if any('position' not in r for r in records):
+            raise TypeError("Missing agent attribute: 'position'")
+        store.position[:] = [r['position'] for r in records]
+        store.position_history = [list(r.get('position_history', [])) for r in records]
+        return store
+
+    @classmethod
+    def from_columns(cls, size: int, columns: Dict[str, Any], codes: Dict[str, np.ndarray],
+                     position: np.ndarray,
+                     categories: Optional[Dict[str, Sequence[str]]] = None) -> 'AgentStore':
+        """
+        Builds a store from whole columns (bulk initialization): numeric values or
+        arrays per field, categorical fields as int codes into `categories`.
+        Fields left out fall back to FIELD_DEFAULTS like in from_records.
+        """
+        store = cls(size, categories=categories)
+        unknown = (set(columns) | set(codes)) - set(FLOAT_FIELDS + INT_FIELDS + CATEGORICAL_FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown agent attributes: {sorted(unknown)}")
+
+        for field in FLOAT_FIELDS + INT_FIELDS:
+            values = columns.get(field, FIELD_DEFAULTS.get(field))
+            if values is None:
+                raise TypeError(f"Missing agent attribute: '{field}'")
+            store._columns[field][:] = values
+
+        for field in CATEGORICAL_FIELDS:
+            if field in codes:
+                store.codes[field][:] = codes[field]
+            elif FIELD_DEFAULTS.get(field) is not None:
+                store.codes[field][:] = store.encode(field, FIELD_DEFAULTS[field])
+            else:
+                raise TypeError(f"Missing agent attribute: '{field}'")
+
+        store.position[:] = position
+        return store
+
+    # --- Columns ---
+    def column(self, field: str) -> np.ndarray:
+        """Returns the backing array of a numeric column (no copy)."""
+        return self._columns[field]
+
+    def has_field(self, field: str) -> bool:
+        return field in ALL_FIELDS
+
+    # --- Categorical Codes ---
+    def register_categories(self, field: str, labels: Sequence[str]) -> np.ndarray:
+        """Ensures all labels exist as categories of `field` and returns their codes."""
+        return self.encode_many(field, labels)
+
+    def encode(self, field: str, label: str) -> int:
+        index = self._category_index[field]
+        code = index.get(label)
+        if code is None:
+            code = len(self.categories[field])
+            self.categories[field].append(label)
+            index[label] = code
+        return code
+
+    def encode_many(self, field: str, labels: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.encode(field, label) for label in labels), dtype=np.int32, count=len(labels))
+
+    def decode(self, field: str, code: int) -> str:
+        return self.categories[field][code]
+
+    def labels(self, field: str) -> List[str]:
+        """Returns the decoded label of every agent for a categorical field."""
+        cats = np.array(self.categories[field], dtype=object)
+        return cats[self.codes[field]].tolist() if self.size else []
+
+    def counts(self, field: str) -> np.ndarray:
+        """Number of agents per category code."""
+        return np.bincount(self.codes[field], minlength=len(self.categories[field]))
+
+    # --- Derived Values ---
+    def political_positions(self) -> np.ndarray:
+        """
+        Vectorized AgentState.calculate_political_position for all agents.
+        Returns a read-only (N, 2) array of (economic axis a, social axis b),
+        recomputed only after one of POSITION_INPUT_FIELDS has changed.
+        """
+        if self._political_positions is None:
+            vermoegen = self._columns['vermoegen']
+            norm_vermoegen = (vermoegen / (vermoegen + 10000)) * 2 - 1
+            positions = np.empty((self.size, 2), dtype=np.float64)
+            positions[:, 0] = norm_vermoegen - (self._columns['altruism_factor'] * 0.5)
+            positions[:, 1] = (2.0 * self._columns['freedom_preference']) - 1.0
+            np.clip(positions, -1.0, 1.0, out=positions)
+            positions.flags.writeable = False
+            self._political_positions = positions
+        return self._political_positions
+
+    def cached_political_positions(self) -> Optional[np.ndarray]:
+        """Returns the cached positions, or None if they are stale (never recomputes)."""
+        return self._political_positions
+
+    def invalidate_political_positions(self):
+        self._political_positions = None
+
+    # --- Position History ---
+    def record_position_history(self, max_length: int = 20):
+        """Appends the current position to every agent's history, keeping the last `max_length` entries."""
+        positions = list(map(tuple, self.position.tolist()))
+        for history, pos in zip(self.position_history, positions):
+            history.append(pos)
+            if len(history) > max_length:
+                del history[0]
+
+
+def group_rows(codes: np.ndarray, num_groups: int) -> List[np.ndarray]:
+    """
+    Row indices per code 0..num_groups-1, each in ascending order, from one stable
+    sort of the codes instead of one full-population mask per group.
+    """
+    order = np.argsort(codes, kind='stable')
+    bounds = np.cumsum(np.bincount(codes, minlength=num_groups))
+    return np.split(order, bounds[:-1])
+
+
+def _column_property(field: str) -> property:
+    def getter(self: AgentStore) -> np.ndarray:
+        return self._columns[field]
+
+    def setter(self: AgentStore, value) -> None:
+        column = self._columns[field]
+        if value is not column:
+            column[...] = value
+        if invalidates_positions:
+            self._political_positions = None
+
+    invalidates_positions = field in POSITION_INPUT_FIELDS
+    return property(getter, setter, doc=f"Column '{field}' for all agents.")
+
+
+for _field in FLOAT_FIELDS + INT_FIELDS:
+    setattr(AgentStore, _field, _column_property(_field))
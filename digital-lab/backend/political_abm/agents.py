@@ -1,5 +1,4 @@
 import mesa
-import random
 import numpy as np
 from .types import AgentState
 import sys
@@ -12,17 +11,19 @@ class PoliticalAgent(mesa.Agent):
     An agent with political beliefs, economic status, and learning capabilities.
     Implementation is based on MODEL_SPECIFICATION.md v3.0.0.
     """
-    def __init__(self, unique_id, model, **kwargs):
+    def __init__(self, unique_id, model, state: AgentState = None, **kwargs):
         # Mesa 3.2.0+ - manual initialization without super() to avoid conflicts
         self.unique_id = unique_id
         self.model = model
-        # The agent's entire state is encapsulated in the AgentState dataclass
-        self.state = AgentState(**kwargs)
+        # The agent's entire state is an AgentState view onto one row of the model's AgentStore.
+        # Passing plain attributes instead creates a detached state (e.g. for isolated tests).
+        self.state = state if state is not None else AgentState.from_values(**kwargs)
 
-    def decide_and_act(self, ersparnis: float, params: dict) -> dict:
+    def decide_and_act(self, ersparnis: float, params: dict, draw: float = None) -> dict:
         """
         Agent makes a socio-economic decision: how much savings to invest.
         This decision is influenced by risk aversion and time preference.
+        `draw` is an optional pre-drawn uniform [0, 1) number deciding the investment outcome.
         Returns a dictionary with the investment amount and its outcome.
         """
         # --- Investment Decision ---
@@ -41,8 +42,11 @@ class PoliticalAgent(mesa.Agent):
         investment_return_factor = params['investment_return_factor']
         success_probability = params['investment_success_probability']
         
+        if draw is None:
+            draw = self.model.streams['investment'].random()
+
         investment_gain = 0
-        if random.random() < success_probability:
+        if draw < success_probability:
             # Successful investment
             investment_gain = final_investment * investment_return_factor
         else:
@@ -164,6 +168,69 @@ class PoliticalAgent(mesa.Agent):
         # Ensure it's clipped between 0 and 1
         self.state.risikoaversion = max(0.0, min(1.0, self.state.risikoaversion))
 
+    # --- Vectorized whole-population counterparts ---
+    # Each *_batch method mirrors the per-agent method above on AgentStore columns,
+    # using the same operation order so both engines produce identical results.
+
+    @staticmethod
+    def decide_and_act_batch(store, ersparnis: np.ndarray, params: dict, draws: np.ndarray) -> tuple:
+        """Vectorized decide_and_act. Returns (investment_made, investment_gain) arrays."""
+        potential_investment = ersparnis * params['max_investment_rate']
+        risk_adjusted_investment = potential_investment * (1 - store.risikoaversion)
+        final_investment = risk_adjusted_investment * (1 - store.zeitpraeferenzrate)
+
+        success = draws < params['investment_success_probability']
+        investment_gain = np.where(
+            success,
+            final_investment * params['investment_return_factor'],
+            -final_investment
+        )
+        store.vermoegen += investment_gain
+        return final_investment, investment_gain
+
+    @staticmethod
+    def learn_batch(store, delta_u_ego: np.ndarray, delta_u_sozial: np.ndarray, env_health: np.ndarray,
+                    biome_capacity: np.ndarray, learning_params: dict):
+        """Vectorized fallback formula of learn()."""
+        delta_trad = delta_u_sozial - delta_u_ego
+        s_env = (learning_params['altruism_target_crisis'] - store.altruism_factor) * (1 - env_health / biome_capacity)
+        L_signal = delta_trad + learning_params['crisis_weighting_beta'] * s_env
+        eta = learning_params['max_learning_rate_eta_max'] / (1.0 + learning_params['education_dampening_k'] * store.bildung)
+        adjustment = eta * L_signal
+        store.altruism_factor = np.clip(store.altruism_factor + adjustment, 0.0, 1.0)
+
+    @staticmethod
+    def learn_from_media_batch(store, source_social_axis: np.ndarray, influence_factor: float, params: dict):
+        """Vectorized learn_from_media. `source_social_axis` holds each agent's chosen source position."""
+        education_weight = params['cognitive_moderator_education_weight']
+        capacity_weight = params['cognitive_moderator_capacity_weight']
+        cognitive_moderator = 1 - (store.bildung * education_weight + store.effektive_kognitive_kapazitaet * capacity_weight)
+        base_learning_rate = influence_factor * cognitive_moderator
+
+        target_freedom_preference = (source_social_axis + 1) / 2.0
+        current_pref = store.freedom_preference
+        adjustment = (target_freedom_preference - current_pref) * base_learning_rate
+        store.freedom_preference = np.clip(current_pref + adjustment, 0.0, 1.0)
+
+    @staticmethod
+    def update_psychological_states_batch(store, params: dict):
+        """Vectorized update_psychological_states."""
+        wealth_threshold = params['wealth_threshold_cognitive_stress']
+        max_penalty = params['max_cognitive_penalty']
+        vermoegen = store.vermoegen
+
+        penalty_factor = (wealth_threshold - vermoegen) / wealth_threshold
+        penalty = max_penalty * penalty_factor
+        effective = np.where(
+            vermoegen < wealth_threshold,
+            store.kognitive_kapazitaet_basis * (1 - penalty),
+            store.kognitive_kapazitaet_basis
+        )
+        store.effektive_kognitive_kapazitaet = np.clip(effective, 0.0, 1.0)
+
+        wealth_sensitivity_factor = params['wealth_sensitivity_factor']
+        store.risikoaversion = np.clip(1 / (1 + (vermoegen / wealth_sensitivity_factor)), 0.0, 1.0)
+
     def step(self):
         """
         The step method is intentionally left empty.
@@ -0,0 +1,39 @@
+import numpy as np
+from typing import Dict, List, Mapping, Sequence
+from .agent_store import group_rows
+from .samplers import Sampler, compile_sampler
+
+
+class BiomeTable:
+    """
+    Biome parameters as arrays indexed by biome code.
+
+    A biome's code is its position in the config, which is also its code in the
+    AgentStore 'region' column, so `table.hazard_impact_factor[store.codes['region']]`
+    expands a parameter to all agents in one gather instead of a name scan per agent.
+    """
+
+    def __init__(self, biomes: Sequence):
+        self.biomes = list(biomes)
+        self.names: List[str] = [b.name for b in self.biomes]
+        self.codes: Dict[str, int] = {name: code for code, name in enumerate(self.names)}
+        self.sozialleistungs_niveau = self._column('sozialleistungs_niveau')
+        self.hazard_impact_factor = self._column('hazard_impact_factor')
+        self.capacity = self._column('capacity')
+        # Income/wealth distributions compiled once, shared by initialization and income draws
+        self.income_samplers: List[Sampler] = [compile_sampler(b.einkommen_verteilung) for b in self.biomes]
+        self.wealth_samplers: List[Sampler] = [compile_sampler(b.vermoegen_verteilung) for b in self.biomes]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _column(self, attr: str) -> np.ndarray:
+        return np.array([getattr(b, attr) for b in self.biomes], dtype=float)
+
+    def values(self, per_biome: Mapping[str, float]) -> np.ndarray:
+        """Array in code order from a {biome name: value} mapping (e.g. effective parameters)."""
+        return np.array([per_biome[name] for name in self.names], dtype=float)
+
+    def groups(self, codes: np.ndarray) -> List[np.ndarray]:
+        """Agent indices per biome code, each in ascending order (see group_rows)."""
+        return group_rows(codes, len(self.names))
@@ -0,0 +1,98 @@
+import numpy as np
+from typing import Dict, Sequence, Tuple, Union
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+# Percentiles reported by inequality_summary()
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def sorted_nonnegative(values: ArrayLike, presorted: bool = False) -> np.ndarray:
+    """
+    Returns the ascending, non-negative part of `values` as a float array.
+    Negative values (debt) are excluded from all inequality measures.
+    Pass presorted=True to skip the O(n log n) sort when `values` is already ascending.
+    """
+    x = np.asarray(values, dtype=float)
+    if not presorted:
+        x = np.sort(x)
+    # Sorted ascending: negatives form a prefix
+    return x[np.searchsorted(x, 0.0, side='left'):]
+
+
+def gini(values: ArrayLike, presorted: bool = False) -> float:
+    """
+    Gini coefficient in O(n log n) (O(n) if presorted) via the sorted-cumsum formula:
+    G = 2 * sum(i * x_i) / (n * sum(x)) - (n + 1) / n   with i = 1..n over ascending x.
+    """
+    x = sorted_nonnegative(values, presorted)
+    n = len(x)
+    if n == 0:
+        return 0
+    total = x.sum()
+    if total == 0:
+        return 0
+    index = np.arange(1, n + 1, dtype=float)
+    return float((2.0 * np.dot(index, x)) / (n * total) - (n + 1) / n)
+
+
+def top_share(values: ArrayLike, share: float = 0.1, presorted: bool = False) -> float:
+    """Fraction of the total held by the top `share` of the population (e.g. 0.1 = top 10%)."""
+    x = sorted_nonnegative(values, presorted)
+    n = len(x)
+    if n == 0:
+        return 0
+    total = x.sum()
+    if total == 0:
+        return 0
+    k = max(1, int(np.ceil(n * share)))
+    return float(x[n - k:].sum() / total)
+
+
+def lorenz_curve(values: ArrayLike, presorted: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lorenz curve points (population share, cumulative value share), both starting at 0.
+    """
+    x = sorted_nonnegative(values, presorted)
+    n = len(x)
+    population = np.linspace(0.0, 1.0, n + 1)
+    cumulative = np.concatenate(([0.0], np.cumsum(x)))
+    total = cumulative[-1]
+    if total == 0:
+        return population, population.copy()
+    return population, cumulative / total
+
+
+def percentiles(values: ArrayLike, q: Sequence[float], presorted: bool = False) -> np.ndarray:
+    """
+    Percentiles with linear interpolation (same as np.percentile's default method).
+    Unlike gini/top_share, all values including negatives are considered.
+    """
+    x = np.asarray(values, dtype=float)
+    if not presorted:
+        x = np.sort(x)
+    n = len(x)
+    if n == 0:
+        return np.zeros(len(q))
+    positions = np.asarray(q, dtype=float) / 100.0 * (n - 1)
+    lower = np.floor(positions).astype(int)
+    upper = np.minimum(lower + 1, n - 1)
+    fraction = positions - lower
+    return x[lower] + (x[upper] - x[lower]) * fraction
+
+
+def inequality_summary(values: ArrayLike, presorted: bool = False,
+                       q: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+    """
+    Gini, top-10% share and percentiles computed from a single sort.
+    """
+    x = np.asarray(values, dtype=float)
+    if not presorted:
+        x = np.sort(x)
+    summary = {
+        "gini": gini(x, presorted=True),
+        "top10_share": top_share(x, 0.1, presorted=True),
+    }
+    for p, value in zip(q, percentiles(x, q, presorted=True).tolist()):
+        summary[f"p{int(p)}"] = value
+    return summary
@@ -0,0 +1,29 @@
+import numpy as np
+
+
+class InvestmentDecisions:
+    """
+    Investment decisions of one step as arrays aligned with the AgentStore rows
+    (row i is model.agent_set[i]): amount invested and gain (negative on failure).
+
+    Per-biome totals are computed once, with a grouped bincount over the region
+    codes, and shared by the environment feedback, the model report and record_step.
+    """
+
+    def __init__(self, investment_made=None, investment_gain=None, region_codes=None, num_biomes: int = 0):
+        self.investment_made = np.asarray(investment_made if investment_made is not None else [], dtype=float)
+        self.investment_gain = np.asarray(investment_gain if investment_gain is not None else [], dtype=float)
+        codes = np.asarray(region_codes if region_codes is not None else [], dtype=np.intp)
+        self.totals_per_biome = np.bincount(codes, weights=self.investment_made, minlength=num_biomes)
+
+    def __len__(self) -> int:
+        return len(self.investment_made)
+
+    def to_records(self, model) -> list:
+        """Per-agent dicts (agent_id, investment_made, investment_gain) for logging and debugging."""
+        return [
+            {"agent_id": agent.unique_id, "investment_made": made, "investment_gain": gain}
+            for agent, made, gain in zip(
+                model.agent_set, self.investment_made.tolist(), self.investment_gain.tolist()
+            )
+        ]
@@ -1,4 +1,40 @@
-import random
+import numpy as np
+
+
+class HazardEvents:
+    """
+    Hazard hits of one step as aligned arrays: agent row in the AgentStore, biome code,
+    wealth and income lost.
+    """
+
+    def __init__(self, agent_index=None, biome_code=None, wealth_loss=None, income_loss=None):
+        self.agent_index = np.asarray(agent_index if agent_index is not None else [], dtype=np.intp)
+        self.biome_code = np.asarray(biome_code if biome_code is not None else [], dtype=np.intp)
+        self.wealth_loss = np.asarray(wealth_loss if wealth_loss is not None else [], dtype=float)
+        self.income_loss = np.asarray(income_loss if income_loss is not None else [], dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.agent_index)
+
+    def counts_per_biome(self, num_biomes: int) -> np.ndarray:
+        return np.bincount(self.biome_code, minlength=num_biomes)
+
+    def to_records(self, model) -> list:
+        """Per-event dicts (agent_id, biome, wealth_loss, income_loss) for logging and debugging."""
+        names = model.biome_table.names
+        return [
+            {
+                "agent_id": model.agent_set[idx].unique_id,
+                "biome": names[code],
+                "wealth_loss": w_loss,
+                "income_loss": i_loss
+            }
+            for idx, code, w_loss, i_loss in zip(
+                self.agent_index.tolist(), self.biome_code.tolist(),
+                self.wealth_loss.tolist(), self.income_loss.tolist()
+            )
+        ]
+
 
 class HazardManager:
     """
@@ -6,44 +42,75 @@ class HazardManager:
     """
     def __init__(self, model):
         self.model = model
-        self.events_this_step = [] # Optional: for logging/reporting
+        self.events = HazardEvents()  # Hits of the current step (arrays)
         print("HazardManager initialized.")
 
+    @property
+    def events_this_step(self) -> list:
+        """The current step's hazard events as dicts (built on demand from self.events)."""
+        return self.events.to_records(self.model)
+
     def trigger_events(self):
         """
-        Iterates through all agents and applies hazard shocks based on biome probabilities.
+        Per-agent reference implementation: iterates through all agents and applies
+        hazard shocks based on their biome's effective probability.
         """
-        self.events_this_step.clear()
-
-        for agent in self.model.agent_set:
-            biome = next(b for b in self.model.biomes if b.name == agent.state.region)
-            
-            # VERWENDE DEN EFFEKTIVEN WERT
-            hazard_prob = self.model.effective_hazard_probabilities[agent.state.region]
-            
+        table = self.model.biome_table
+        region_codes = self.model.agent_store.codes['region']
+        hazard_probs = table.values(self.model.effective_hazard_probabilities)
+        # One uniform draw per agent, shared with trigger_events_batch
+        draws = self.model.streams['hazards'].random(len(self.model.agent_set))
+
+        hits, codes, wealth_losses, income_losses = [], [], [], []
+        for i, agent in enumerate(self.model.agent_set):
+            code = region_codes[i]
+
             # Check if a hazard event occurs for this agent
-            if random.random() < hazard_prob:
-                
+            if draws[i] < hazard_probs[code]:
+
                 # Apply the economic shock
-                impact_factor = biome.hazard_impact_factor
-                
+                impact_factor = table.hazard_impact_factor[code]
+
                 wealth_loss = agent.state.vermoegen * impact_factor
                 income_loss = agent.state.einkommen * impact_factor # Assuming shock affects current income too
-                
+
                 agent.state.vermoegen -= wealth_loss
                 agent.state.einkommen -= income_loss
-                
+
                 # Ensure wealth doesn't go negative
                 agent.state.vermoegen = max(0.0, agent.state.vermoegen)
                 agent.state.einkommen = max(0.0, agent.state.einkommen)
-                
-                # Log the event for reporting
-                self.events_this_step.append({
-                    "agent_id": agent.unique_id,
-                    "biome": biome.name,
-                    "wealth_loss": wealth_loss,
-                    "income_loss": income_loss
-                })
-
-                # Optional: Print to console for real-time debugging
-                # print(f"Hazard Event triggered for Agent {agent.unique_id} in {biome.name}! Wealth loss: {wealth_loss:.2f}")
\ No newline at end of file
+
+                hits.append(i)
+                codes.append(code)
+                wealth_losses.append(wealth_loss)
+                income_losses.append(income_loss)
+
+        self.events = HazardEvents(hits, codes, wealth_losses, income_losses)
+
+    def trigger_events_batch(self):
+        """
+        Vectorized trigger_events: one Bernoulli draw for the whole population against
+        each agent's biome probability (gathered by region code), shocks applied by mask.
+        """
+        store = self.model.agent_store
+        table = self.model.biome_table
+        draws = self.model.streams['hazards'].random(len(store))
+
+        region_codes = store.codes['region']
+        hazard_probs = table.values(self.model.effective_hazard_probabilities)
+
+        hit = np.flatnonzero(draws < hazard_probs[region_codes])
+        if len(hit) == 0:
+            self.events = HazardEvents()
+            return
+
+        codes = region_codes[hit]
+        impact = table.hazard_impact_factor[codes]
+        wealth_loss = store.vermoegen[hit] * impact
+        income_loss = store.einkommen[hit] * impact
+        store.vermoegen[hit] = np.maximum(0.0, store.vermoegen[hit] - wealth_loss)
+        store.einkommen[hit] = np.maximum(0.0, store.einkommen[hit] - income_loss)
+        store.invalidate_political_positions()
+
+        self.events = HazardEvents(hit, codes, wealth_loss, income_loss)
@@ -1,5 +1,4 @@
 import numpy as np
-import random
 from ..types import AgentState
 import sys
 import os
@@ -12,40 +11,51 @@ class MediaManager:
     Manages media sources and agent exposure to media.
     """
     
-    def __init__(self, model, media_sources: list[MediaSourceConfig]):
+    def __init__(self, model, media_sources: list[MediaSourceConfig], rng: np.random.Generator = None):
         self.model = model
         self.media_sources = media_sources
+        # Seeded generator for source sampling (defaults to the model's media stream)
+        self.rng = rng if rng is not None else model.streams['media']
+        # (S, 2) matrix of source positions (economic axis, social axis)
+        self.source_positions = np.array([
+            (s.ideological_position.economic_axis, s.ideological_position.social_axis)
+            for s in media_sources
+        ], dtype=float).reshape(len(media_sources), 2)
         print(f"MediaManager initialized with {len(media_sources)} sources.")
-    
+
+    def selection_weights(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Inverse-distance weight matrix (N, S) between agent positions (N, 2) and all sources.
+        Closer sources get higher weights; the 0.1 offset avoids division by zero.
+        """
+        diff = positions[:, None, :] - self.source_positions[None, :, :]
+        distances = np.sqrt(np.einsum('nsk,nsk->ns', diff, diff))
+        return 1 / (distances + 0.1)
+
+    def select_sources_batch(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Selects one media source per agent based on ideological proximity.
+        `positions` is the (N, 2) political-position matrix; returns (N,) source indices
+        into self.media_sources, sampled with one cumulative-weight draw for all agents.
+        """
+        if not self.media_sources:
+            raise ValueError("No media sources configured.")
+
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        cum_weights = np.cumsum(self.selection_weights(positions), axis=1)
+        # Same rule as random.choices: first source whose cumulative weight exceeds u * total
+        thresholds = self.rng.random(len(positions)) * cum_weights[:, -1]
+        chosen = (cum_weights <= thresholds[:, None]).sum(axis=1)
+        return np.minimum(chosen, len(self.media_sources) - 1)
+
     def select_source_for_agent(self, agent_state: AgentState) -> MediaSourceConfig:
         """
         Selects a media source for an agent based on ideological proximity.
         Agents are more likely to choose sources closer to their own views.
+        Single-agent wrapper around select_sources_batch.
         """
         if not self.media_sources:
             raise ValueError("No media sources configured.")
 
-        agent_pos = agent_state.calculate_political_position()
-        
-        distances = []
-        for source in self.media_sources:
-            source_pos = (
-                source.ideological_position.economic_axis,
-                source.ideological_position.social_axis
-            )
-            # Calculate Euclidean distance in the 2D political space
-            dist = np.linalg.norm(np.array(agent_pos) - np.array(source_pos))
-            distances.append(dist)
-        
-        # Convert distances to probabilities (closer distance = higher probability)
-        # We use an inverse weighting scheme. Adding a small epsilon to avoid division by zero.
-        weights = [1 / (d + 0.1) for d in distances]
-        
-        # Normalize weights to sum to 1
-        total_weight = sum(weights)
-        probabilities = [w / total_weight for w in weights]
-        
-        # Select one source based on the calculated probabilities
-        selected_source = random.choices(self.media_sources, weights=probabilities, k=1)[0]
-        
-        return selected_source
\ No newline at end of file
+        agent_pos = np.array([agent_state.calculate_political_position()], dtype=float)
+        return self.media_sources[int(self.select_sources_batch(agent_pos)[0])]
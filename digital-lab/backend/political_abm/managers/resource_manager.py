@@ -1,5 +1,4 @@
 import numpy as np
-from ..utils import generate_attribute_value
 
 class ResourceManager:
     """
@@ -10,9 +9,11 @@ class ResourceManager:
         print("ResourceManager initialized.")
     
     def _handle_consumption_saving(self):
-        """Calculates consumption/saving for each agent and updates wealth."""
+        """
+        Calculates consumption/saving for each agent and updates wealth.
+        Returns this step's savings as an array aligned with model.agent_set.
+        """
         params = self.model.simulation_parameters
-        savings_this_step = {}
 
         # Batch via registry if enabled and handle present
         use_batch = bool(getattr(self.model, 'formula_registry_enabled', False)) and bool(getattr(self.model, 'registry_handles', {}).get('consumption_rate'))
@@ -20,31 +21,27 @@ class ResourceManager:
             try:
                 from formula_registry import registry as formula_registry  # type: ignore
                 handle = self.model.registry_handles.get('consumption_rate')
-                # Build arrays
-                zpref = np.array([a.state.zeitpraeferenzrate for a in self.model.agent_set], dtype=float)
-                risk = np.array([a.state.risikoaversion for a in self.model.agent_set], dtype=float)
-                incomes = np.array([a.state.einkommen for a in self.model.agent_set], dtype=float)
+                store = self.model.agent_store
                 inputs = {
-                    'zeitpraeferenzrate': zpref,
-                    'risikoaversion': risk,
+                    'zeitpraeferenzrate': store.zeitpraeferenzrate,
+                    'risikoaversion': store.risikoaversion,
                     'base_consumption_rate': float(params['base_consumption_rate']),
                     'zeitpraeferenz_sensitivity': float(params['zeitpraeferenz_sensitivity']),
                     'risikoaversion_sensitivity': float(params['risikoaversion_sensitivity']),
                 }
                 konsumquote_arr = formula_registry.evaluate_batch_handle(handle, inputs)
-                konsumierter = incomes * konsumquote_arr
-                ersparnis_arr = incomes - konsumierter
-                # assign back
-                for i, agent in enumerate(self.model.agent_set):
-                    agent.state.vermoegen += float(ersparnis_arr[i])
-                    agent.state.konsumquote = float(konsumquote_arr[i])
-                    agent.state.ersparnis = float(ersparnis_arr[i])
-                    savings_this_step[agent.unique_id] = float(ersparnis_arr[i])
-                return savings_this_step
+                konsumierter = store.einkommen * konsumquote_arr
+                ersparnis_arr = store.einkommen - konsumierter
+                # write columns directly
+                store.vermoegen += ersparnis_arr
+                store.konsumquote = konsumquote_arr
+                store.ersparnis = ersparnis_arr
+                return store.ersparnis.copy()
             except Exception:
                 use_batch = False
 
-        for agent in self.model.agent_set:
+        savings_this_step = np.zeros(len(self.model.agent_set), dtype=float)
+        for i, agent in enumerate(self.model.agent_set):
             quote = (params['base_consumption_rate'] +
                      (agent.state.zeitpraeferenzrate - 0.5) * params['zeitpraeferenz_sensitivity'] +
                      (agent.state.risikoaversion - 0.5) * params['risikoaversion_sensitivity'])
@@ -54,30 +51,77 @@ class ResourceManager:
             agent.state.vermoegen += ersparnis
             agent.state.konsumquote = konsumquote
             agent.state.ersparnis = ersparnis
-            savings_this_step[agent.unique_id] = ersparnis
+            savings_this_step[i] = ersparnis
         
         return savings_this_step
 
     def update_agent_resources(self):
         """Calculates and assigns income, updates wealth for all agents."""
         # --- Income Generation ---
-        incomes = []
-        for agent in self.model.agent_set:
-            biome = next(b for b in self.model.biomes if b.name == agent.state.region)
-            income = generate_attribute_value(biome.einkommen_verteilung)
-            agent.state.einkommen = income
-            incomes.append(income)
+        rng = self.model.streams['income']
+        table = self.model.biome_table
+        region_codes = self.model.agent_store.codes['region']
+        agents = self.model.agent_set
+        incomes = np.empty(len(agents), dtype=float)
+        # One draw per agent, taken biome by biome so the income stream is consumed
+        # in the same order as update_agent_resources_batch
+        for sampler, rows in zip(table.income_samplers, table.groups(region_codes)):
+            for i in rows.tolist():
+                income = sampler.sample_one(rng)
+                agents[i].state.einkommen = income
+                incomes[i] = income
         
         # --- Social Benefits ---
-        if not incomes: return {} # Guard clause - return empty savings
+        if len(incomes) == 0: return np.zeros(0) # Guard clause - return empty savings
         
         median_income = np.median(incomes)
-        for agent in self.model.agent_set:
-            biome = next(b for b in self.model.biomes if b.name == agent.state.region)
-            benefit = median_income * biome.sozialleistungs_niveau
+        for i, agent in enumerate(self.model.agent_set):
+            benefit = median_income * table.sozialleistungs_niveau[region_codes[i]]
             agent.state.sozialleistungen = benefit
             # Add benefit to income for this step
             agent.state.einkommen += benefit
 
         # NEU: Rufe die Konsum-Logik auf und gib die Ersparnisse zurück
         return self._handle_consumption_saving()
+
+    def update_agent_resources_batch(self):
+        """
+        Vectorized update_agent_resources: draws incomes per biome in one call (agents
+        grouped by region code once) and computes benefits, consumption and saving as
+        whole-population array operations.
+        """
+        store = self.model.agent_store
+        if len(store) == 0:
+            return np.zeros(0)
+        params = self.model.simulation_parameters
+        region_codes = store.codes['region']
+
+        table = self.model.biome_table
+
+        # --- Income Generation (one draw per biome) ---
+        rng = self.model.streams['income']
+        incomes = np.empty(len(store), dtype=float)
+        for sampler, rows in zip(table.income_samplers, table.groups(region_codes)):
+            if len(rows):
+                incomes[rows] = sampler.sample(rng, len(rows))
+
+        # --- Social Benefits ---
+        median_income = np.median(incomes)
+        benefits = median_income * table.sozialleistungs_niveau[region_codes]
+        store.sozialleistungen = benefits
+        store.einkommen = incomes + benefits
+
+        # --- Consumption & Saving ---
+        if bool(getattr(self.model, 'formula_registry_enabled', False)) and bool(getattr(self.model, 'registry_handles', {}).get('consumption_rate')):
+            return self._handle_consumption_saving()
+
+        quote = (params['base_consumption_rate'] +
+                 (store.zeitpraeferenzrate - 0.5) * params['zeitpraeferenz_sensitivity'] +
+                 (store.risikoaversion - 0.5) * params['risikoaversion_sensitivity'])
+        konsumquote = np.clip(quote, 0.0, 1.0)
+        konsumierter_betrag = store.einkommen * konsumquote
+        ersparnis = store.einkommen - konsumierter_betrag
+        store.vermoegen += ersparnis
+        store.konsumquote = konsumquote
+        store.ersparnis = ersparnis
+        return ersparnis
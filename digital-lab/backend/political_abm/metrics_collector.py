@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .inequality import gini, sorted_nonnegative, top_share
+
+
+def _mean(values: np.ndarray) -> float:
+    return float(values.mean()) if len(values) else 0.0
+
+
+class _StepValues:
+    """Per-collect scratch space so metrics sharing an expensive input (e.g. the sorted wealth column) compute it once."""
+
+    def __init__(self, model):
+        self.model = model
+        self.store = model.agent_store
+        self._sorted_wealth: Optional[np.ndarray] = None
+
+    @property
+    def sorted_wealth(self) -> np.ndarray:
+        if self._sorted_wealth is None:
+            self._sorted_wealth = sorted_nonnegative(self.store.vermoegen)
+        return self._sorted_wealth
+
+
+# Scalar metrics computed directly from the agent arrays, by name
+METRICS: Dict[str, Callable[[_StepValues], float]] = {
+    'gini': lambda v: gini(v.sorted_wealth, presorted=True),
+    'top10_share': lambda v: top_share(v.sorted_wealth, 0.1, presorted=True),
+    'gini_income': lambda v: gini(v.store.einkommen),
+    'avg_wealth': lambda v: _mean(v.store.vermoegen),
+    'avg_income': lambda v: _mean(v.store.einkommen),
+    'avg_consumption': lambda v: _mean(v.store.einkommen * v.store.konsumquote),
+    'mean_altruism': lambda v: _mean(v.store.altruism_factor),
+    'mean_freedom': lambda v: _mean(v.store.freedom_preference),
+    'mean_effective_cognition': lambda v: _mean(v.store.effektive_kognitive_kapazitaet),
+    'mean_risk_aversion': lambda v: _mean(v.store.risikoaversion),
+    'hazard_events': lambda v: float(len(v.model.hazard_manager.events)),
+}
+
+
+class MetricsCollector:
+    """
+    Records a declared set of scalar metrics once per step into a preallocated
+    (steps x metrics) float buffer, without building report dicts.
+
+    Attached collectors are filled at the end of every PoliticalModel.step()
+    (see PoliticalModel.add_metrics_collector). The buffer doubles when full, so
+    `capacity` only needs to be a good guess (e.g. the run length).
+    """
+
+    def __init__(self, model, metrics: Sequence[str], capacity: int = 1024):
+        unknown = [name for name in metrics if name not in METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics {unknown}. Expected any of {sorted(METRICS)}.")
+        self.model = model
+        self.metrics: List[str] = list(metrics)
+        self._columns = {name: j for j, name in enumerate(self.metrics)}
+        self._functions = [METRICS[name] for name in self.metrics]
+        self.values = np.empty((max(1, capacity), len(self.metrics)), dtype=float)
+        self.steps = np.empty(max(1, capacity), dtype=np.int64)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def compute(self) -> np.ndarray:
+        """The metrics of the current model state, in declaration order."""
+        values = _StepValues(self.model)
+        return np.array([fn(values) for fn in self._functions], dtype=float)
+
+    def collect(self):
+        """Appends the metrics of the current model state as the next row."""
+        if self.size == len(self.steps):
+            self.values = np.concatenate((self.values, np.empty_like(self.values)))
+            self.steps = np.concatenate((self.steps, np.empty_like(self.steps)))
+        self.values[self.size] = self.compute()
+        self.steps[self.size] = getattr(self.model, 'step_count', 0)
+        self.size += 1
+
+    def series(self, name: str) -> np.ndarray:
+        """Recorded values of one metric (a view into the buffer)."""
+        return self.values[:self.size, self._columns[name]]
+
+    def latest(self) -> Dict[str, float]:
+        """Last recorded row as {metric: value} (the current state if nothing was recorded yet)."""
+        row = self.values[self.size - 1] if self.size else self.compute()
+        return dict(zip(self.metrics, row.tolist()))
+
+    def to_dict(self) -> Dict[str, List[float]]:
+        """All recorded series as {metric: [values]} (JSON-ready)."""
+        return {name: self.values[:self.size, j].tolist() for name, j in self._columns.items()}
@@ -0,0 +1,34 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+
+class MilieuClassifier:
+    """
+    Nearest-center ("best fit") milieu classification for the whole population.
+
+    The (M, 2) matrix of ideological centers is built once per milieu config version;
+    classifying N positions is a single broadcasted squared-distance argmin. Ties go
+    to the milieu listed first in the config.
+    """
+
+    def __init__(self, milieus: Sequence):
+        self.names: List[str] = [m.name for m in milieus]
+        self.centers = np.array([
+            (m.ideological_center.economic_axis, m.ideological_center.social_axis)
+            for m in milieus
+        ], dtype=float).reshape(len(self.names), 2)
+
+    def classify(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (indices into `names` of each position's nearest center, agents per milieu).
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if not self.names:
+            raise ValueError("No milieus configured.")
+        diff = positions[:, None, :] - self.centers[None, :, :]
+        nearest = np.argmin(np.einsum('nmk,nmk->nm', diff, diff), axis=1)
+        return nearest, np.bincount(nearest, minlength=len(self.names))
+
+    def distribution(self, counts: np.ndarray) -> Dict[str, int]:
+        """Maps per-milieu counts to the report's {milieu name: count} form."""
+        return dict(zip(self.names, np.asarray(counts).tolist()))
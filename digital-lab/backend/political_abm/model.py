@@ -1,7 +1,4 @@
 import mesa
-import numpy as np
-import networkx as nx
-import random
 import csv
 import datetime
 import os
@@ -14,7 +11,14 @@ from .managers.seasonality_manager import SeasonalityManager
 from .managers.media_manager import MediaManager
 from .agent_initializer import AgentInitializer
 from .simulation_cycle import SimulationCycle
+from .schablonen_index import SchablonenIndex
+from .milieu_classifier import MilieuClassifier
+from .biome_table import BiomeTable
+from .investments import InvestmentDecisions
+from .random_streams import RandomStreams
 from .utils import generate_attribute_value
+from .model_report import ModelReport
+from .metrics_collector import MetricsCollector
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -22,27 +26,6 @@ from backend.config.manager import manager as config_manager
 from backend.config.models import DistributionConfig
 
 
-def gini(x):
-    """Calculate Gini coefficient for a distribution."""
-    if len(x) == 0:
-        return 0
-    # Remove negative values and sort
-    x = np.array(x)
-    x = x[x >= 0]
-    if len(x) == 0:
-        return 0
-    x = np.sort(x)
-    if np.sum(x) == 0:
-        return 0
-    # Calculate Gini coefficient
-    total = 0
-    for i, xi in enumerate(x[:-1], 1):
-        total += np.sum(np.abs(xi - x[i:]))
-    return total / (len(x)**2 * np.mean(x))
-
-
-
-
 class PoliticalModel(mesa.Model):
     """
     The main model for simulating political opinion dynamics.
@@ -66,9 +49,32 @@ class PoliticalModel(mesa.Model):
         return layout
     
 
-    def __init__(self, num_agents=100, network_connections=5):
-        super().__init__()
+    ENGINES = ('vectorized', 'agent')
+
+    # Scalar CSV recording columns and the collector metric behind each
+    RECORDING_METRICS = (
+        ('Mean_Freedom', 'mean_freedom'),
+        ('Mean_Altruism', 'mean_altruism'),
+        ('Durchschnittsvermoegen', 'avg_wealth'),
+        ('Durchschnittseinkommen', 'avg_income'),
+        ('Durchschnittlicher_Konsum', 'avg_consumption'),
+        ('Gini_Vermoegen', 'gini'),
+        ('Gini_Einkommen', 'gini_income'),
+        ('Hazard_Events_Count', 'hazard_events'),
+    )
+
+    def __init__(self, num_agents=100, network_connections=5, engine=None, seed=None):
+        # Per-phase random streams derived from one seed (random if None, see self.seed)
+        self.streams = RandomStreams(seed)
+        self.seed = self.streams.seed
+        super().__init__(seed=self.seed)
         self.num_agents = num_agents
+        # Edges each new agent attaches in the preferential-attachment network (model.network)
+        self.network_connections = network_connections
+        # Step engine: "vectorized" (whole-population NumPy) or "agent" (per-agent reference)
+        self.engine = engine or os.getenv('SIMULATION_ENGINE', 'vectorized').lower()
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Unknown simulation engine '{self.engine}'. Expected one of {self.ENGINES}.")
         # Mesa 3.2.0+ - use simple list for agent management
         self.agent_set = []
         self.step_count = 0
@@ -78,10 +84,20 @@ class PoliticalModel(mesa.Model):
         full_config = config_manager.get_config()
         self.media_sources = config_manager.get_media_sources()  # Medienquellen laden
         self.output_schablonen = config_manager.get_output_schablonen()  # Output-Schablonen für Klassifizierung
+        self.output_schablonen_version = config_manager.output_schablonen_version
+        self.schablonen_index = SchablonenIndex(self.output_schablonen)
         self.milieus = config_manager.get_milieus()  # NEW: Use streamlined milieus für Agent-Initialisierung
+        self.milieus_version = config_manager.milieus_version
+        self.milieu_classifier = MilieuClassifier(self.milieus)
+        # Agents per milieu from the latest dynamic classification (none assigned before the first step)
+        self.milieu_distribution = {m.name: 0 for m in self.milieus}
         
         # --- Load Config and Instantiate Managers ---
         self.biomes = full_config.biomes
+        # Biome parameters indexed by biome code (== AgentStore region code)
+        self.biome_table = BiomeTable(self.biomes)
+        # Investment decisions of the last step (arrays aligned with agent rows)
+        self.investments = InvestmentDecisions(num_biomes=len(self.biomes))
         self.agent_initialization = full_config.agent_initialization
         self.agent_params = full_config.agent_dynamics.model_dump()
         self.simulation_parameters = full_config.simulation_parameters.model_dump()
@@ -113,11 +129,17 @@ class PoliticalModel(mesa.Model):
             }
 
         # --- Agent Creation (Delegated) ---
+        # The initializer also builds self.agent_store, the columnar backing of all agent states
         initializer = AgentInitializer(self)
         agents = initializer.create_agents()
         for agent in agents:
             self.agent_set.append(agent)
         
+        # Memoized report sections, invalidated after every step
+        self.report = ModelReport(self)
+        # Scalar metric collectors filled at the end of every step
+        self.metrics_collectors = []
+
         # --- Simulation Cycle Initialization (Delegated) ---
         self.cycle = SimulationCycle(self)
         
@@ -126,6 +148,7 @@ class PoliticalModel(mesa.Model):
         self.recording_filepath = None
         self.csv_writer = None
         self.csv_file = None
+        self.recording_metrics = None
         # --- Registry/Pinning info ---
         try:
             from formula_registry import registry as formula_registry  # type: ignore
@@ -213,6 +236,8 @@ class PoliticalModel(mesa.Model):
         
         self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=headers)
         self.csv_writer.writeheader()
+        # Scalar columns come straight from the agent arrays (no report dict per step)
+        self.recording_metrics = MetricsCollector(self, [metric for _, metric in self.RECORDING_METRICS])
         
         self.is_recording = True
 
@@ -226,6 +251,7 @@ class PoliticalModel(mesa.Model):
             self.csv_file = None
             
         self.csv_writer = None
+        self.recording_metrics = None
         self.is_recording = False
         self.recording_filepath = None
 
@@ -234,177 +260,81 @@ class PoliticalModel(mesa.Model):
         if not self.is_recording or not self.csv_writer:
             return
             
-        report = self.get_model_report()['model_report']
+        metrics = self.recording_metrics.compute()
         
         # Prepare row data
         row_data = {
             'step': getattr(self, 'step_count', 0),
-            'Mean_Freedom': report['Mean_Freedom'],
-            'Mean_Altruism': report['Mean_Altruism'],
-            'Polarization': report['Polarization'],
-            'Durchschnittsvermoegen': report['Durchschnittsvermoegen'],
-            'Durchschnittseinkommen': report['Durchschnittseinkommen'],
-            'Durchschnittlicher_Konsum': report['Durchschnittlicher_Konsum'],
-            'Gini_Vermoegen': report['Gini_Vermoegen'],
-            'Gini_Einkommen': report['Gini_Einkommen'],
-            'Hazard_Events_Count': report['Hazard_Events_Count']
+            'Polarization': 0.0  # Placeholder
         }
+        for (column, _), value in zip(self.RECORDING_METRICS, metrics.tolist()):
+            row_data[column] = value
+        row_data['Hazard_Events_Count'] = int(row_data['Hazard_Events_Count'])
         
         # Add region population data
-        regions_data = report.get('Regions', {})
+        store = self.agent_store
+        region_counts = dict(zip(store.categories['region'], store.counts('region').tolist()))
         for region in self.regions:
-            row_data[f'Population_{region}'] = regions_data.get(region, 0)
+            row_data[f'Population_{region}'] = region_counts.get(region, 0)
             
         # Add biome dynamic data
-        biomes_data = report.get('biomes_dynamic_data', {})
-        for biome in self.biomes:
+        investments = self.investments.totals_per_biome.tolist()
+        for biome, total_investment in zip(self.biomes, investments):
             biome_name = biome.name
-            biome_data = biomes_data.get(biome_name, {})
-            row_data[f'Investment_{biome_name}'] = biome_data.get('total_investment', 0)
-            row_data[f'Hazard_Prob_{biome_name}'] = biome_data.get('effective_hazard_probability', 0)
-            row_data[f'Regen_Rate_{biome_name}'] = biome_data.get('effective_regeneration_rate', 0)
+            row_data[f'Investment_{biome_name}'] = total_investment
+            row_data[f'Hazard_Prob_{biome_name}'] = self.effective_hazard_probabilities[biome_name]
+            row_data[f'Regen_Rate_{biome_name}'] = self.effective_regeneration_rates[biome_name]
         
         self.csv_writer.writerow(row_data)
         self.csv_file.flush()  # Ensure data is written immediately
 
+    def add_metrics_collector(self, metrics, capacity: int = 1024) -> MetricsCollector:
+        """Attaches a collector that records `metrics` (names from metrics_collector.METRICS) after every step."""
+        collector = MetricsCollector(self, metrics, capacity)
+        self.metrics_collectors.append(collector)
+        return collector
+
+    def remove_metrics_collector(self, collector: MetricsCollector):
+        self.metrics_collectors.remove(collector)
+
+    @property
+    def investment_decisions_this_step(self) -> list:
+        """The last step's investment decisions as dicts (built on demand from self.investments)."""
+        return self.investments.to_records(self)
+
     def step(self):
         """Delegated to SimulationCycle for execution of the complete 9-phase cycle."""
         self.cycle.run_step()
         
         # Track position history for agents (limit to last 20 positions)
-        for agent in self.agent_set:
-            agent.state.position_history.append(agent.state.position)
-            if len(agent.state.position_history) > 20:
-                agent.state.position_history.pop(0)
+        self.agent_store.record_position_history(max_length=20)
+        self.report.invalidate()
+        for collector in self.metrics_collectors:
+            collector.collect()
         
         self.record_step()
 
-    def get_model_report(self) -> dict:
-        """Collects and formats data for the API endpoint."""
-        agent_reports = [
-            {
-                "id": a.unique_id,
-                "political_position": a.state.calculate_political_position(),
-                "altruism": a.state.altruism_factor,
-                "freedom": a.state.freedom_preference,
-                "region": a.state.region,
-                # Extended data for AgentInspector
-                "alter": a.state.alter,
-                "einkommen": a.state.einkommen,
-                "vermoegen": a.state.vermoegen,
-                "sozialleistungen": a.state.sozialleistungen,
-                "risikoaversion": a.state.risikoaversion,
-                "effektive_kognitive_kapazitaet": a.state.effektive_kognitive_kapazitaet,
-                "kognitive_kapazitaet_basis": a.state.kognitive_kapazitaet_basis,
-                "politische_wirksamkeit": a.state.politische_wirksamkeit,
-                "sozialkapital": a.state.sozialkapital,
-                "schablone": a.state.schablone
-            } for a in self.agent_set
-        ]
-
-        region_counts = {region: 0 for region in self.regions}
-        for agent in self.agent_set:
-            region_counts[agent.state.region] += 1
-
-        # Calculate template distribution
-        schablonen_counts = {}
-        for agent in self.agent_set:
-            template = agent.state.schablone
-            schablonen_counts[template] = schablonen_counts.get(template, 0) + 1
+    def refresh_output_schablonen(self):
+        """Reloads the output Schablonen and rebuilds their index if save_output_schablonen changed them."""
+        if self.output_schablonen_version == config_manager.output_schablonen_version:
+            return
+        self.output_schablonen = config_manager.get_output_schablonen()
+        self.output_schablonen_version = config_manager.output_schablonen_version
+        self.schablonen_index = SchablonenIndex(self.output_schablonen)
 
-        # Calculate economic metrics
-        all_vermoegen = [a.state.vermoegen for a in self.agent_set]
-        all_einkommen = [a.state.einkommen for a in self.agent_set]
-        all_konsum = [a.state.einkommen * a.state.konsumquote for a in self.agent_set]
-        
-        # Aggregiere Investments aus der letzten Runde
-        investments_per_biome = {b.name: 0.0 for b in self.biomes}
-        if hasattr(self, 'investment_decisions_this_step'):
-            for decision in self.investment_decisions_this_step:
-                agent = next(a for a in self.agent_set if a.unique_id == decision['agent_id'])
-                investments_per_biome[agent.state.region] += decision.get('investment_made', 0.0)
-        
-        # Registry/telemetry info
-        registry_info = {}
-        try:
-            from formula_registry import registry as formula_registry  # type: ignore
-            registry_info = {
-                "enabled": getattr(self, 'formula_registry_enabled', False),
-                "pins": getattr(self, 'formula_pins', {}),
-                "telemetry": getattr(formula_registry, 'telemetry', None).as_dict() if hasattr(formula_registry, 'telemetry') else {},
-            }
-        except Exception:
-            registry_info = {"enabled": False, "pins": {}, "telemetry": {}}
+    def refresh_milieus(self):
+        """Reloads the milieus and rebuilds their center matrix if save_milieus changed them."""
+        if self.milieus_version == config_manager.milieus_version:
+            return
+        self.milieus = config_manager.get_milieus()
+        self.milieus_version = config_manager.milieus_version
+        self.milieu_classifier = MilieuClassifier(self.milieus)
+        self.milieu_distribution = {m.name: 0 for m in self.milieus}
 
-        return {
-            "step": getattr(self, 'step_count', 0),  # Mesa 3.2.0+ doesn't have schedule.steps
-            "model_report": {
-                "Mean_Freedom": np.mean([r['freedom'] for r in agent_reports]),
-                "Mean_Altruism": np.mean([r['altruism'] for r in agent_reports]),
-                "Polarization": 0.0,  # Placeholder
-                "Gini_Resources": 0.0, # Placeholder (legacy)
-                "Durchschnittsvermoegen": np.mean(all_vermoegen) if all_vermoegen else 0,
-                "Durchschnittseinkommen": np.mean(all_einkommen) if all_einkommen else 0,
-                "Durchschnittlicher_Konsum": np.mean(all_konsum) if all_konsum else 0,
-                "Gini_Vermoegen": gini(np.array(all_vermoegen)) if all_vermoegen else 0,
-                "Gini_Einkommen": gini(np.array(all_einkommen)) if all_einkommen else 0,
-                "Hazard_Events_Count": len(self.hazard_manager.events_this_step) if hasattr(self.hazard_manager, 'events_this_step') else 0,
-                "Regions": region_counts,
-                "layout": self.layout,  # NEUES FELD: Layout-Informationen
-                "events": self.events,  # NEUES FELD: Event log
-                "biomes_dynamic_data": {
-                    b.name: {
-                        "total_investment": investments_per_biome[b.name],
-                        "effective_hazard_probability": self.effective_hazard_probabilities[b.name],
-                        "effective_regeneration_rate": self.effective_regeneration_rates[b.name]
-                    } for b in self.biomes
-                },
-                "milieus_config": [m.model_dump() for m in self.milieus],  # NEW: Send milieu configuration for visualization
-                "population_report": {
-                    "milieu_distribution": {
-                        name: len([a for a in self.agent_set if a.state.milieu == name])
-                        for name in [m.name for m in self.milieus]
-                    },  # Dynamic milieu distribution based on best fit classification
-                    "schablonen_verteilung": schablonen_counts,  # NEW: Template distribution
-                    "key_averages": {
-                        "mean_wealth": np.mean(all_vermoegen) if all_vermoegen else 0,
-                        "mean_income": np.mean(all_einkommen) if all_einkommen else 0,
-                        "mean_altruism": np.mean([r['altruism'] for r in agent_reports]),
-                        "mean_effective_cognition": np.mean([a.state.effektive_kognitive_kapazitaet for a in self.agent_set if hasattr(a.state, 'effektive_kognitive_kapazitaet')]),
-                        "mean_risk_aversion": np.mean([a.state.risikoaversion for a in self.agent_set if hasattr(a.state, 'risikoaversion')])
-                    }
-                },
-                "environment": {
-                    name: {"quality": data["quality"], "capacity": data["capacity"]}
-                    for name, data in self.environment.items()
-                },
-                "run_info": {
-                    "registry": registry_info
-                }
-            },
-            "agent_visuals": [
-                {
-                    "id": a.unique_id,
-                    "position": list(a.state.position),  # Lese die KORREKTE Position aus dem State
-                    "position_history": [list(pos) for pos in a.state.position_history],  # Include position history
-                    "political_position": {"a": a.state.calculate_political_position()[0], "b": a.state.calculate_political_position()[1]},
-                    "region": a.state.region,
-                    "schablone": a.state.schablone,
-                    "initial_milieu": a.state.initial_milieu,
-                    "milieu": a.state.milieu, # Sends the dynamic assignment
-                    # Extended data for AgentInspector
-                    "alter": a.state.alter,
-                    "einkommen": a.state.einkommen,
-                    "vermoegen": a.state.vermoegen,
-                    "sozialleistungen": a.state.sozialleistungen,
-                    "risikoaversion": a.state.risikoaversion,
-                    "effektive_kognitive_kapazitaet": a.state.effektive_kognitive_kapazitaet,
-                    "kognitive_kapazitaet_basis": a.state.kognitive_kapazitaet_basis,
-                    "politische_wirksamkeit": a.state.politische_wirksamkeit,
-                    "sozialkapital": a.state.sozialkapital,
-                    # Consumption data
-                    "konsumquote": a.state.konsumquote,
-                    "ersparnis": a.state.ersparnis
-                } for a in self.agent_set
-            ]
-        }
+    def get_model_report(self, sections=None) -> dict:
+        """
+        Collects and formats data for the API endpoint.
+        `sections` limits the report to some of 'summary', 'population', 'environment'
+        and 'agent_visuals' (default: all); sections are memoized until the next step.
+        """
+        return self.report.build(sections)
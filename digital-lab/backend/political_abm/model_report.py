@@ -0,0 +1,202 @@
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .inequality import gini, inequality_summary
+
+
+# Sections of get_model_report, in the order their keys appear in the report
+SECTIONS = ('summary', 'population', 'environment', 'agent_visuals')
+# Everything but the per-agent serialization (model_report only)
+AGGREGATE_SECTIONS = ('summary', 'population', 'environment')
+
+# Numeric AgentStore columns sent per agent in agent_visuals
+VISUAL_NUMERIC_FIELDS = (
+    'alter',
+    'einkommen',
+    'vermoegen',
+    'sozialleistungen',
+    'risikoaversion',
+    'effektive_kognitive_kapazitaet',
+    'kognitive_kapazitaet_basis',
+    'politische_wirksamkeit',
+    'sozialkapital',
+    'konsumquote',
+    'ersparnis',
+)
+
+
+class ModelReport:
+    """
+    Memoized, section-wise model report.
+
+    Each section is computed from whole AgentStore columns on first access and kept
+    until the model state changes (`invalidate()`, called at the end of every step).
+    Callers that only need scalar metrics request `sections=('summary',)` and never
+    pay for the per-agent agent_visuals serialization; repeated calls within one step
+    (API, record_step, experiment runner) reuse the cached sections.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._sections: Dict[str, Any] = {}
+        self._builders: Dict[str, Callable[[], Any]] = {
+            'summary': self._summary,
+            'population': self._population,
+            'environment': self._environment,
+            'agent_visuals': self._agent_visuals,
+        }
+
+    def invalidate(self):
+        self._sections.clear()
+
+    def section(self, name: str) -> Any:
+        if name not in self._builders:
+            raise ValueError(f"Unknown report section '{name}'. Expected one of {SECTIONS}.")
+        if name not in self._sections:
+            self._sections[name] = self._builders[name]()
+        return self._sections[name]
+
+    def build(self, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Report dict in the get_model_report layout containing the requested sections (default: all)."""
+        requested = SECTIONS if sections is None else tuple(sections)
+        unknown = set(requested) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown report sections {sorted(unknown)}. Expected any of {SECTIONS}.")
+        model_report: Dict[str, Any] = {}
+        for name in SECTIONS:
+            if name in requested and name != 'agent_visuals':
+                model_report.update(self.section(name))
+        report = {
+            "step": getattr(self.model, 'step_count', 0),  # Mesa 3.2.0+ doesn't have schedule.steps
+            "model_report": model_report,
+        }
+        if 'agent_visuals' in requested:
+            report["agent_visuals"] = self.section('agent_visuals')
+        return report
+
+    # --- Sections ---
+    def _summary(self) -> Dict[str, Any]:
+        """Scalar metrics (means, inequality, hazard count) plus registry info."""
+        model = self.model
+        store = model.agent_store
+        all_vermoegen = store.vermoegen
+        all_einkommen = store.einkommen
+        all_konsum = store.einkommen * store.konsumquote
+        # One sort of the wealth column serves Gini, top-10% share and percentiles
+        wealth_inequality = inequality_summary(all_vermoegen)
+
+        # Registry/telemetry info
+        registry_info = {}
+        try:
+            from formula_registry import registry as formula_registry  # type: ignore
+            registry_info = {
+                "enabled": getattr(model, 'formula_registry_enabled', False),
+                "pins": getattr(model, 'formula_pins', {}),
+                "telemetry": getattr(formula_registry, 'telemetry', None).as_dict() if hasattr(formula_registry, 'telemetry') else {},
+            }
+        except Exception:
+            registry_info = {"enabled": False, "pins": {}, "telemetry": {}}
+
+        return {
+            "Mean_Freedom": np.mean(store.freedom_preference),
+            "Mean_Altruism": np.mean(store.altruism_factor),
+            "Polarization": 0.0,  # Placeholder
+            "Gini_Resources": 0.0, # Placeholder (legacy)
+            "Durchschnittsvermoegen": np.mean(all_vermoegen) if len(all_vermoegen) else 0,
+            "Durchschnittseinkommen": np.mean(all_einkommen) if len(all_einkommen) else 0,
+            "Durchschnittlicher_Konsum": np.mean(all_konsum) if len(all_konsum) else 0,
+            "Gini_Vermoegen": wealth_inequality["gini"],
+            "Gini_Einkommen": gini(all_einkommen) if len(all_einkommen) else 0,
+            "Top10Share_Vermoegen": wealth_inequality["top10_share"],
+            "Percentiles_Vermoegen": {k: v for k, v in wealth_inequality.items() if k.startswith('p')},
+            "Hazard_Events_Count": len(model.hazard_manager.events),
+            "run_info": {
+                "registry": registry_info
+            },
+        }
+
+    def _population(self) -> Dict[str, Any]:
+        """Region, milieu and Schablonen counts and population averages."""
+        model = self.model
+        store = model.agent_store
+        region_counts = {region: 0 for region in model.regions}
+        for region, count in zip(store.categories['region'], store.counts('region').tolist()):
+            if count:
+                region_counts[region] = count
+
+        # Calculate template distribution
+        schablonen_counts = {
+            template: count
+            for template, count in zip(store.categories['schablone'], store.counts('schablone').tolist())
+            if count
+        }
+        return {
+            "Regions": region_counts,
+            "milieus_config": [m.model_dump() for m in model.milieus],  # Milieu configuration for visualization
+            "population_report": {
+                "milieu_distribution": dict(model.milieu_distribution),  # Dynamic milieu distribution based on best fit classification
+                "schablonen_verteilung": schablonen_counts,  # Template distribution
+                "key_averages": {
+                    "mean_wealth": np.mean(store.vermoegen) if len(store) else 0,
+                    "mean_income": np.mean(store.einkommen) if len(store) else 0,
+                    "mean_altruism": np.mean(store.altruism_factor),
+                    "mean_effective_cognition": np.mean(store.effektive_kognitive_kapazitaet),
+                    "mean_risk_aversion": np.mean(store.risikoaversion)
+                }
+            },
+        }
+
+    def _environment(self) -> Dict[str, Any]:
+        """Layout, step events and per-biome dynamic parameters."""
+        model = self.model
+        # Investments der letzten Runde (Summen pro Biom, einmal pro Schritt berechnet)
+        investments_per_biome = dict(zip(model.biome_table.names, model.investments.totals_per_biome.tolist()))
+        return {
+            "layout": model.layout,  # Layout-Informationen
+            "events": model.events,  # Event log
+            "biomes_dynamic_data": {
+                b.name: {
+                    "total_investment": investments_per_biome[b.name],
+                    "effective_hazard_probability": model.effective_hazard_probabilities[b.name],
+                    "effective_regeneration_rate": model.effective_regeneration_rates[b.name]
+                } for b in model.biomes
+            },
+            "environment": {
+                name: {"quality": data["quality"], "capacity": data["capacity"]}
+                for name, data in model.environment.items()
+            },
+        }
+
+    def _agent_visuals(self) -> list:
+        """Per-agent dicts for the frontend, assembled from whole columns (tolist) in one pass."""
+        model = self.model
+        store = model.agent_store
+        political_positions = store.political_positions().tolist()
+        columns = [store.column(field).tolist() for field in VISUAL_NUMERIC_FIELDS]
+        rows = zip(
+            (a.unique_id for a in model.agent_set),
+            store.position.tolist(),
+            store.position_history,
+            political_positions,
+            store.labels('region'),
+            store.labels('schablone'),
+            store.labels('initial_milieu'),
+            store.labels('milieu'),
+            zip(*columns) if columns else (),
+        )
+        visuals = []
+        for agent_id, position, history, (a, b), region, schablone, initial_milieu, milieu, values in rows:
+            visual = {
+                "id": agent_id,
+                "position": position,
+                "position_history": [list(pos) for pos in history],
+                "political_position": {"a": a, "b": b},
+                "region": region,
+                "schablone": schablone,
+                "initial_milieu": initial_milieu,
+                "milieu": milieu,  # Sends the dynamic assignment
+            }
+            # Extended data for AgentInspector and consumption data
+            visual.update(zip(VISUAL_NUMERIC_FIELDS, values))
+            visuals.append(visual)
+        return visuals
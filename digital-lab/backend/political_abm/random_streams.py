@@ -0,0 +1,32 @@
+import numpy as np
+from typing import Dict, Optional
+
+# One independent substream per source of randomness. Append new phases at the end:
+# a phase's stream is determined by its position, so existing streams stay unchanged.
+PHASES = ('initialization', 'network', 'income', 'hazards', 'investment', 'media')
+
+
+class RandomStreams:
+    """
+    Per-model random number generators, one `numpy.random.Generator` per phase,
+    all derived from a single model seed via `SeedSequence.spawn`.
+
+    Phases draw only from their own stream, so the same seed reproduces a run exactly,
+    changing how many numbers one phase consumes leaves every other phase unaffected,
+    and models in the same process never share random state.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0])
+        self.seed = int(seed)
+        children = np.random.SeedSequence(self.seed).spawn(len(PHASES))
+        self._generators: Dict[str, np.random.Generator] = {
+            phase: np.random.Generator(np.random.PCG64(child)) for phase, child in zip(PHASES, children)
+        }
+
+    def __getitem__(self, phase: str) -> np.random.Generator:
+        try:
+            return self._generators[phase]
+        except KeyError:
+            raise KeyError(f"Unknown random stream '{phase}'. Expected one of {PHASES}.") from None
@@ -0,0 +1,63 @@
+import numpy as np
+from typing import Callable, Dict, Tuple
+from backend.config.models import DistributionConfig
+
+
+class Sampler:
+    """
+    A DistributionConfig compiled into a vectorized draw function.
+
+    Defaults and parameters are resolved once at compile time; `sample(rng, size)`
+    is then a single NumPy Generator call. Drawing `size` values at once yields the
+    same numbers as `size` sequential `sample_one` calls on the same generator.
+    """
+
+    def __init__(self, config: DistributionConfig):
+        self.type = config.type
+        self._draw = self._compile(config)
+
+    @staticmethod
+    def _compile(config: DistributionConfig) -> Callable[[np.random.Generator, int], np.ndarray]:
+        min_val = config.min if config.min is not None else 0.0
+        max_val = config.max if config.max is not None else 1.0
+
+        if config.type == 'beta':
+            a, b = config.alpha or 2.0, config.beta or 2.0
+            return lambda rng, size: rng.beta(a, b, size=size)
+        elif config.type == 'uniform_int':
+            low, high = int(min_val), int(max_val) + 1
+            return lambda rng, size: rng.integers(low, high, size=size)
+        elif config.type == 'uniform_float':
+            return lambda rng, size: rng.uniform(min_val, max_val, size=size)
+        elif config.type == 'normal':
+            mean = config.mean if config.mean is not None else 0.5
+            std_dev = config.std_dev if config.std_dev is not None else 0.15
+            return lambda rng, size: np.clip(rng.normal(mean, std_dev, size=size), min_val, max_val)
+        elif config.type == 'lognormal':
+            mean = config.mean if config.mean is not None else 10.0
+            std_dev = config.std_dev if config.std_dev is not None else 0.5
+            return lambda rng, size: rng.lognormal(mean, std_dev, size=size)
+        elif config.type == 'pareto':
+            alpha = config.alpha if config.alpha is not None else 2.0
+            # Skalierung für plausiblen Startwert
+            return lambda rng, size: (rng.pareto(alpha, size=size) + 1) * 10000
+        return lambda rng, size: rng.random(size)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return self._draw(rng, size)
+
+    def sample_one(self, rng: np.random.Generator):
+        value = self._draw(rng, None)
+        return int(value) if self.type == 'uniform_int' else value
+
+
+_compiled: Dict[Tuple, Sampler] = {}
+
+
+def compile_sampler(config: DistributionConfig) -> Sampler:
+    """Sampler for a distribution config, compiled once per distinct parameter set."""
+    key = (config.type, config.alpha, config.beta, config.min, config.max, config.mean, config.std_dev)
+    sampler = _compiled.get(key)
+    if sampler is None:
+        sampler = _compiled[key] = Sampler(config)
+    return sampler
@@ -0,0 +1,74 @@
+import numpy as np
+from typing import List, Sequence
+
+
+class SchablonenIndex:
+    """
+    Precomputed lookup structure for classifying political positions into output
+    Schablonen (axis-aligned rectangles, inclusive bounds, first match wins).
+
+    All rectangle bounds split each axis into elementary "atoms": the open intervals
+    between consecutive distinct bounds and the bound values themselves. Membership
+    in every rectangle is constant within an atom, so the first-match template of
+    every (x atom, y atom) cell is resolved once at build time. Classifying N agents
+    is then two searchsorted calls and one gather, independent of the number of
+    templates.
+    """
+
+    NO_MATCH = -1
+
+    def __init__(self, schablonen: Sequence):
+        self.names: List[str] = [s.name for s in schablonen]
+        x_min = np.array([s.x_min for s in schablonen], dtype=float)
+        x_max = np.array([s.x_max for s in schablonen], dtype=float)
+        y_min = np.array([s.y_min for s in schablonen], dtype=float)
+        y_max = np.array([s.y_max for s in schablonen], dtype=float)
+
+        self.x_bounds = np.unique(np.concatenate((x_min, x_max)))
+        self.y_bounds = np.unique(np.concatenate((y_min, y_max)))
+
+        x_rep = self._atom_representatives(self.x_bounds)
+        y_rep = self._atom_representatives(self.y_bounds)
+        # (templates, x atoms) and (templates, y atoms) membership
+        inside_x = (x_min[:, None] <= x_rep[None, :]) & (x_rep[None, :] <= x_max[:, None])
+        inside_y = (y_min[:, None] <= y_rep[None, :]) & (y_rep[None, :] <= y_max[:, None])
+        inside = inside_x[:, :, None] & inside_y[:, None, :]
+
+        # First matching template per cell, NO_MATCH where none contains it
+        if self.names:
+            self.grid = np.where(inside.any(axis=0), inside.argmax(axis=0), self.NO_MATCH).astype(np.int32)
+        else:
+            self.grid = np.full((len(x_rep), len(y_rep)), self.NO_MATCH, dtype=np.int32)
+
+    @staticmethod
+    def _atom_representatives(bounds: np.ndarray) -> np.ndarray:
+        """One value inside each atom: below, each bound, between bounds, above."""
+        if len(bounds) == 0:
+            return np.zeros(1)
+        reps = np.empty(2 * len(bounds) + 1)
+        reps[0] = bounds[0] - 1.0
+        reps[1::2] = bounds
+        reps[2:-1:2] = (bounds[:-1] + bounds[1:]) / 2.0
+        reps[-1] = bounds[-1] + 1.0
+        return reps
+
+    @staticmethod
+    def _atoms(bounds: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Atom index of each value: 2i+1 if it equals bound i, else 2i for the gap before bound i."""
+        if len(bounds) == 0:
+            return np.zeros(len(values), dtype=np.intp)
+        i = np.searchsorted(bounds, values, side='left')
+        on_bound = (i < len(bounds)) & (bounds[np.minimum(i, len(bounds) - 1)] == values)
+        return 2 * i + on_bound
+
+    def classify(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Returns the index into `names` of the first Schablone containing each (N, 2)
+        position, or NO_MATCH (-1) for positions outside all of them.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if not self.names:
+            return np.full(len(positions), self.NO_MATCH, dtype=np.int32)
+        x_atoms = self._atoms(self.x_bounds, positions[:, 0])
+        y_atoms = self._atoms(self.y_bounds, positions[:, 1])
+        return self.grid[x_atoms, y_atoms]
@@ -1,10 +1,19 @@
 import numpy as np
 
+from .agents import PoliticalAgent
+from .inequality import gini
+from .investments import InvestmentDecisions
+
 
 class SimulationCycle:
     """
     Handles the execution of the 9-phase simulation cycle.
     Encapsulates all step-by-step logic that was previously in PoliticalModel.step().
+
+    Two engines are available (model.engine):
+    - "vectorized": every phase runs as whole-population NumPy operations on the AgentStore.
+    - "agent": the per-agent reference implementation via PoliticalAgent methods.
+    Pinned registry formulas take precedence over both where a batch path exists.
     """
     
     def __init__(self, model):
@@ -25,31 +34,34 @@ class SimulationCycle:
         """
         # Clear events from previous step
         self.model.events = []
+        store = self.model.agent_store
+        vectorized = getattr(self.model, 'engine', 'agent') == 'vectorized'
         
         # Phase 1: Seasonal Effects
         self.model.seasonality_manager.apply_seasonal_effects()
 
         # Phase 2: Resource Update (Income, Benefits, Consumption & Saving)
-        savings_this_step = self.model.resource_manager.update_agent_resources()
+        if vectorized:
+            savings_this_step = self.model.resource_manager.update_agent_resources_batch()
+        else:
+            savings_this_step = self.model.resource_manager.update_agent_resources()
+
+        # Phase 3: Hazard Events (recorded as arrays in hazard_manager.events)
+        if vectorized:
+            self.model.hazard_manager.trigger_events_batch()
+        else:
+            self.model.hazard_manager.trigger_events()
 
-        # Phase 3: Hazard Events
-        hazard_events = self.model.hazard_manager.trigger_events()
-        if hazard_events:
-            for event in hazard_events:
-                self.model.events.append(f"HAZARD_EVENT|{event}")
-        
         # Store values before Phase 4 for learning calculations
-        wealth_before = {
-            agent.unique_id: agent.state.vermoegen 
-            for agent in self.model.agent_set
-        }
+        wealth_before = store.vermoegen.copy()
         environment_before = {
             region: env['quality'] 
             for region, env in self.model.environment.items()
         }
         
-        # Phase 4: Agent Decision (decide_and_act)
-        self.model.investment_decisions_this_step = []
+        # Phase 4: Agent Decision (decide_and_act), recorded as arrays in model.investments
+        # One outcome draw per agent, shared by all engines
+        investment_draws = self.model.streams['investment'].random(len(store))
         use_batch_invest = (
             bool(getattr(self.model, 'formula_registry_enabled', False)) and
             bool(getattr(self.model, 'registry_handles', {}).get('investment_amount')) and
@@ -58,23 +70,18 @@ class SimulationCycle:
         if use_batch_invest:
             try:
                 from formula_registry import registry as formula_registry  # type: ignore
-                # Arrays
-                ersparnis_arr = np.array([savings_this_step.get(a.unique_id, 0.0) for a in self.model.agent_set], dtype=float)
-                risk = np.array([a.state.risikoaversion for a in self.model.agent_set], dtype=float)
-                zpref = np.array([a.state.zeitpraeferenzrate for a in self.model.agent_set], dtype=float)
                 sim = self.model.simulation_parameters
                 # investment_amount batch
                 amt_inputs = {
-                    'ersparnis': ersparnis_arr,
-                    'risikoaversion': risk,
-                    'zeitpraeferenzrate': zpref,
+                    'ersparnis': savings_this_step,
+                    'risikoaversion': store.risikoaversion,
+                    'zeitpraeferenzrate': store.zeitpraeferenzrate,
                     'max_investment_rate': float(sim['max_investment_rate'])
                 }
                 amounts = formula_registry.evaluate_batch_handle(self.model.registry_handles['investment_amount'], amt_inputs)
-                # success indicators (RNG centralized: python random to match previous behavior order)
-                import random
+                # success indicators from the shared outcome draws
                 p = float(sim['investment_success_probability'])
-                success_ind = np.array([1 if random.random() < p else 0 for _ in self.model.agent_set], dtype=float)
+                success_ind = (investment_draws < p).astype(float)
                 # outcome batch
                 out_inputs = {
                     'investment_amount': amounts,
@@ -83,59 +90,66 @@ class SimulationCycle:
                 }
                 gains = formula_registry.evaluate_batch_handle(self.model.registry_handles['investment_outcome'], out_inputs)
                 # assign and record
-                for i, agent in enumerate(self.model.agent_set):
-                    agent.state.vermoegen += float(gains[i])
-                    self.model.investment_decisions_this_step.append({
-                        'agent_id': agent.unique_id,
-                        'investment_made': float(amounts[i]),
-                        'investment_gain': float(gains[i])
-                    })
+                store.vermoegen += gains
+                amounts = np.broadcast_to(amounts, store.vermoegen.shape)
+                gains = np.broadcast_to(gains, store.vermoegen.shape)
             except Exception:
                 use_batch_invest = False
 
-        if not use_batch_invest:
-            for agent in self.model.agent_set:
-                ersparnis = savings_this_step.get(agent.unique_id, 0.0)
+        if not use_batch_invest and vectorized:
+            amounts, gains = PoliticalAgent.decide_and_act_batch(
+                store,
+                savings_this_step,
+                self.model.simulation_parameters,
+                investment_draws
+            )
+        elif not use_batch_invest:
+            amounts = np.zeros(len(store), dtype=float)
+            gains = np.zeros(len(store), dtype=float)
+            for i, agent in enumerate(self.model.agent_set):
+                ersparnis = float(savings_this_step[i])
                 decision_outcome = agent.decide_and_act(
                     ersparnis, 
-                    self.model.simulation_parameters
+                    self.model.simulation_parameters,
+                    draw=investment_draws[i]
                 )
-                self.model.investment_decisions_this_step.append({
-                    "agent_id": agent.unique_id,
-                    **decision_outcome
-                })
+                amounts[i] = decision_outcome['investment_made']
+                gains[i] = decision_outcome['investment_gain']
+        # Per-biome totals computed once here and reused by feedback, report and recording
+        self.model.investments = InvestmentDecisions(
+            amounts, gains, store.codes['region'], len(self.model.biomes)
+        )
 
         # Phase 5: Media Consumption & Learning
         influence = self.model.simulation_parameters['media_influence_factor']
+        # Source selection for all agents in one draw (shared by every path below)
+        media_manager = self.model.media_manager
+        chosen_sources = media_manager.select_sources_batch(store.political_positions())
+        source_social_axis = media_manager.source_positions[chosen_sources, 1]
         use_batch_media = bool(getattr(self.model, 'registry_handles', {}).get('media_influence_update')) and bool(getattr(self.model, 'formula_registry_enabled', False))
         if use_batch_media:
             try:
-                # Select sources (RNG/selection remains external)
-                chosen = [self.model.media_manager.select_source_for_agent(a.state) for a in self.model.agent_set]
-                target_freedom = np.array([(s.ideological_position.social_axis + 1)/2.0 for s in chosen], dtype=float)
-                current_pref = np.array([a.state.freedom_preference for a in self.model.agent_set], dtype=float)
-                bildung = np.array([a.state.bildung for a in self.model.agent_set], dtype=float)
-                eff_kogn = np.array([a.state.effektive_kognitive_kapazitaet for a in self.model.agent_set], dtype=float)
+                target_freedom = (source_social_axis + 1) / 2.0
                 params = self.model.simulation_parameters
                 inputs = {
-                    'current_pref': current_pref,
+                    'current_pref': store.freedom_preference,
                     'target_pref': target_freedom,
-                    'bildung': bildung,
-                    'effektive_kognitive_kapazitaet': eff_kogn,
+                    'bildung': store.bildung,
+                    'effektive_kognitive_kapazitaet': store.effektive_kognitive_kapazitaet,
                     'influence_factor': float(influence),
                     'education_weight': float(params['cognitive_moderator_education_weight']),
                     'capacity_weight': float(params['cognitive_moderator_capacity_weight'])
                 }
                 from formula_registry import registry as formula_registry  # type: ignore
                 new_prefs = formula_registry.evaluate_batch_handle(self.model.registry_handles['media_influence_update'], inputs)
-                for i, a in enumerate(self.model.agent_set):
-                    a.state.freedom_preference = float(np.clip(new_prefs[i], 0.0, 1.0))
+                store.freedom_preference = np.clip(new_prefs, 0.0, 1.0)
             except Exception:
                 use_batch_media = False
-        if not use_batch_media:
-            for agent in self.model.agent_set:
-                chosen_source = self.model.media_manager.select_source_for_agent(agent.state)
-                agent.learn_from_media(chosen_source, influence, self.model.simulation_parameters)
+        if not use_batch_media and vectorized:
+            PoliticalAgent.learn_from_media_batch(store, source_social_axis, influence, self.model.simulation_parameters)
+        elif not use_batch_media:
+            for agent, source_index in zip(self.model.agent_set, chosen_sources.tolist()):
+                agent.learn_from_media(media_manager.media_sources[source_index], influence, self.model.simulation_parameters)
 
         # Phase 6: Learning & Evaluation
         use_batch = bool(getattr(self.model, 'formula_registry_enabled', False)) and bool(getattr(self.model, 'registry_handles', {}).get('altruism_update'))
@@ -144,23 +158,12 @@ class SimulationCycle:
             try:
                 from formula_registry import registry as formula_registry  # type: ignore
                 handle = self.model.registry_handles.get('altruism_update')
-                # Build input arrays
-                prev_altruism = np.array([a.state.altruism_factor for a in self.model.agent_set], dtype=float)
-                bildung = np.array([a.state.bildung for a in self.model.agent_set], dtype=float)
-                delta_u_ego = np.array([a.state.vermoegen - wealth_before[a.unique_id] for a in self.model.agent_set], dtype=float)
-                delta_u_sozial = np.array([
-                    self.model.environment[a.state.region]['quality'] - environment_before[a.state.region]
-                    for a in self.model.agent_set
-                ], dtype=float)
-                env_health = np.array([self.model.environment[a.state.region]['quality'] for a in self.model.agent_set], dtype=float)
-                biome_capacity = np.array([
-                    self.model.base_biome_parameters[a.state.region].capacity for a in self.model.agent_set
-                ], dtype=float)
+                env_health, delta_u_sozial, biome_capacity = self._biome_environment_arrays(environment_before)
                 params = self.model.simulation_parameters
                 inputs = {
-                    'prev_altruism': prev_altruism,
-                    'bildung': bildung,
-                    'delta_u_ego': delta_u_ego,
+                    'prev_altruism': store.altruism_factor,
+                    'bildung': store.bildung,
+                    'delta_u_ego': store.vermoegen - wealth_before,
                     'delta_u_sozial': delta_u_sozial,
                     'env_health': env_health,
                     'biome_capacity': biome_capacity,
@@ -170,16 +173,24 @@ class SimulationCycle:
                     'education_dampening_k': float(params['education_dampening_k']),
                 }
                 new_vals = formula_registry.evaluate_batch_handle(handle, inputs)
-                # Assign results back
-                for i, agent in enumerate(self.model.agent_set):
-                    agent.state.altruism_factor = float(np.clip(new_vals[i], 0.0, 1.0))
+                store.altruism_factor = np.clip(new_vals, 0.0, 1.0)
             except Exception:
                 # Fallback to per-agent path on error
                 use_batch = False
 
-        if not use_batch:
-            for agent in self.model.agent_set:
-                delta_u_ego = agent.state.vermoegen - wealth_before[agent.unique_id]
+        if not use_batch and vectorized:
+            env_health, delta_u_sozial, biome_capacity = self._biome_environment_arrays(environment_before)
+            PoliticalAgent.learn_batch(
+                store,
+                delta_u_ego=store.vermoegen - wealth_before,
+                delta_u_sozial=delta_u_sozial,
+                env_health=env_health,
+                biome_capacity=biome_capacity,
+                learning_params=self.model.simulation_parameters
+            )
+        elif not use_batch:
+            for i, agent in enumerate(self.model.agent_set):
+                delta_u_ego = agent.state.vermoegen - wealth_before[i]
                 delta_u_sozial = (
                     self.model.environment[agent.state.region]['quality'] - 
                     environment_before[agent.state.region]
@@ -198,8 +209,8 @@ class SimulationCycle:
         use_batch_psych = bool(getattr(self.model, 'registry_handles', {}).get('risk_aversion')) and bool(getattr(self.model, 'registry_handles', {}).get('cognitive_capacity_penalty')) and bool(getattr(self.model, 'formula_registry_enabled', False))
         if use_batch_psych:
             try:
-                wealth = np.array([a.state.vermoegen for a in self.model.agent_set], dtype=float)
-                base_cap = np.array([a.state.kognitive_kapazitaet_basis for a in self.model.agent_set], dtype=float)
+                wealth = store.vermoegen
+                base_cap = store.kognitive_kapazitaet_basis
                 params = self.model.simulation_parameters
                 from formula_registry import registry as formula_registry  # type: ignore
                 # risk_aversion
@@ -213,33 +224,60 @@ class SimulationCycle:
                     'base_capacity': base_cap
                 }
                 new_eff = formula_registry.evaluate_batch_handle(self.model.registry_handles['cognitive_capacity_penalty'], cap_inputs)
-                for i, a in enumerate(self.model.agent_set):
-                    a.state.risikoaversion = float(np.clip(new_ra[i], 0.0, 1.0))
-                    a.state.effektive_kognitive_kapazitaet = float(np.clip(new_eff[i], 0.0, 1.0))
+                store.risikoaversion = np.clip(new_ra, 0.0, 1.0)
+                store.effektive_kognitive_kapazitaet = np.clip(new_eff, 0.0, 1.0)
             except Exception:
                 use_batch_psych = False
-        if not use_batch_psych:
+        if not use_batch_psych and vectorized:
+            PoliticalAgent.update_psychological_states_batch(store, self.model.simulation_parameters)
+        elif not use_batch_psych:
             for agent in self.model.agent_set:
                 agent.update_psychological_states(self.model.simulation_parameters)
         
         # Phase 8: Template Classification
-        self._classify_agents_into_templates()
+        self.model.refresh_output_schablonen()
+        if vectorized:
+            self._classify_agents_into_templates_batch()
+        else:
+            self._classify_agents_into_templates()
         
         # Phase 9a: Environment Feedback
-        self._update_environment_parameters()
+        if vectorized:
+            self._update_environment_parameters_batch()
+        else:
+            self._update_environment_parameters()
         
         # Phase 9b: Generate Gini coefficient events
         self._generate_gini_events()
         
         # Phase 9c: Dynamic Milieu Classification
-        self._classify_agents_into_milieus()
+        self.model.refresh_milieus()
+        if vectorized:
+            self._classify_agents_into_milieus_batch()
+        else:
+            self._classify_agents_into_milieus()
         
         self.model.step_count += 1
 
+    def _biome_environment_arrays(self, environment_before: dict):
+        """
+        Expands per-biome environment values to agent arrays via region codes.
+        Returns (env_health, delta_u_sozial, biome_capacity).
+        """
+        store = self.model.agent_store
+        regions = store.categories['region']
+        region_codes = store.codes['region']
+        quality_now = np.array([self.model.environment[r]['quality'] for r in regions], dtype=float)
+        quality_before = np.array([environment_before[r] for r in regions], dtype=float)
+        capacity = np.array([self.model.base_biome_parameters[r].capacity for r in regions], dtype=float)
+        env_health = quality_now[region_codes]
+        delta_u_sozial = env_health - quality_before[region_codes]
+        return env_health, delta_u_sozial, capacity[region_codes]
+
     def _classify_agents_into_templates(self):
         """Classifies all agents into output schablonen based on their political position."""
-        for agent in self.model.agent_set:
-            political_pos = agent.state.calculate_political_position()
+        positions = self.model.agent_store.political_positions()
+        for agent, political_pos in zip(self.model.agent_set, positions.tolist()):
             economic_axis, social_axis = political_pos
             
             # Find the best matching output schablone
@@ -253,27 +291,29 @@ class SimulationCycle:
             # Assign schablone (or "Unclassified" if no match)
             agent.state.schablone = best_schablone if best_schablone else "Unclassified"
 
+    def _classify_agents_into_templates_batch(self):
+        """Vectorized _classify_agents_into_templates via the model's precomputed SchablonenIndex."""
+        store = self.model.agent_store
+        index = self.model.schablonen_index
+        # Store codes per index entry; the last entry (NO_MATCH == -1) maps to "Unclassified"
+        code_lookup = np.array(
+            [store.encode('schablone', name) for name in index.names] + [store.encode('schablone', 'Unclassified')],
+            dtype=np.int32
+        )
+        store.codes['schablone'][:] = code_lookup[index.classify(store.political_positions())]
+
     def _update_environment_parameters(self):
         """
         Updates effective biome parameters for the NEXT step based on agent actions
         in the CURRENT step. This is the core feedback loop.
         """
-        # 1. Aggregate agent data per biome
-        investments_per_biome = {b.name: 0.0 for b in self.model.biomes}
+        # 1. Aggregate agent data per biome (investment totals from this step's decisions)
+        investments_per_biome = dict(zip(
+            self.model.biome_table.names, self.model.investments.totals_per_biome.tolist()
+        ))
         altruism_per_biome = {b.name: [] for b in self.model.biomes}
 
         for agent in self.model.agent_set:
-            # Get investment data from the last decision
-            last_decision = next(
-                (d for d in self.model.investment_decisions_this_step 
-                 if d['agent_id'] == agent.unique_id), 
-                None
-            )
-            if last_decision:
-                investments_per_biome[agent.state.region] += last_decision.get(
-                    'investment_made', 0.0
-                )
-            
             altruism_per_biome[agent.state.region].append(
                 agent.state.altruism_factor
             )
@@ -311,14 +351,44 @@ class SimulationCycle:
                 0, new_regen_rate
             )
 
+    def _update_environment_parameters_batch(self):
+        """Vectorized _update_environment_parameters using grouped sums per biome code."""
+        store = self.model.agent_store
+        biomes = self.model.biomes
+        region_codes = store.codes['region']
+
+        investments_per_biome = self.model.investments.totals_per_biome
+        altruism_sum = np.bincount(region_codes, weights=store.altruism_factor, minlength=len(biomes))
+        agent_counts = np.bincount(region_codes, minlength=len(biomes))
+
+        for code, biome in enumerate(biomes):
+            base_params = self.model.base_biome_parameters[biome.name]
+
+            # Direct Impact (Economy -> Risk)
+            new_hazard_prob = (
+                base_params.hazard_probability +
+                (investments_per_biome[code] * base_params.environmental_sensitivity)
+            )
+            self.model.effective_hazard_probabilities[biome.name] = np.clip(new_hazard_prob, 0, 1)
+
+            # Indirect Impact (Will -> Resilience)
+            mean_altruism = (
+                altruism_sum[code] / agent_counts[code]
+                if agent_counts[code]
+                else self.model.simulation_parameters['default_mean_altruism']
+            )
+            resilience_mod = (
+                (mean_altruism - 0.5) *
+                self.model.simulation_parameters['resilience_bonus_factor']
+            )
+            new_regen_rate = base_params.regeneration_rate * (1 + resilience_mod)
+            self.model.effective_regeneration_rates[biome.name] = max(0, new_regen_rate)
+
     def _generate_gini_events(self):
         """Generate Gini coefficient change events if threshold is crossed."""
-        all_vermoegen = [
-            a.state.vermoegen for a in self.model.agent_set 
-            if hasattr(a.state, 'vermoegen')
-        ]
-        if all_vermoegen:
-            current_gini = self._calculate_gini(all_vermoegen)
+        all_vermoegen = self.model.agent_store.vermoegen
+        if len(all_vermoegen):
+            current_gini = gini(all_vermoegen)
             if (hasattr(self.model, 'previous_gini') and 
                 abs(current_gini - self.model.previous_gini) > 
                 self.model.simulation_parameters['gini_threshold_change']):
@@ -332,16 +402,6 @@ class SimulationCycle:
                 )
             self.model.previous_gini = current_gini
 
-    def _calculate_gini(self, values):
-        """Calculate Gini coefficient for a list of values."""
-        if not values or len(values) == 0:
-            return 0
-        values = sorted(values)
-        n = len(values)
-        index = range(1, n + 1)
-        return ((2 * sum(index[i] * values[i] for i in range(n))) / 
-                (n * sum(values)) - (n + 1) / n)
-
     def _classify_agents_into_milieus(self):
         """
         Assigns each agent to the milieu with the closest ideological center.
@@ -355,8 +415,8 @@ class SimulationCycle:
             for m in self.model.milieus
         }
         
-        for agent in self.model.agent_set:
-            agent_pos = agent.state.calculate_political_position()
+        positions = self.model.agent_store.political_positions()
+        for agent, agent_pos in zip(self.model.agent_set, positions.tolist()):
             
             distances = {
                 name: np.linalg.norm(np.array(agent_pos) - np.array(center))
@@ -366,3 +426,21 @@ class SimulationCycle:
             # Find the milieu name with the minimum distance
             best_fit_milieu = min(distances, key=distances.get)
             agent.state.milieu = best_fit_milieu
+
+        store = self.model.agent_store
+        codes = [store.encode('milieu', m.name) for m in self.model.milieus]
+        counts = store.counts('milieu')
+        self.model.milieu_distribution = {m.name: int(counts[code]) for m, code in zip(self.model.milieus, codes)}
+
+    def _classify_agents_into_milieus_batch(self):
+        """Vectorized _classify_agents_into_milieus via the model's precomputed MilieuClassifier."""
+        if not self.model.milieus:
+            return
+
+        store = self.model.agent_store
+        classifier = self.model.milieu_classifier
+        milieu_codes = np.array([store.encode('milieu', name) for name in classifier.names], dtype=np.int32)
+
+        nearest, counts = classifier.classify(store.political_positions())
+        store.codes['milieu'][:] = milieu_codes[nearest]
+        self.model.milieu_distribution = classifier.distribution(counts)
@@ -1,61 +1,74 @@
-import dataclasses
-from typing import Tuple, List
+from typing import Tuple, List, Dict, Any
+from .agent_store import AgentStore, FLOAT_FIELDS, INT_FIELDS, CATEGORICAL_FIELDS, ALL_FIELDS, POSITION_INPUT_FIELDS
+
 
-@dataclasses.dataclass(slots=True)
 class AgentState:
     """
     Represents the complete state of a single "Minimum Viable Agent".
     Based on the final master plan for Epic 5.
+
+    The state is a thin view onto one row of the model's columnar AgentStore.
+    Attribute reads and writes go straight to the underlying arrays, so per-agent
+    code and vectorized phases always see the same data.
+
+    Attributes:
+        Demographics: alter, region (the agent's biome)
+        Resources: bildung, einkommen, vermoegen, sozialleistungen (received benefits)
+        Cognition: kognitive_kapazitaet_basis (static), effektive_kognitive_kapazitaet (affected by stress)
+        Preferences / States: freedom_preference, altruism_factor, risikoaversion, zeitpraeferenzrate
+        Politics: politische_wirksamkeit (political_position is a method)
+        Social: sozialkapital
+        Geographic Position: position, position_history
+        Milieus: initial_milieu (origin), milieu (dynamic best-fit classification)
+        Template Classification: schablone
+        Consumption Tracking: konsumquote, ersparnis
     """
-    # Demographics
-    alter: int
-    region: str # This will now be called "biome" in the config
-
-    # Resources
-    bildung: float
-    einkommen: float
-    vermoegen: float
-    sozialleistungen: float # Received benefits
-
-    # Cognition
-    kognitive_kapazitaet_basis: float # Static base capacity
-    effektive_kognitive_kapazitaet: float # Dynamic, affected by stress
-
-    # Preferences / States
-    freedom_preference: float
-    altruism_factor: float
-    risikoaversion: float
-    zeitpraeferenzrate: float
-
-    # Politics
-    # political_position is now a method
-    politische_wirksamkeit: float
-
-    # Social
-    sozialkapital: float # Initialized social capital
-
-    # Geographic Position
-    position: Tuple[float, float]
-    position_history: List[Tuple[float, float]] = dataclasses.field(default_factory=list)
-    
-    # Initial Milieu (for tracking origin)
-    initial_milieu: str = "Unknown"  # Assigned at initialization
-    
-    # Dynamic Milieu Assignment (best fit classification)
-    milieu: str = "Unassigned"  # Dynamic classification based on closest ideological center
-    
-    # Template Classification
-    schablone: str = "Unclassified"  # Dynamic classification based on political position
-    
-    # Consumption Tracking (for reporting)
-    konsumquote: float = 0.0  # Current consumption rate
-    ersparnis: float = 0.0    # Last step's savings
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: AgentStore, index: int):
+        self._store = store
+        self._index = index
+
+    @classmethod
+    def from_values(cls, **kwargs) -> 'AgentState':
+        """Creates a detached state backed by its own single-row store."""
+        return cls(AgentStore.from_records([kwargs]), 0)
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        x, y = self._store.position[self._index]
+        return float(x), float(y)
+
+    @position.setter
+    def position(self, value: Tuple[float, float]):
+        self._store.position[self._index] = value
+
+    @property
+    def position_history(self) -> List[Tuple[float, float]]:
+        return self._store.position_history[self._index]
+
+    @position_history.setter
+    def position_history(self, value: List[Tuple[float, float]]):
+        self._store.position_history[self._index] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in ALL_FIELDS}
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{k}={v!r}" for k, v in self.to_dict().items() if k != 'position_history')
+        return f"AgentState({fields})"
 
     def calculate_political_position(self) -> Tuple[float, float]:
         """
         Calculates the agent's political position based on new economic attributes.
         This is a revised formula for Epic 5.
+        Reads the store's cached position matrix when it is current.
         """
+        cached = self._store.cached_political_positions()
+        if cached is not None:
+            a_i, b_i = cached[self._index]
+            return float(a_i), float(b_i)
+
         # Economic Axis (a_i): Pro-Redistribution (-1) to Pro-Market (1)
         # Simplified: low wealth -> pro-redistribution, high wealth -> pro-market
         # We normalize vermoegen to a [-1, 1] range approximately for this calculation
@@ -69,4 +82,39 @@ class AgentState:
         a_i = max(-1.0, min(1.0, a_i))
         b_i = max(-1.0, min(1.0, b_i))
 
-        return a_i, b_i
\ No newline at end of file
+        return a_i, b_i
+
+
+def _numeric_property(field: str, cast) -> property:
+    def getter(self: AgentState):
+        return cast(self._store._columns[field][self._index])
+
+    def setter(self: AgentState, value):
+        store = self._store
+        store._columns[field][self._index] = value
+        if invalidates_positions:
+            store._political_positions = None
+
+    invalidates_positions = field in POSITION_INPUT_FIELDS
+
+    return property(getter, setter)
+
+
+def _categorical_property(field: str) -> property:
+    def getter(self: AgentState) -> str:
+        store = self._store
+        return store.categories[field][store.codes[field][self._index]]
+
+    def setter(self: AgentState, value: str):
+        store = self._store
+        store.codes[field][self._index] = store.encode(field, value)
+
+    return property(getter, setter)
+
+
+for _field in FLOAT_FIELDS:
+    setattr(AgentState, _field, _numeric_property(_field, float))
+for _field in INT_FIELDS:
+    setattr(AgentState, _field, _numeric_property(_field, int))
+for _field in CATEGORICAL_FIELDS:
+    setattr(AgentState, _field, _categorical_property(_field))
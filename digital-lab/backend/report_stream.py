@@ -0,0 +1,305 @@
+"""
+Incremental, delta-encoded model report stream for the WebSocket.
+
+Instead of broadcasting the full get_model_report() dict every step, the stream
+sends three frame types:
+
+    {"type": "config", "config_version": v, "config": {"layout": ..., "milieus_config": ...}}
+        Static model configuration. Sent on connect and whenever it changes.
+
+    {"type": "keyframe", "step": s, "config_version": v, "model_report": {...}, "agent_visuals": [...]}
+        Full state (model_report without the static keys). Sent after a reset, and on
+        connect or {"type": "resync"} (then the last broadcast state).
+
+    {"type": "delta", "step": s, "base_step": b, "config_version": v, "model_report": {...},
+     "agents": {field: {"ids": [...], "values": [...]}},
+     "history": {"append": k, "max_length": 20}}
+        Changes since the frame for `base_step`: only the top-level model_report keys whose
+        value changed, and per agent field only the agents whose quantized value changed.
+        Every agent appends its current position `k` times to its position history
+        (one point per simulated step), trimmed to `max_length`.
+
+All agent floats are rounded to the decimals in QUANTIZATION, both in keyframes and
+deltas, so sub-quantum jitter never produces a change entry. A client whose step does
+not match `base_step` must request a resync.
+
+Connections that opt into binary agent frames (`/ws?agent_format=binary`) receive the
+same frames without the per-agent parts ("agent_format": "binary"), each keyframe and
+delta followed by one binary message holding all agent columns:
+
+    b"ABMC" | uint32 header length | JSON header (space-padded) | body
+
+All numbers are little-endian. The body starts at byte 8 + header length, which is a
+multiple of 8. The JSON header lists every column as {"name", "dtype", "offset"} with
+`offset` counted from the start of the body (also a multiple of 8), plus "count"
+(number of agents) and "categories" (labels for the code columns), so clients can map
+each column straight into a typed array.
+"""
+import json
+import struct
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+# model_report keys that only change with the model configuration
+STATIC_REPORT_KEYS = ('layout', 'milieus_config')
+
+# Decimals kept per agent visual field
+QUANTIZATION = {
+    'position': 2,
+    'political_position': 3,
+    'einkommen': 2,
+    'vermoegen': 2,
+    'sozialleistungen': 2,
+    'ersparnis': 2,
+    'risikoaversion': 4,
+    'effektive_kognitive_kapazitaet': 4,
+    'kognitive_kapazitaet_basis': 4,
+    'politische_wirksamkeit': 4,
+    'sozialkapital': 4,
+    'konsumquote': 4,
+}
+CATEGORICAL_VISUALS = ('region', 'schablone', 'initial_milieu', 'milieu')
+INT_VISUALS = ('alter',)
+
+AGENT_FORMATS = ('json', 'binary')
+BINARY_MAGIC = b"ABMC"
+# Binary column layout: (column name, source visual field, component, little-endian dtype)
+BINARY_COLUMNS = (
+    ('id', 'id', None, '<i4'),
+    ('x', 'position', 0, '<f4'),
+    ('y', 'position', 1, '<f4'),
+    ('a', 'political_position', 0, '<f4'),
+    ('b', 'political_position', 1, '<f4'),
+) + tuple((field, field, None, '<u2') for field in CATEGORICAL_VISUALS) + (
+    ('alter', 'alter', None, '<i4'),
+) + tuple((field, field, None, '<f4') for field in QUANTIZATION if field not in ('position', 'political_position'))
+# Typed-array names for the header
+_DTYPE_NAMES = {'<i4': 'int32', '<u2': 'uint16', '<f4': 'float32'}
+
+
+class ReportFrames(list):
+    """
+    Frames of one publish()/connect_frames() call plus the binary agent payload of
+    the state they describe, encoded together with them (see for_agent_format).
+    """
+
+    def __init__(self, frames=(), agent_payload: Optional[bytes] = None):
+        super().__init__(frames)
+        self.agent_payload = agent_payload
+
+
+class ReportStream:
+    """
+    Keeps the last broadcast (quantized) agent columns and model_report, and turns
+    each new model state into the frames needed to bring clients up to date.
+    """
+
+    def __init__(self, history_length: int = 20):
+        self.history_length = history_length
+        self.config_version = 0
+        self._config: Optional[Dict[str, Any]] = None
+        self._model = None
+        self._step: Optional[int] = None
+        self._ids: Optional[np.ndarray] = None
+        self._columns: Dict[str, np.ndarray] = {}
+        self._labels: Dict[str, List[str]] = {}
+        self._history: List[list] = []
+        self._report: Dict[str, Any] = {}
+
+    # --- Public API ---
+    def publish(self, model, report: Dict[str, Any]) -> ReportFrames:
+        """
+        Frames to broadcast for a new model state: an optional config frame followed by
+        a delta, or by a keyframe if the model was replaced or resized.
+        """
+        frames = []
+        config_frame = self._update_config(report)
+        if config_frame:
+            frames.append(config_frame)
+
+        if self._is_same_model(model) and self._step is not None:
+            frames.append(self._delta(model, report))
+        else:
+            self._rebase(model, report)
+            frames.append(self.keyframe())
+        return ReportFrames(frames, self.binary_agent_frame())
+
+    def connect_frames(self, model) -> ReportFrames:
+        """
+        Frames for a newly connected (or resyncing) client: config plus a keyframe of the
+        last published state, so the client continues with the next broadcast delta.
+        The shared delta baseline is only rebased when the model was replaced.
+        """
+        if model is None:
+            return ReportFrames()
+        if not self._is_same_model(model) or self._step is None:
+            report = model.get_model_report()
+            self._update_config(report)
+            self._rebase(model, report)
+        return ReportFrames([self.config_frame(), self.keyframe()], self.binary_agent_frame())
+
+    def config_frame(self) -> Dict[str, Any]:
+        return {"type": "config", "config_version": self.config_version, "config": self._config or {}}
+
+    def keyframe(self) -> Dict[str, Any]:
+        ids = self._ids.tolist()
+        visuals = [{"id": agent_id} for agent_id in ids]
+        for field, values in self._encoded_columns(np.arange(len(ids))).items():
+            for visual, value in zip(visuals, values):
+                visual[field] = value
+        for visual, history in zip(visuals, self._history):
+            visual["position_history"] = history
+        return {
+            "type": "keyframe",
+            "step": self._step,
+            "config_version": self.config_version,
+            "model_report": dict(self._report),
+            "agent_visuals": visuals,
+        }
+
+    def binary_agent_frame(self) -> bytes:
+        """All agent columns of the last published state in the binary layout."""
+        count = len(self._ids)
+        buffers, layout = [], []
+        offset = 0
+        for name, field, component, dtype in BINARY_COLUMNS:
+            values = self._ids if field == 'id' else self._columns[field]
+            if component is not None:
+                values = values[:, component]
+            data = np.ascontiguousarray(values, dtype=dtype).tobytes()
+            layout.append({"name": name, "dtype": _DTYPE_NAMES[dtype], "offset": offset})
+            buffers.append(data + b"\0" * (-len(data) % 8))
+            offset += len(buffers[-1])
+
+        header = json.dumps({
+            "step": self._step,
+            "count": count,
+            "columns": layout,
+            "categories": {field: self._labels[field] for field in CATEGORICAL_VISUALS},
+        }).encode()
+        # Pad the header so the body starts 8-byte aligned
+        header += b" " * (-(8 + len(header)) % 8)
+        return BINARY_MAGIC + struct.pack("<I", len(header)) + header + b"".join(buffers)
+
+    @staticmethod
+    def for_agent_format(frames: ReportFrames, agent_format: str) -> List[Union[Dict[str, Any], bytes]]:
+        """
+        Adapts frames from publish()/connect_frames() to a connection's agent format.
+        Binary connections get keyframes/deltas without agent data, each followed by the
+        agent payload encoded with the frames, so it always matches their step even if
+        the stream has moved on since.
+        """
+        if agent_format != 'binary':
+            return frames
+        adapted: List[Union[Dict[str, Any], bytes]] = []
+        for frame in frames:
+            if frame["type"] == "config":
+                adapted.append(frame)
+                continue
+            header = {k: v for k, v in frame.items() if k not in ("agent_visuals", "agents")}
+            header["agent_format"] = "binary"
+            adapted.append(header)
+            adapted.append(frames.agent_payload)
+        return adapted
+
+    # --- Internals ---
+    def _is_same_model(self, model) -> bool:
+        return self._model is model and len(self._ids) == len(model.agent_set)
+
+    def _update_config(self, report: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        model_report = report.get("model_report", {})
+        config = {key: model_report.get(key) for key in STATIC_REPORT_KEYS}
+        if config == self._config:
+            return None
+        self._config = config
+        self.config_version += 1
+        return self.config_frame()
+
+    @staticmethod
+    def _dynamic_report(report: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in report.get("model_report", {}).items() if k not in STATIC_REPORT_KEYS}
+
+    def _snapshot(self, model) -> Dict[str, np.ndarray]:
+        """Quantized agent visual columns straight from the model's AgentStore."""
+        store = model.agent_store
+        columns = {
+            'position': np.round(store.position, QUANTIZATION['position']),
+            'political_position': np.round(store.political_positions(), QUANTIZATION['political_position']),
+        }
+        for field in CATEGORICAL_VISUALS:
+            columns[field] = store.codes[field].copy()
+            self._labels[field] = list(store.categories[field])
+        for field in INT_VISUALS:
+            columns[field] = store.column(field).copy()
+        for field, decimals in QUANTIZATION.items():
+            if field not in columns:
+                columns[field] = np.round(store.column(field), decimals)
+        return columns
+
+    def _rebase(self, model, report: Dict[str, Any]):
+        self._model = model
+        self._ids = np.array([a.unique_id for a in model.agent_set])
+        self._columns = self._snapshot(model)
+        decimals = QUANTIZATION['position']
+        self._history = [
+            np.round(np.asarray(history, dtype=float), decimals).tolist()
+            for history in model.agent_store.position_history
+        ]
+        self._report = self._dynamic_report(report)
+        self._step = report.get("step", getattr(model, 'step_count', 0))
+
+    def _encode_values(self, field: str, values: np.ndarray) -> list:
+        """JSON values of a column slice; political positions as [a, b] pairs."""
+        if field in CATEGORICAL_VISUALS:
+            labels = np.array(self._labels[field], dtype=object)
+            return labels[values].tolist()
+        return values.tolist()
+
+    def _encoded_columns(self, rows: np.ndarray) -> Dict[str, list]:
+        """Column values in the get_model_report agent_visuals format."""
+        encoded = {field: self._encode_values(field, column[rows]) for field, column in self._columns.items()}
+        encoded['political_position'] = [{"a": a, "b": b} for a, b in encoded['political_position']]
+        return encoded
+
+    def _delta(self, model, report: Dict[str, Any]) -> Dict[str, Any]:
+        base_step = self._step
+        step = report.get("step", getattr(model, 'step_count', 0))
+
+        columns = self._snapshot(model)
+        agents = {}
+        for field, new in columns.items():
+            old = self._columns[field]
+            changed = new != old
+            if changed.ndim > 1:
+                changed = changed.any(axis=1)
+            rows = np.flatnonzero(changed)
+            if len(rows):
+                agents[field] = {"ids": self._ids[rows].tolist(), "values": self._encode_values(field, new[rows])}
+        self._columns = columns
+
+        # One position history point per simulated step, as recorded by the model
+        appended = int(min(max(step - base_step, 0), self.history_length))
+        if appended:
+            points = columns['position'].tolist()
+            for history, point in zip(self._history, points):
+                history.extend([point] * appended)
+                del history[:-self.history_length]
+
+        dynamic_report = self._dynamic_report(report)
+        changed_report = {k: v for k, v in dynamic_report.items() if self._report.get(k) != v}
+        self._report = dynamic_report
+        self._step = step
+
+        return {
+            "type": "delta",
+            "step": step,
+            "base_step": base_step,
+            "config_version": self.config_version,
+            "model_report": changed_report,
+            "agents": agents,
+            "history": {"append": appended, "max_length": self.history_length},
+        }
+
+
+stream = ReportStream()
@@ -0,0 +1,154 @@
+"""
+Content-addressed on-disk cache for experiment runs.
+
+A run is fully determined by its merged config, target steps and seed plus everything
+the model reads besides them: the simulation code, the active model configuration and
+the pinned formula artifacts. The cache key is the SHA-256 of all of these, so a hit
+can be returned instead of simulating and any change to an input is a miss.
+
+Entries are JSON files named by their key. The cache is bounded in bytes and evicts
+the least recently used entries (a hit refreshes the file's mtime).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import metrics
+
+BACKEND_DIR = Path(__file__).parent
+# Sources whose changes can alter a run's result
+CODE_PATHS = ('political_abm', 'experiment_worker.py', 'config/models.py')
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of the simulation sources, or EXPERIMENT_CODE_VERSION if set (e.g. a git SHA)."""
+    override = os.getenv('EXPERIMENT_CODE_VERSION')
+    if override:
+        return override
+    m = hashlib.sha256()
+    for rel in CODE_PATHS:
+        path = BACKEND_DIR / rel
+        files = sorted(path.rglob('*.py')) if path.is_dir() else [path]
+        for file in files:
+            m.update(str(file.relative_to(BACKEND_DIR)).encode('utf-8'))
+            m.update(file.read_bytes())
+    return "sha256:" + m.hexdigest()
+
+
+def run_key(config: Dict[str, Any], target_steps: int, seed: int, context: Dict[str, Any]) -> str:
+    """Cache key of one run; `context` holds the inputs shared by all runs (code, model config, pins)."""
+    payload = {
+        "config": config,
+        "target_steps": target_steps,
+        "seed": seed,
+        "context": context,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class RunCache:
+    """Size-bounded LRU cache of ExperimentRun dicts on disk."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sizes: Dict[str, int] = {p.stem: p.stat().st_size for p in self.directory.glob('*.json')}
+        self._update_gauges()
+
+    @classmethod
+    def from_env(cls, default_dir: Path) -> Optional['RunCache']:
+        """Cache configured by EXPERIMENT_CACHE_DIR / EXPERIMENT_CACHE_MAX_MB (0 disables it)."""
+        max_mb = float(os.getenv('EXPERIMENT_CACHE_MAX_MB', '512'))
+        if max_mb <= 0:
+            return None
+        directory = Path(os.getenv('EXPERIMENT_CACHE_DIR', str(default_dir)))
+        return cls(directory, int(max_mb * 1024 * 1024))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with path.open('r') as f:
+                data = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            metrics.inc_run_cache('miss')
+            return None
+        with self._lock:
+            self.hits += 1
+        metrics.inc_run_cache('hit')
+        return data
+
+    def put(self, key: str, data: Dict[str, Any]):
+        encoded = json.dumps(data, default=str).encode('utf-8')
+        if len(encoded) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(encoded)
+        os.replace(tmp, path)
+        with self._lock:
+            self._sizes[key] = len(encoded)
+            self._evict()
+        self._update_gauges()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._sizes):
+                self._path(key).unlink(missing_ok=True)
+            self._sizes.clear()
+        self._update_gauges()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._sizes),
+            "bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+    def size_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def _evict(self):
+        """Deletes least recently used entries until the cache fits max_bytes (lock held)."""
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return
+        by_age = []
+        for key in self._sizes:
+            try:
+                by_age.append((self._path(key).stat().st_mtime, key))
+            except OSError:
+                by_age.append((0.0, key))
+        evicted = 0
+        for _, key in sorted(by_age):
+            if total <= self.max_bytes:
+                break
+            total -= self._sizes.pop(key)
+            self._path(key).unlink(missing_ok=True)
+            evicted += 1
+        self.evictions += evicted
+        metrics.inc_run_cache_evicted(evicted)
+
+    def _update_gauges(self):
+        metrics.set_run_cache_size(self.size_bytes(), len(self._sizes))
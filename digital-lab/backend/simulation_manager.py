@@ -1,7 +1,11 @@
-from typing import Optional, Dict, Any, List
+import os
+import threading
+from typing import Optional, Dict, Any, List, Callable, Sequence
 from political_abm.model import PoliticalModel
-import numpy as np
-from collections import Counter
+from political_abm.model_report import AGGREGATE_SECTIONS
+from metric_history import MetricHistory
+from agent_query import AgentQueryEngine
+from collections import deque
 
 class SimulationManager:
     """
@@ -11,57 +15,134 @@ class SimulationManager:
     def __init__(self):
         print("Initializing SimulationManager...")
         self.model: Optional[PoliticalModel] = None
-        self.history: List[Dict[str, Any]] = []  # Time series history
-        self.max_history: int = 1000  # Maximum snapshots to keep
+        self.max_history: int = 1000  # Maximum steps kept in the scalar history
+        # Time series history: scalar report values per recorded step (columnar ring buffer)
+        self.history = MetricHistory(self.max_history)
+        # Full agent states of the most recent recorded steps, capped separately (0 disables)
+        self.max_agent_snapshots: int = int(os.getenv('HISTORY_AGENT_SNAPSHOTS', '10'))
+        self.agent_snapshots: deque = deque()
+        # Guards the model: steps may run in a worker thread (SimulationRunner) while
+        # the event loop builds reports or answers queries
+        self.lock = threading.RLock()
         self.reset_model() # Create an initial model on startup
 
-    def reset_model(self, num_agents: int = 100, network_connections: int = 5):
-        """Creates a new instance of the simulation model."""
+    def reset_model(self, num_agents: int = 100, network_connections: int = 5, seed: Optional[int] = None):
+        """Creates a new instance of the simulation model (seeded for reproducible runs)."""
         print(f"Resetting model with {num_agents} agents...")
-        try:
-            self.model = PoliticalModel(
-                num_agents=num_agents,
-                network_connections=network_connections
-            )
-            print("New PoliticalModel instance created successfully.")
-
-            # Clear history and store initial state
-            self.history = []
-            initial_data = self.get_model_data()
-            if initial_data:
-                self.history.append(initial_data)
-
-        except Exception as e:
-            print(f"Error creating PoliticalModel instance: {e}")
-            self.model = None
+        with self.lock:
+            try:
+                self.model = PoliticalModel(
+                    num_agents=num_agents,
+                    network_connections=network_connections,
+                    seed=seed
+                )
+                print("New PoliticalModel instance created successfully.")
+
+                # Clear history and store initial state
+                self.history.clear()
+                self.agent_snapshots = deque(maxlen=max(1, self.max_agent_snapshots))
+                initial_data = self.get_model_data()
+                self._append_history(initial_data)
+
+            except Exception as e:
+                print(f"Error creating PoliticalModel instance: {e}")
+                self.model = None
 
     def step_model(self) -> Optional[Dict[str, Any]]:
         """Advances the model by one step and returns the latest data."""
-        if self.model:
-            self.model.step()
-            data = self.get_model_data()
+        with self.lock:
+            if self.model:
+                self.model.step()
+                return self.record_snapshot()
+        print("Cannot step model: instance is not available.")
+        return None
 
-            # Store in history
-            if data:
-                self.history.append(data)
-                # Limit history size
-                if len(self.history) > self.max_history:
-                    self.history.pop(0)
+    def advance_model(self) -> bool:
+        """Advances the model by one step without building a report (continuous runs)."""
+        with self.lock:
+            if self.model:
+                self.model.step()
+                return True
+        print("Cannot step model: instance is not available.")
+        return False
 
+    def run_steps(self, steps: int, history_every: int = 0, broadcast_every: int = 0,
+                  on_broadcast: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[Dict[str, Any]]:
+        """Advances the model by `steps` steps in one tight loop and returns the final report.
+
+        Reports are only built for sampled steps: every `history_every`-th step is
+        appended to the history and every `broadcast_every`-th step is passed to
+        `on_broadcast` (0 = neither). The final step is always recorded and broadcast.
+        A step that is both stored and broadcast shares a single report.
+        """
+        with self.lock:
+            if not self.model:
+                print("Cannot run model: instance is not available.")
+                return None
+            data = None
+            snapshot_steps = self._snapshot_steps(steps, history_every)
+            for k in range(1, steps + 1):
+                self.model.step()
+                final = k == steps
+                store = final or (history_every > 0 and k % history_every == 0)
+                broadcast = on_broadcast is not None and (
+                    final or (broadcast_every > 0 and k % broadcast_every == 0))
+                if not (store or broadcast):
+                    continue
+                # Agent visuals only for the final state and the agent snapshots that are
+                # kept (frames are built from the store)
+                full = k in snapshot_steps
+                data = self.get_model_data(None if full else AGGREGATE_SECTIONS)
+                if store:
+                    self._append_history(data)
+                if broadcast:
+                    on_broadcast(data)
             return data
-        print("Cannot step model: instance is not available.")
+
+    def _snapshot_steps(self, steps: int, history_every: int) -> List[int]:
+        """Steps of a run_steps batch that need agent_visuals: the final step and the
+        stored steps that can still end up in the agent snapshot deque."""
+        n = self.max_agent_snapshots
+        stored = range(history_every, steps + 1, history_every) if history_every > 0 else range(0)
+        kept = list(stored[-n:]) if n > 0 else []
+        if not kept or kept[-1] != steps:
+            # The final step is always stored and pushes out the oldest of the others
+            kept = (kept[1:] if len(kept) == n else kept) + [steps]
+        return kept
+
+    def record_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Builds the report of the current state and appends it to the history."""
+        with self.lock:
+            data = self.get_model_data()
+            self._append_history(data)
+            return data
+
+    def _append_history(self, data: Optional[Dict[str, Any]]):
+        if data:
+            self.history.append(data)
+            if self.max_agent_snapshots > 0 and 'agent_visuals' in data:
+                self.agent_snapshots.append({"step": data.get('step'), "agent_visuals": data['agent_visuals']})
+
+    def get_agent_snapshot(self, step: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Stored agent states of `step` (default: the latest snapshot), or None if not kept."""
+        with self.lock:
+            for snapshot in reversed(self.agent_snapshots):
+                if step is None or snapshot['step'] == step:
+                    return snapshot
         return None
 
-    def get_model_data(self) -> Optional[Dict[str, Any]]:
-        """Retrieves the full data report from the current model state."""
-        if self.model:
-            return self.model.get_model_report()
+    def get_model_data(self, sections: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Retrieves the data report (all sections by default) from the current model state."""
+        with self.lock:
+            if self.model:
+                return self.model.get_model_report(sections)
         print("Cannot get model data: instance is not available.")
         return None
 
     def query_agents(self, filters: Optional[Dict] = None, fields: Optional[List[str]] = None,
-                    limit: int = 100, aggregations: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
-        """Query agents with filtering and aggregation.
+                    limit: int = 100, aggregations: Optional[List[str]] = None,
+                    group_by: Optional[str] = None, order_by: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Query agents with filtering and aggregation (evaluated on the columnar store, see agent_query).
 
         Args:
             filters: Dictionary of filter conditions. Examples:
@@ -72,236 +153,62 @@ class SimulationManager:
             limit: Maximum number of agents to return
             aggregations: List of aggregations to compute. Examples:
                 - "count"
-                - "mean_vermoegen"
+                - "mean_vermoegen" (also sum_, std_, min_, max_)
+                - "percentile_90_vermoegen"
                 - "distribution_milieu"
+            group_by: Field to compute the aggregations per value of (e.g. "region")
+            order_by: Field to sort the returned agents by, "-field" for descending
+                (the top `limit` agents are returned)
 
         Returns:
-            Dictionary with 'count', 'agents', and 'aggregations' keys
-        """
-        if not self.model:
-            print("Cannot query agents: model instance is not available.")
-            return None
-
-        # Get all agents
-        agents = list(self.model.agent_set)
-
-        # Apply filters
-        if filters:
-            agents = self._apply_filters(agents, filters)
-
-        # Store total count before limiting
-        total_count = len(agents)
+            Dictionary with 'count', 'returned', 'agents' and 'aggregations' keys
+            (aggregations keyed by group label when group_by is set)
 
-        # Limit results
-        agents = agents[:limit]
-
-        # Extract fields
-        results = []
-        for agent in agents:
-            if fields:
-                agent_data = {}
-                for field in fields:
-                    # Handle nested attributes
-                    if hasattr(agent.state, field):
-                        value = getattr(agent.state, field)
-                        # Convert numpy types to Python types for JSON serialization
-                        if isinstance(value, (np.integer, np.floating)):
-                            value = value.item()
-                        agent_data[field] = value
-                    else:
-                        agent_data[field] = None
-            else:
-                # Default fields
-                political_pos = agent.state.calculate_political_position()
-                agent_data = {
-                    'id': agent.unique_id,
-                    'vermoegen': float(agent.state.vermoegen),
-                    'einkommen': float(agent.state.einkommen),
-                    'region': agent.state.region,
-                    'milieu': agent.state.milieu,
-                    'political_position': [float(political_pos[0]), float(political_pos[1])]
-                }
-            results.append(agent_data)
-
-        # Calculate aggregations
-        agg_results = {}
-        if aggregations:
-            # Use full filtered set for aggregations (before limit)
-            all_filtered = list(self.model.agent_set)
-            if filters:
-                all_filtered = self._apply_filters(all_filtered, filters)
-            agg_results = self._calculate_aggregations(all_filtered, aggregations)
-
-        return {
-            'count': total_count,
-            'returned': len(results),
-            'agents': results,
-            'aggregations': agg_results
-        }
-
-    def _apply_filters(self, agents: List, filters: Dict) -> List:
-        """Apply filters to agent list."""
-        filtered = agents
-
-        for field, condition in filters.items():
-            if isinstance(condition, dict):
-                # Range filter: {"min": 50000, "max": 100000}
-                if 'min' in condition:
-                    filtered = [a for a in filtered
-                              if self._get_agent_value(a, field) >= condition['min']]
-                if 'max' in condition:
-                    filtered = [a for a in filtered
-                              if self._get_agent_value(a, field) <= condition['max']]
-            elif isinstance(condition, list):
-                # In-list filter: ["Rechts-Konservativ", "Links-Liberal"]
-                filtered = [a for a in filtered
-                          if self._get_agent_value(a, field) in condition]
-            else:
-                # Exact match
-                filtered = [a for a in filtered
-                          if self._get_agent_value(a, field) == condition]
-
-        return filtered
-
-    def _get_agent_value(self, agent, field: str):
-        """Get value from agent, handling nested attributes."""
-        if hasattr(agent.state, field):
-            value = getattr(agent.state, field)
-            # Convert numpy types
-            if isinstance(value, (np.integer, np.floating)):
-                return value.item()
-            return value
-        return None
-
-    def _calculate_aggregations(self, agents: List, aggregations: List[str]) -> Dict:
-        """Calculate aggregations over filtered agents."""
-        results = {}
-
-        for agg in aggregations:
-            if agg == 'count':
-                results['count'] = len(agents)
-            elif agg.startswith('mean_'):
-                field = agg[5:]  # Remove 'mean_' prefix
-                values = [self._get_agent_value(a, field) for a in agents]
-                # Filter out None values
-                values = [v for v in values if v is not None]
-                results[agg] = float(np.mean(values)) if values else 0.0
-            elif agg.startswith('sum_'):
-                field = agg[4:]  # Remove 'sum_' prefix
-                values = [self._get_agent_value(a, field) for a in agents]
-                values = [v for v in values if v is not None]
-                results[agg] = float(np.sum(values)) if values else 0.0
-            elif agg.startswith('std_'):
-                field = agg[4:]  # Remove 'std_' prefix
-                values = [self._get_agent_value(a, field) for a in agents]
-                values = [v for v in values if v is not None]
-                results[agg] = float(np.std(values)) if values else 0.0
-            elif agg.startswith('min_'):
-                field = agg[4:]  # Remove 'min_' prefix
-                values = [self._get_agent_value(a, field) for a in agents]
-                values = [v for v in values if v is not None]
-                results[agg] = float(np.min(values)) if values else 0.0
-            elif agg.startswith('max_'):
-                field = agg[4:]  # Remove 'max_' prefix
-                values = [self._get_agent_value(a, field) for a in agents]
-                values = [v for v in values if v is not None]
-                results[agg] = float(np.max(values)) if values else 0.0
-            elif agg.startswith('distribution_'):
-                field = agg[13:]  # Remove 'distribution_' prefix
-                values = [self._get_agent_value(a, field) for a in agents]
-                values = [v for v in values if v is not None]
-                distribution = dict(Counter(values))
-                # Convert keys to strings for JSON serialization
-                results[agg] = {str(k): v for k, v in distribution.items()}
-            elif agg.startswith('percentile_'):
-                # Format: percentile_50_vermoegen -> 50th percentile of vermoegen
-                parts = agg.split('_')
-                if len(parts) >= 3:
-                    percentile = int(parts[1])
-                    field = '_'.join(parts[2:])
-                    values = [self._get_agent_value(a, field) for a in agents]
-                    values = [v for v in values if v is not None]
-                    results[agg] = float(np.percentile(values, percentile)) if values else 0.0
-
-        return results
+        Raises:
+            QueryError: for unknown fields, malformed aggregations and mistyped filter values
+        """
+        with self.lock:
+            if not self.model:
+                print("Cannot query agents: model instance is not available.")
+                return None
+            return AgentQueryEngine(self.model).run(filters, fields, limit, aggregations, group_by, order_by)
 
     def get_time_series(self, metrics: List[str], start_step: int = 0,
                        end_step: Optional[int] = None) -> Optional[Dict[str, Any]]:
-        """Extract time series for specific metrics from history.
+        """Extract time series for specific metrics from history (column slices of the ring buffer).
 
         Args:
             metrics: List of metric paths using dot notation (e.g., "model_report.Gini_Vermoegen")
-            start_step: Starting step (default: 0)
-            end_step: Ending step (None = current step)
+            start_step: First history entry (default: 0 = oldest retained)
+            end_step: End history entry, exclusive (None = latest)
 
         Returns:
             Dictionary with 'step' array and arrays for each metric
         """
-        if not self.history:
-            print("No history available for time series")
-            return None
+        with self.lock:
+            if not len(self.history):
+                print("No history available for time series")
+                return None
 
-        # Determine range
-        end_step = end_step if end_step is not None else len(self.history)
-        end_step = min(end_step, len(self.history))
+            # Determine range (positions in the retained history, 0 = oldest)
+            end_step = end_step if end_step is not None else len(self.history)
+            end_step = min(end_step, len(self.history))
 
-        if start_step >= end_step:
-            return {"error": "Invalid step range"}
-
-        # Initialize result structure
-        result = {
-            'step': [],
-            'metrics': {metric: [] for metric in metrics}
-        }
+            if start_step >= end_step:
+                return {"error": "Invalid step range"}
 
-        # Extract data for each snapshot in range
-        for i in range(start_step, end_step):
-            snapshot = self.history[i]
-            result['step'].append(snapshot.get('step', i))
+            steps, series = self.history.series(metrics, start_step, end_step)
 
-            for metric in metrics:
-                value = self._extract_metric(snapshot, metric)
-                result['metrics'][metric].append(value)
-
-        # Add metadata
-        result['metadata'] = {
-            'start_step': start_step,
-            'end_step': end_step,
-            'total_steps': end_step - start_step,
-            'metrics_requested': metrics
+        return {
+            'step': steps,
+            'metrics': series,
+            'metadata': {
+                'start_step': start_step,
+                'end_step': end_step,
+                'total_steps': end_step - start_step,
+                'metrics_requested': metrics
+            }
         }
 
-        return result
-
-    def _extract_metric(self, snapshot: Dict, metric_path: str) -> Any:
-        """Extract value from nested dict using dot notation.
-
-        Examples:
-            "step" -> snapshot['step']
-            "model_report.Gini_Vermoegen" -> snapshot['model_report']['Gini_Vermoegen']
-            "model_report.Regions.Urban" -> snapshot['model_report']['Regions']['Urban']
-        """
-        keys = metric_path.split('.')
-        value = snapshot
-
-        try:
-            for key in keys:
-                if isinstance(value, dict):
-                    value = value.get(key)
-                else:
-                    return None
-
-            # Convert numpy types for JSON serialization
-            if isinstance(value, (np.integer, np.floating)):
-                return float(value)
-            elif isinstance(value, (list, tuple)) and len(value) > 0:
-                if isinstance(value[0], (np.integer, np.floating)):
-                    return [float(v) for v in value]
-
-            return value
-
-        except (KeyError, TypeError, AttributeError):
-            return None
-
 # Create a single, globally accessible instance of the manager.
 manager = SimulationManager()
\ No newline at end of file
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class SimulationRunner:
+    """
+    Continuous server-side simulation loop.
+
+    Steps run in a worker thread, off the event loop, either as fast as possible or
+    paced to a target steps-per-second. A separate publisher task on the event loop
+    snapshots the model at the UI frame rate (`ui_fps`), records that snapshot in the
+    history and broadcasts it. Simulation throughput and visualization refresh rate are
+    therefore independent: at 500 steps/s and 10 fps a frame covers ~50 steps.
+    """
+
+    STATES = ('stopped', 'running', 'paused')
+
+    def __init__(self, simulation_manager, connection_manager, report_stream, ui_fps: Optional[float] = None):
+        self.simulation_manager = simulation_manager
+        self.connection_manager = connection_manager
+        self.report_stream = report_stream
+        self.ui_fps = ui_fps or float(os.getenv('SIMULATION_UI_FPS', '10'))
+
+        self.state = 'stopped'
+        self.steps_per_second: Optional[float] = None  # None = as fast as possible
+        self.max_steps: Optional[int] = None
+        self.steps_run = 0
+        self.measured_steps_per_second = 0.0
+        self.last_error: Optional[str] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._publisher: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._resume = threading.Event()
+        self._published_step: Optional[int] = None
+
+    # --- Control ---
+    def start(self, steps_per_second: Optional[float] = None, max_steps: Optional[int] = None,
+              ui_fps: Optional[float] = None) -> Dict[str, Any]:
+        """Starts the run loop. Must be called from the event loop (it spawns the publisher task)."""
+        if self.state != 'stopped':
+            raise RuntimeError(f"Simulation runner is already {self.state}.")
+        if self.simulation_manager.model is None:
+            raise RuntimeError("Simulation model not available.")
+        if steps_per_second is not None and steps_per_second <= 0:
+            raise ValueError("steps_per_second must be positive (omit it to run as fast as possible).")
+
+        self.steps_per_second = steps_per_second
+        self.max_steps = max_steps
+        if ui_fps:
+            self.ui_fps = ui_fps
+        self.steps_run = 0
+        self.measured_steps_per_second = 0.0
+        self.last_error = None
+        self._published_step = None
+
+        self._stop.clear()
+        self._resume.set()
+        self.state = 'running'
+        self._thread = threading.Thread(target=self._run, name="simulation-runner", daemon=True)
+        self._thread.start()
+        self._publisher = asyncio.get_running_loop().create_task(self._publish_loop())
+        return self.status()
+
+    def pause(self) -> Dict[str, Any]:
+        if self.state != 'running':
+            raise RuntimeError(f"Cannot pause: simulation runner is {self.state}.")
+        self._resume.clear()
+        self.state = 'paused'
+        return self.status()
+
+    def resume(self) -> Dict[str, Any]:
+        if self.state != 'paused':
+            raise RuntimeError(f"Cannot resume: simulation runner is {self.state}.")
+        self.state = 'running'
+        self._resume.set()
+        return self.status()
+
+    async def stop(self) -> Dict[str, Any]:
+        """Stops the loop, waits for the current step and publishes the final state."""
+        self._stop.set()
+        self._resume.set()
+        if self._thread:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+        if self._publisher:
+            await self._publisher
+            self._publisher = None
+        self.state = 'stopped'
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        model = self.simulation_manager.model
+        return {
+            "state": self.state,
+            "step": getattr(model, 'step_count', None),
+            "steps_run": self.steps_run,
+            "target_steps_per_second": self.steps_per_second,
+            "measured_steps_per_second": round(self.measured_steps_per_second, 2),
+            "max_steps": self.max_steps,
+            "ui_fps": self.ui_fps,
+            "last_error": self.last_error,
+        }
+
+    # --- Worker Thread ---
+    def _run(self):
+        interval = 1.0 / self.steps_per_second if self.steps_per_second else 0.0
+        started = time.perf_counter()
+        next_step_at = started
+        try:
+            while not self._stop.is_set():
+                self._resume.wait()
+                if self._stop.is_set():
+                    break
+                if not self.simulation_manager.advance_model():
+                    self.last_error = "Simulation model not available."
+                    break
+                self.steps_run += 1
+                now = time.perf_counter()
+                self.measured_steps_per_second = self.steps_run / max(now - started, 1e-9)
+                if self.max_steps is not None and self.steps_run >= self.max_steps:
+                    break
+                if interval:
+                    next_step_at += interval
+                    delay = next_step_at - now
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    elif delay < -1.0:
+                        # Far behind schedule (slow steps or a pause): don't try to catch up
+                        next_step_at = now
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Simulation runner stopped after error: {e}")
+        finally:
+            self._stop.set()
+
+    # --- Publisher (event loop) ---
+    async def _publish_loop(self):
+        while not self._stop.is_set():
+            await asyncio.sleep(1.0 / self.ui_fps)
+            await self._publish()
+        if self._thread:
+            await asyncio.to_thread(self._thread.join)
+        await self._publish()
+        self.state = 'stopped'
+
+    async def _publish(self):
+        """Snapshots, records and broadcasts the current state if it advanced since the last frame."""
+        frames = await asyncio.to_thread(self._snapshot_frames)
+        if frames:
+            await self.connection_manager.broadcast_report(frames, self.report_stream.for_agent_format)
+
+    def _snapshot_frames(self):
+        with self.simulation_manager.lock:
+            model = self.simulation_manager.model
+            if model is None or model.step_count == self._published_step:
+                return None
+            report = self.simulation_manager.record_snapshot()
+            self._published_step = model.step_count
+            return self.report_stream.publish(model, report)
@@ -0,0 +1,39 @@
+"""
+Tests for bulk agent initialization
+"""
+
+import numpy as np
+
+from political_abm.model import PoliticalModel
+
+
+def test_bulk_initialization_columns():
+    model = PoliticalModel(num_agents=500, seed=12)
+    store = model.agent_store
+    params = model.global_model_parameters
+
+    assert len(store) == len(model.agent_set) == 500
+    # Positions stay inside the agent's biome sector
+    x_min = np.array([l['x_min'] for l in model.layout])[store.codes['region']]
+    x_max = np.array([l['x_max'] for l in model.layout])[store.codes['region']]
+    assert np.all((store.position[:, 0] >= x_min) & (store.position[:, 0] <= x_max))
+    assert np.all((store.alter >= 18) & (store.alter <= 65))
+    # Derived attributes follow from the drawn base attributes
+    np.testing.assert_allclose(
+        store.risikoaversion, 1 / (1 + store.vermoegen / params['wealth_sensitivity_factor'])
+    )
+    np.testing.assert_allclose(store.zeitpraeferenzrate, np.clip(1 - store.kognitive_kapazitaet_basis, 0.1, 0.9))
+    np.testing.assert_array_equal(store.effektive_kognitive_kapazitaet, store.kognitive_kapazitaet_basis)
+    assert set(store.labels('milieu')) == {'Unassigned'}
+    # Agent views read the same rows
+    agent = model.agent_set[7]
+    assert agent.state.region == store.labels('region')[7]
+    assert agent.state.bildung == store.bildung[7]
+
+
+def test_bulk_initialization_is_seeded():
+    a = PoliticalModel(num_agents=200, seed=3).agent_store
+    b = PoliticalModel(num_agents=200, seed=3).agent_store
+    np.testing.assert_array_equal(a.vermoegen, b.vermoegen)
+    np.testing.assert_array_equal(a.codes['initial_milieu'], b.codes['initial_milieu'])
+    np.testing.assert_array_equal(a.position, b.position)
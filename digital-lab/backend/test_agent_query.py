@@ -0,0 +1,118 @@
+"""
+Tests for the vectorized agent query engine (against per-agent brute force)
+"""
+
+import numpy as np
+import pytest
+
+from agent_query import AgentQueryEngine, QueryError
+from political_abm.model import PoliticalModel
+
+
+def _model():
+    model = PoliticalModel(num_agents=300, seed=21)
+    model.step()
+    return model
+
+
+def _matching(model, predicate):
+    return [a for a in model.agent_set if predicate(a.state)]
+
+
+def test_filters_match_per_agent_evaluation():
+    model = _model()
+    engine = AgentQueryEngine(model)
+    wealth = np.median(model.agent_store.vermoegen)
+    region = model.agent_store.categories['region'][0]
+    milieus = list(model.agent_store.categories['milieu'][:2])
+    filters = {"vermoegen": {"min": wealth}, "region": region, "milieu": milieus + ["Unbekannt"]}
+
+    expected = _matching(
+        model, lambda s: s.vermoegen >= wealth and s.region == region and s.milieu in milieus
+    )
+    result = engine.run(filters, fields=["id", "vermoegen", "milieu"], limit=5)
+
+    assert result["count"] == len(expected)
+    assert [r["id"] for r in result["agents"]] == [a.unique_id for a in expected[:5]]
+    assert all(r["milieu"] in milieus for r in result["agents"])
+    assert engine.run({"region": "Unbekannt"})["count"] == 0
+
+
+def test_filter_values_of_another_type_never_match():
+    model = _model()
+    engine = AgentQueryEngine(model)
+    ages = model.agent_store.alter
+    a, b = int(ages[0]), int(ages[1])
+
+    result = engine.run({"alter": [a, b, "x"]})
+    assert result["count"] == int(np.isin(ages, [a, b]).sum())
+    assert engine.run({"alter": "x"})["count"] == 0
+    assert engine.run({"milieu": [1, 2]})["count"] == 0
+    with pytest.raises(QueryError):
+        engine.run({"vermoegen": {"min": "5"}})
+    with pytest.raises(QueryError):
+        engine.run({"region": {"max": 3}})
+
+
+def test_aggregations_match_numpy():
+    model = _model()
+    region = model.agent_store.categories['region'][1]
+    states = [a.state for a in _matching(model, lambda s: s.region == region)]
+    wealth = np.array([s.vermoegen for s in states])
+
+    aggregations = AgentQueryEngine(model).run(
+        {"region": region},
+        aggregations=["count", "mean_vermoegen", "std_vermoegen", "min_vermoegen", "max_vermoegen",
+                      "sum_vermoegen", "percentile_90_vermoegen", "distribution_milieu"],
+    )["aggregations"]
+
+    assert aggregations["count"] == len(states)
+    assert aggregations["mean_vermoegen"] == pytest.approx(wealth.mean())
+    assert aggregations["std_vermoegen"] == pytest.approx(wealth.std())
+    assert aggregations["min_vermoegen"] == pytest.approx(wealth.min())
+    assert aggregations["max_vermoegen"] == pytest.approx(wealth.max())
+    assert aggregations["sum_vermoegen"] == pytest.approx(wealth.sum())
+    assert aggregations["percentile_90_vermoegen"] == pytest.approx(np.percentile(wealth, 90))
+    milieus = [s.milieu for s in states]
+    assert aggregations["distribution_milieu"] == {m: milieus.count(m) for m in set(milieus)}
+
+
+def test_group_by_computes_aggregations_per_group():
+    model = _model()
+    grouped = AgentQueryEngine(model).run(
+        aggregations=["count", "mean_einkommen", "percentile_50_vermoegen"], group_by="region"
+    )["aggregations"]
+
+    for region, result in grouped.items():
+        states = [a.state for a in _matching(model, lambda s: s.region == region)]
+        assert result["count"] == len(states)
+        assert result["mean_einkommen"] == pytest.approx(np.mean([s.einkommen for s in states]))
+        assert result["percentile_50_vermoegen"] == pytest.approx(np.median([s.vermoegen for s in states]))
+    assert sum(r["count"] for r in grouped.values()) == len(model.agent_set)
+
+
+def test_order_by_returns_top_k():
+    model = _model()
+    engine = AgentQueryEngine(model)
+    wealth = sorted((a.state.vermoegen for a in model.agent_set), reverse=True)
+
+    richest = engine.run(fields=["vermoegen"], limit=10, order_by="-vermoegen")["agents"]
+    poorest = engine.run(fields=["vermoegen"], limit=10, order_by="vermoegen")["agents"]
+
+    assert [r["vermoegen"] for r in richest] == pytest.approx(wealth[:10])
+    assert [r["vermoegen"] for r in poorest] == pytest.approx(wealth[::-1][:10])
+
+
+def test_invalid_queries_raise():
+    engine = AgentQueryEngine(_model())
+    with pytest.raises(QueryError):
+        engine.run({"unbekannt": 1})
+    with pytest.raises(QueryError):
+        engine.run(aggregations=["median_vermoegen"])
+    for aggregation in ("mean_vermogen", "sum_foo", "distribution_foo", "percentile_50_foo", "mean_milieu"):
+        with pytest.raises(QueryError):
+            engine.run(aggregations=[aggregation])
+    with pytest.raises(QueryError):
+        engine.run(group_by="unbekannt")
+    with pytest.raises(QueryError):
+        engine.run(order_by="-unbekannt")
@@ -0,0 +1,68 @@
+"""
+Tests for the columnar AgentStore and the AgentState views onto it
+"""
+
+import numpy as np
+
+from political_abm.model import PoliticalModel
+
+
+def test_agent_state_views_share_store():
+    """Writes through AgentState land in the store columns and vice versa"""
+    model = PoliticalModel(num_agents=30)
+    store = model.agent_store
+
+    assert len(store) == len(model.agent_set) == 30
+
+    agent = model.agent_set[7]
+    agent.state.vermoegen = 12345.0
+    agent.state.milieu = "Testmilieu"
+    assert store.vermoegen[7] == 12345.0
+    assert store.categories['milieu'][store.codes['milieu'][7]] == "Testmilieu"
+
+    store.altruism_factor[:] = 0.25
+    assert all(a.state.altruism_factor == 0.25 for a in model.agent_set)
+
+
+def test_step_keeps_agents_and_store_aligned():
+    """A full step leaves per-agent views and columns consistent"""
+    model = PoliticalModel(num_agents=40)
+    model.step()
+    model.step()
+
+    store = model.agent_store
+    wealth = np.array([a.state.vermoegen for a in model.agent_set])
+    regions = [a.state.region for a in model.agent_set]
+
+    assert np.array_equal(wealth, store.vermoegen)
+    assert regions == store.labels('region')
+    assert all(len(a.state.position_history) == 2 for a in model.agent_set)
+
+    report = model.get_model_report()
+    assert sum(report['model_report']['Regions'].values()) == 40
+    assert len(report['agent_visuals']) == 40
+
+
+def test_political_positions_cached_until_inputs_change():
+    """The (N, 2) position matrix is reused until vermoegen/altruism/freedom are written"""
+    model = PoliticalModel(num_agents=25)
+    store = model.agent_store
+
+    positions = store.political_positions()
+    assert store.political_positions() is positions
+    assert model.agent_set[3].state.calculate_political_position() == tuple(positions[3])
+
+    store.einkommen += 1.0
+    assert store.political_positions() is positions
+
+    model.agent_set[3].state.freedom_preference = 1.0
+    assert store.cached_political_positions() is None
+    assert store.political_positions()[3, 1] == 1.0
+
+    store.vermoegen *= 2
+    refreshed = store.political_positions()
+    assert refreshed is not positions
+    assert all(
+        a.state.calculate_political_position() == tuple(refreshed[i])
+        for i, a in enumerate(model.agent_set)
+    )
@@ -0,0 +1,55 @@
+"""
+Tests for code-indexed biome parameters and vectorized hazards
+"""
+
+import numpy as np
+
+from political_abm.model import PoliticalModel
+
+
+def test_groups_match_per_biome_masks():
+    model = PoliticalModel(num_agents=80, seed=4)
+    table = model.biome_table
+    codes = model.agent_store.codes['region']
+
+    groups = table.groups(codes)
+    assert len(groups) == len(table)
+    for code, rows in enumerate(groups):
+        np.testing.assert_array_equal(rows, np.flatnonzero(codes == code))
+    assert table.codes[table.names[1]] == 1
+    assert table.values(model.effective_hazard_probabilities).shape == (len(table),)
+
+
+def test_batch_hazards_hit_by_biome_probability():
+    """Certain hazard in the first biome, none elsewhere: exactly its agents lose the impact share"""
+    model = PoliticalModel(num_agents=60, seed=8)
+    store = model.agent_store
+    for code, name in enumerate(model.biome_table.names):
+        model.effective_hazard_probabilities[name] = 1.0 if code == 0 else 0.0
+    wealth_before = store.vermoegen.copy()
+
+    model.hazard_manager.trigger_events_batch()
+
+    events = model.hazard_manager.events
+    in_first = np.flatnonzero(store.codes['region'] == 0)
+    np.testing.assert_array_equal(events.agent_index, in_first)
+    impact = model.biome_table.hazard_impact_factor[0]
+    np.testing.assert_allclose(events.wealth_loss, wealth_before[in_first] * impact)
+    np.testing.assert_allclose(store.vermoegen[in_first], wealth_before[in_first] * (1 - impact))
+    assert events.counts_per_biome(len(model.biome_table)).tolist()[0] == len(in_first)
+    assert len(model.hazard_manager.events_this_step) == len(in_first)
+
+
+def test_investment_totals_shared_by_report():
+    model = PoliticalModel(num_agents=90, seed=10)
+    model.step()
+    investments = model.investments
+    codes = model.agent_store.codes['region']
+
+    assert len(investments) == 90
+    for code, name in enumerate(model.biome_table.names):
+        expected = investments.investment_made[codes == code].sum()
+        assert np.isclose(investments.totals_per_biome[code], expected)
+        report = model.get_model_report()['model_report']['biomes_dynamic_data'][name]
+        assert report['total_investment'] == investments.totals_per_biome[code]
+    assert model.investment_decisions_this_step[3]['agent_id'] == model.agent_set[3].unique_id
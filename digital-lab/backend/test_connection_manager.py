@@ -0,0 +1,78 @@
+"""
+Tests for the queued, backpressure-aware WebSocket broadcaster
+"""
+
+import asyncio
+
+from connection_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self._send(text)
+
+    async def send_bytes(self, data):
+        await self._send(data)
+
+    async def _send(self, message):
+        if self.fail:
+            raise RuntimeError("connection lost")
+        await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_slow_and_dead_clients_do_not_block_others():
+    """Fast clients get every message; slow ones drop the oldest; dead ones are evicted"""
+    async def scenario():
+        manager = ConnectionManager(max_queue=2, policy='drop_oldest')
+        fast, slow, dead = FakeWebSocket(), FakeWebSocket(delay=0.05), FakeWebSocket(fail=True)
+        for ws in (fast, slow, dead):
+            await manager.connect(ws)
+
+        for i in range(6):
+            await manager.broadcast({"i": i})
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.3)
+        return manager, fast, slow, dead
+
+    manager, fast, slow, dead = asyncio.run(scenario())
+    assert fast.sent == [f'{{"i":{i}}}' for i in range(6)]
+    assert slow.sent[0] == '{"i":0}' and slow.sent[-1] == '{"i":5}' and len(slow.sent) < 6
+    assert dead.closed and dead not in manager.active_connections
+    assert manager.queue_depth() == 0
+
+
+def test_coalesce_keeps_latest_report_per_format():
+    """Coalescing keeps only the newest broadcast; report frames are adapted once per format"""
+    async def scenario():
+        manager = ConnectionManager(policy='coalesce')
+        json_ws, binary_ws = FakeWebSocket(delay=0.05), FakeWebSocket()
+        await manager.connect(json_ws)
+        await manager.connect(binary_ws, agent_format="binary")
+
+        calls = []
+        def adapt(frames, agent_format):
+            calls.append(agent_format)
+            return frames if agent_format == "json" else frames + [b"\x00"]
+
+        for step in range(4):
+            await manager.broadcast_report([{"step": step}], adapt)
+        await asyncio.sleep(0.2)
+        return json_ws, binary_ws, calls
+
+    json_ws, binary_ws, calls = asyncio.run(scenario())
+    assert calls.count("json") == 4 and calls.count("binary") == 4
+    assert json_ws.sent[-1] == '{"step":3}' and len(json_ws.sent) < 4
+    assert binary_ws.sent[-2:] == ['{"step":3}', b"\x00"]
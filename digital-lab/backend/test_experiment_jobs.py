@@ -0,0 +1,66 @@
+"""
+Tests for background experiment jobs: progress tracking and cancellation
+"""
+
+import time
+
+from config.experiment_models import CreateExperimentRequest, TreatmentConfig
+from experiment_jobs import ExperimentJobManager
+from experiment_service import ExperimentService
+
+
+def _request(num_runs=2, target_steps=3):
+    return CreateExperimentRequest(
+        name="Job",
+        description="Background job test",
+        baseline_config={"num_agents": 30},
+        treatments=[
+            TreatmentConfig(name="A", config_modifications={}, num_runs=num_runs),
+            TreatmentConfig(name="B", config_modifications={}, num_runs=num_runs),
+        ],
+        target_steps=target_steps,
+        seed=3,
+    )
+
+
+def _wait(job, timeout=60):
+    deadline = time.monotonic() + timeout
+    while job.state not in ('completed', 'failed', 'cancelled') and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return job.status()
+
+
+def test_job_reports_progress_and_completes(tmp_path):
+    service = ExperimentService(tmp_path, max_workers=1)
+    jobs = ExperimentJobManager(service)
+    definition = service.create_experiment(_request())
+
+    job = jobs.submit(definition.id)
+    status = _wait(job)
+
+    assert status["state"] == "completed"
+    assert status["completed_runs"] == status["total_runs"] == 4
+    assert status["treatments"] == {"A": {"completed": 2, "total": 2}, "B": {"completed": 2, "total": 2}}
+    assert status["steps_completed"] == 12 and status["steps_per_second"] > 0
+    stored = service.get_experiment(definition.id)
+    assert stored.status == "completed" and stored.job_id == job.id
+    assert service.get_results(definition.id) is not None
+
+
+def test_cancel_queued_and_running_jobs(tmp_path):
+    service = ExperimentService(tmp_path, max_workers=1)
+    jobs = ExperimentJobManager(service)
+    running = jobs.submit(service.create_experiment(_request(num_runs=50, target_steps=2)).id)
+    queued = jobs.submit(service.create_experiment(_request()).id)
+
+    while running.completed_runs == 0:
+        time.sleep(0.05)
+    jobs.cancel(queued.id)
+    jobs.cancel(running.id)
+
+    assert _wait(queued)["state"] == "cancelled"
+    status = _wait(running)
+    assert status["state"] == "cancelled" and status["completed_runs"] < status["total_runs"]
+    assert service.get_experiment(running.experiment_id).status == "cancelled"
+    assert service.get_experiment(queued.experiment_id).status == "cancelled"
+    assert service.get_results(running.experiment_id) is None
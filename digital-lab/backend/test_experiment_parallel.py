@@ -0,0 +1,79 @@
+"""
+Tests for parallel experiment execution: deterministic seeds, streaming and retries
+"""
+
+import threading
+
+import pytest
+
+import experiment_service as experiment_service_module
+import experiment_worker
+from config.experiment_models import CreateExperimentRequest, TreatmentConfig
+from experiment_service import ExperimentService
+
+
+def _request(seed=7):
+    return CreateExperimentRequest(
+        name="Parallel",
+        description="Parallel execution test",
+        baseline_config={"num_agents": 30},
+        treatments=[
+            TreatmentConfig(name="A", config_modifications={}, num_runs=2),
+            TreatmentConfig(name="B", config_modifications={"num_agents": 40}, num_runs=2),
+        ],
+        target_steps=3,
+        seed=seed,
+    )
+
+
+def _final_metrics(results):
+    return {t.treatment_name: [(r.seed, r.final_metrics) for r in t.runs] for t in results.treatments}
+
+
+def test_process_pool_matches_sequential_run(tmp_path):
+    """Per-run seeds make the result independent of worker count and completion order"""
+    sequential = ExperimentService(tmp_path / "seq", max_workers=1)
+    parallel = ExperimentService(tmp_path / "par", max_workers=2)
+
+    streamed = []
+    seq_results = sequential.run_experiment(sequential.create_experiment(_request()).id)
+    par_results = parallel.run_experiment(
+        parallel.create_experiment(_request()).id,
+        on_run=lambda treatment, run: streamed.append((treatment, run.run_number))
+    )
+
+    assert _final_metrics(par_results) == _final_metrics(seq_results)
+    assert sorted(streamed) == [("A", 0), ("A", 1), ("B", 0), ("B", 1)]
+    seeds = [seed for runs in _final_metrics(par_results).values() for seed, _ in runs]
+    assert len(set(seeds)) == 4
+
+
+def test_failed_run_is_retried(tmp_path, monkeypatch):
+    calls = []
+    real_execute_run = experiment_service_module.execute_run
+
+    def flaky_execute_run(config, target_steps, run_number, seed):
+        calls.append(run_number)
+        if calls.count(run_number) == 1 and run_number == 1:
+            raise RuntimeError("worker lost")
+        return real_execute_run(config, target_steps, run_number, seed)
+
+    monkeypatch.setattr(experiment_service_module, "execute_run", flaky_execute_run)
+    service = ExperimentService(tmp_path, max_workers=1, max_retries=1)
+    definition = service.create_experiment(_request())
+    results = service.run_experiment(definition.id)
+
+    assert [len(t.runs) for t in results.treatments] == [2, 2]
+    assert calls.count(1) == 3  # failed once in treatment A, then succeeded in A and B
+    assert service.get_experiment(definition.id).status == "completed"
+
+
+def test_worker_run_stops_when_cancel_event_is_set(monkeypatch):
+    cancel = threading.Event()
+    monkeypatch.setattr(experiment_worker, "_cancel_event", None)
+    experiment_worker.init_worker(cancel)
+    assert experiment_worker.execute_run({"num_agents": 10}, 1, 0, seed=1)["simulation_steps"] == 1
+
+    cancel.set()
+    with pytest.raises(experiment_worker.RunCancelled):
+        experiment_worker.execute_run({"num_agents": 10}, 5, 0, seed=1)
@@ -0,0 +1,53 @@
+"""
+Tests for the shared Gini / top-share / Lorenz / percentile module
+"""
+
+import numpy as np
+
+from political_abm.inequality import gini, top_share, lorenz_curve, percentiles, inequality_summary
+
+
+def _pairwise_gini(values):
+    """Quadratic reference: mean absolute difference over twice the mean"""
+    x = np.asarray(values, dtype=float)
+    x = x[x >= 0]
+    return np.abs(x[:, None] - x[None, :]).sum() / (2 * len(x) ** 2 * x.mean())
+
+
+def test_gini_matches_pairwise_definition():
+    rng = np.random.default_rng(3)
+    for values in (rng.pareto(2.0, 500) * 1000, rng.lognormal(10, 0.5, 123), [1000, 2000, 3000, 5000, 10000, 25000, 50000]):
+        assert np.isclose(gini(values), _pairwise_gini(values))
+        assert np.isclose(gini(np.sort(values), presorted=True), _pairwise_gini(values))
+
+
+def test_gini_edge_cases():
+    assert gini([]) == 0
+    assert gini([0, 0, 0]) == 0
+    assert gini([10, 10, 10, 10]) == 0
+    assert np.isclose(gini([0, 0, 0, 0, 100]), 0.8)
+    # Negative values are ignored
+    assert np.isclose(gini([-50, 0, 0, 0, 0, 100]), 0.8)
+
+
+def test_top_share_and_lorenz():
+    values = np.arange(1, 11, dtype=float)  # total 55, top 10% = 10
+    assert np.isclose(top_share(values, 0.1), 10 / 55)
+    assert np.isclose(top_share(values, 0.2), 19 / 55)
+
+    population, cumulative = lorenz_curve(values)
+    assert population[0] == 0 and cumulative[0] == 0
+    assert np.isclose(cumulative[-1], 1.0)
+    # Gini equals 1 - 2 * area under the Lorenz curve (corrected for discrete n)
+    area = np.trapezoid(cumulative, population) if hasattr(np, 'trapezoid') else np.trapz(cumulative, population)
+    assert np.isclose(gini(values), 1 - 2 * area)
+
+
+def test_summary_uses_single_sort():
+    rng = np.random.default_rng(11)
+    values = rng.lognormal(10, 0.8, 1001)
+    summary = inequality_summary(values)
+    assert np.allclose(percentiles(values, [10, 50, 90]), np.percentile(values, [10, 50, 90]))
+    assert np.isclose(summary["p50"], np.median(values))
+    assert np.isclose(summary["gini"], gini(values))
+    assert np.isclose(summary["top10_share"], top_share(values, 0.1))
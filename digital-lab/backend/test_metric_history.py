@@ -0,0 +1,73 @@
+"""
+Tests for the columnar ring-buffer history
+"""
+
+from metric_history import MetricHistory
+from simulation_manager import SimulationManager
+
+
+def _report(step, gini, regions=None):
+    report = {"step": step, "model_report": {"Gini_Vermoegen": gini, "Mean_Altruism": 0.5, "layout": [1, 2]}}
+    if regions:
+        report["model_report"]["Regions"] = regions
+    return report
+
+
+def test_ring_buffer_keeps_latest_rows_in_order():
+    history = MetricHistory(capacity=3)
+    for step in range(5):
+        history.append(_report(step, step / 10))
+
+    assert len(history) == 3
+    assert history.step_list() == [2, 3, 4]
+    steps, series = history.series(["model_report.Gini_Vermoegen", "step", "model_report.missing"], 1)
+    assert steps == [3, 4]
+    assert series["model_report.Gini_Vermoegen"] == [0.3, 0.4]
+    assert series["step"] == [3, 4]
+    assert series["model_report.missing"] == [None, None]
+    assert "model_report.layout" not in history.columns
+
+
+def test_new_nested_columns_start_as_missing():
+    history = MetricHistory(capacity=4, initial_columns=1)
+    history.append(_report(0, 0.1))
+    history.append(_report(1, 0.2, regions={"Urban": 7}))
+
+    _, series = history.series(["model_report.Regions.Urban", "model_report.Mean_Altruism"])
+    assert series["model_report.Regions.Urban"] == [None, 7.0]
+    assert series["model_report.Mean_Altruism"] == [0.5, 0.5]
+
+
+def test_manager_history_and_agent_snapshots():
+    manager = SimulationManager()
+    manager.max_agent_snapshots = 2
+    manager.reset_model(num_agents=20, seed=4)
+    for _ in range(3):
+        manager.step_model()
+
+    result = manager.get_time_series(["model_report.Gini_Vermoegen"], start_step=1)
+    assert result["step"] == [1, 2, 3]
+    assert len(result["metrics"]["model_report.Gini_Vermoegen"]) == 3
+    # Agent states are kept only for the latest steps
+    assert [s["step"] for s in manager.agent_snapshots] == [2, 3]
+    assert len(manager.get_agent_snapshot()["agent_visuals"]) == 20
+    assert manager.get_agent_snapshot(step=1) is None
+
+
+def test_run_steps_builds_agent_visuals_only_for_kept_snapshots():
+    manager = SimulationManager()
+    manager.max_agent_snapshots = 3
+    manager.reset_model(num_agents=20, seed=4)
+    assert manager._snapshot_steps(10, history_every=4) == [4, 8, 10]
+    assert manager._snapshot_steps(12, history_every=4) == [4, 8, 12]
+    assert manager._snapshot_steps(40, history_every=1) == [38, 39, 40]
+    assert manager._snapshot_steps(5, history_every=0) == [5]
+
+    built = []
+    get_model_data = manager.get_model_data
+    manager.get_model_data = lambda sections=None: built.append(sections is None) or get_model_data(sections)
+    manager.run_steps(40, history_every=1)
+
+    assert sum(built) == 3
+    assert [s["step"] for s in manager.agent_snapshots] == [38, 39, 40]
+    assert manager.history.step_list()[-1] == 40
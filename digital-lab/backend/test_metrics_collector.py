@@ -0,0 +1,47 @@
+"""
+Tests for the per-step scalar metrics collector
+"""
+
+import numpy as np
+import pytest
+
+from experiment_worker import execute_run
+from political_abm.model import PoliticalModel
+
+
+def test_collector_matches_report_each_step():
+    model = PoliticalModel(num_agents=60, seed=31)
+    collector = model.add_metrics_collector(['gini', 'avg_wealth', 'avg_income', 'mean_altruism', 'hazard_events'], capacity=2)
+
+    for _ in range(5):
+        model.step()
+        mr = model.get_model_report(sections=('summary',))['model_report']
+        latest = collector.latest()
+        assert np.isclose(latest['gini'], mr['Gini_Vermoegen'])
+        assert np.isclose(latest['avg_wealth'], mr['Durchschnittsvermoegen'])
+        assert np.isclose(latest['avg_income'], mr['Durchschnittseinkommen'])
+        assert np.isclose(latest['mean_altruism'], mr['Mean_Altruism'])
+        assert latest['hazard_events'] == mr['Hazard_Events_Count']
+
+    # The buffer grew past its initial capacity
+    assert len(collector) == 5
+    assert collector.steps[:5].tolist() == [1, 2, 3, 4, 5]
+    assert collector.series('gini').shape == (5,)
+    assert list(collector.to_dict()) == collector.metrics
+
+    model.remove_metrics_collector(collector)
+    model.step()
+    assert len(collector) == 5
+
+    with pytest.raises(ValueError):
+        model.add_metrics_collector(['median_happiness'])
+
+
+def test_experiment_run_reports_wealth_and_income():
+    run = execute_run({'num_agents': 40}, target_steps=3, run_number=1, seed=5)
+    assert set(run['time_series']) == {'gini', 'avg_wealth', 'avg_income', 'mean_altruism'}
+    assert len(run['time_series']['avg_wealth']) == 3
+    assert run['final_metrics']['avg_wealth'] > 0
+    assert run['final_metrics']['avg_income'] > 0
+    assert run['final_metrics']['avg_wealth'] == run['time_series']['avg_wealth'][-1]
+    assert 0 < run['final_metrics']['top10_share'] <= 1
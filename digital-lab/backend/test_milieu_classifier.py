@@ -0,0 +1,38 @@
+"""
+Tests for the nearest-center milieu classifier and the report's milieu distribution
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from political_abm.milieu_classifier import MilieuClassifier
+from political_abm.model import PoliticalModel
+
+
+def test_classifier_matches_per_agent_nearest_center():
+    """Broadcasted argmin picks the same milieu as the per-agent norm comparison"""
+    model = PoliticalModel(num_agents=10)
+    classifier = MilieuClassifier(model.milieus)
+
+    positions = np.random.default_rng(1).uniform(-1, 1, size=(2000, 2))
+    nearest, counts = classifier.classify(positions)
+
+    expected = [
+        int(np.argmin([np.linalg.norm(pos - center) for center in classifier.centers]))
+        for pos in positions
+    ]
+    np.testing.assert_array_equal(nearest, expected)
+    assert counts.sum() == len(positions)
+
+
+def test_report_milieu_distribution_follows_classification():
+    """milieu_distribution in the report counts the agents' dynamic milieu assignments"""
+    for engine in PoliticalModel.ENGINES:
+        model = PoliticalModel(num_agents=60, engine=engine)
+        model.step()
+
+        distribution = model.get_model_report()['model_report']['population_report']['milieu_distribution']
+        labels = Counter(a.state.milieu for a in model.agent_set)
+        assert distribution == {m.name: labels.get(m.name, 0) for m in model.milieus}
+        assert sum(distribution.values()) == 60
@@ -0,0 +1,50 @@
+"""
+Tests for the memoized, section-wise model report
+"""
+
+import numpy as np
+import pytest
+
+from political_abm.model import PoliticalModel
+
+
+def test_sections_memoized_until_next_step():
+    model = PoliticalModel(num_agents=40, seed=21)
+    model.step()
+
+    summary = model.get_model_report(sections=('summary',))
+    assert 'agent_visuals' not in summary
+    assert 'Gini_Vermoegen' in summary['model_report']
+    assert 'Regions' not in summary['model_report']
+    assert 'agent_visuals' not in model.report._sections
+
+    full = model.get_model_report()
+    assert full['model_report']['Gini_Vermoegen'] == summary['model_report']['Gini_Vermoegen']
+    assert model.get_model_report()['agent_visuals'] is full['agent_visuals']
+
+    model.step()
+    after = model.get_model_report()
+    assert after['step'] == full['step'] + 1
+    assert after['agent_visuals'] is not full['agent_visuals']
+    assert np.isclose(after['model_report']['Durchschnittsvermoegen'], np.mean(model.agent_store.vermoegen))
+
+    with pytest.raises(ValueError):
+        model.get_model_report(sections=('agents',))
+
+
+def test_agent_visuals_match_agent_states():
+    model = PoliticalModel(num_agents=25, seed=22)
+    model.step()
+    model.step()
+    visuals = model.get_model_report()['agent_visuals']
+
+    assert len(visuals) == 25
+    for visual, agent in zip(visuals, model.agent_set):
+        state = agent.state
+        assert visual['id'] == agent.unique_id
+        assert visual['position'] == list(state.position)
+        assert visual['position_history'] == [list(pos) for pos in state.position_history]
+        a, b = state.calculate_political_position()
+        assert visual['political_position'] == {"a": a, "b": b}
+        for field in ('region', 'schablone', 'initial_milieu', 'milieu', 'alter', 'vermoegen', 'ersparnis'):
+            assert visual[field] == getattr(state, field)
@@ -0,0 +1,40 @@
+"""
+Tests for per-model seeded random streams
+"""
+
+import numpy as np
+
+from political_abm.agent_store import FLOAT_FIELDS
+from political_abm.model import PoliticalModel
+from political_abm.random_streams import RandomStreams
+
+
+def _run(model, steps):
+    for _ in range(steps):
+        model.step()
+    return {field: model.agent_store.column(field).copy() for field in FLOAT_FIELDS}
+
+
+def test_same_seed_reproduces_run_even_when_models_interleave():
+    """Models never share random state: stepping another model in between changes nothing"""
+    alone = _run(PoliticalModel(num_agents=60, seed=11), 4)
+
+    first = PoliticalModel(num_agents=60, seed=11)
+    other = PoliticalModel(num_agents=60, seed=12)
+    for _ in range(4):
+        first.step()
+        other.step()
+    interleaved = {field: first.agent_store.column(field) for field in FLOAT_FIELDS}
+
+    for field in FLOAT_FIELDS:
+        np.testing.assert_array_equal(interleaved[field], alone[field], err_msg=field)
+    assert not np.array_equal(other.agent_store.vermoegen, first.agent_store.vermoegen)
+
+
+def test_phase_streams_are_independent():
+    """Extra draws in one phase leave the other phases' sequences untouched"""
+    a, b = RandomStreams(5), RandomStreams(5)
+    b['media'].random(1000)
+    np.testing.assert_array_equal(a['hazards'].random(10), b['hazards'].random(10))
+    assert not np.array_equal(RandomStreams(5)['hazards'].random(10), RandomStreams(5)['investment'].random(10))
+    assert RandomStreams().seed != RandomStreams().seed
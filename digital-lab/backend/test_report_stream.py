@@ -0,0 +1,123 @@
+"""
+Tests for the delta-encoded WebSocket report stream
+"""
+
+import json
+
+import numpy as np
+
+from political_abm.model import PoliticalModel
+from report_stream import ReportStream, STATIC_REPORT_KEYS
+
+
+def _apply(state, frame):
+    """Minimal client: applies a keyframe or delta to the reconstructed state."""
+    if frame["type"] == "keyframe":
+        return json.loads(json.dumps(frame))
+    assert frame["base_step"] == state["step"]
+    state["step"] = frame["step"]
+    state["model_report"].update(frame["model_report"])
+    index = {a["id"]: i for i, a in enumerate(state["agent_visuals"])}
+    for field, change in frame["agents"].items():
+        for agent_id, value in zip(change["ids"], change["values"]):
+            if field == "political_position":
+                value = {"a": value[0], "b": value[1]}
+            state["agent_visuals"][index[agent_id]][field] = value
+    history = frame["history"]
+    for agent in state["agent_visuals"]:
+        agent["position_history"] = (agent["position_history"] + [agent["position"]] * history["append"])[-history["max_length"]:]
+    return state
+
+
+def test_deltas_reconstruct_the_keyframe_state():
+    """Keyframe + deltas on the client equal a fresh keyframe of the same model state"""
+    model = PoliticalModel(num_agents=50)
+    stream = ReportStream()
+
+    frames = stream.publish(model, model.get_model_report())
+    assert [f["type"] for f in frames] == ["config", "keyframe"]
+    assert all(key not in frames[1]["model_report"] for key in STATIC_REPORT_KEYS)
+    state = _apply(None, frames[1])
+
+    for _ in range(3):
+        model.step()
+        frames = stream.publish(model, model.get_model_report())
+        assert [f["type"] for f in frames] == ["delta"]
+        state = _apply(state, json.loads(json.dumps(frames[0])))
+
+    expected = ReportStream().connect_frames(model)[1]
+    assert state["step"] == expected["step"] == 3
+    assert state["agent_visuals"] == json.loads(json.dumps(expected["agent_visuals"]))
+    assert state["model_report"] == json.loads(json.dumps(expected["model_report"]))
+
+
+def test_new_model_and_lagging_client_get_keyframes():
+    """A replaced model restarts the stream; connecting clients get the last broadcast state"""
+    stream = ReportStream()
+    model = PoliticalModel(num_agents=20)
+    stream.publish(model, model.get_model_report())
+    model.step()
+    stream.publish(model, model.get_model_report())
+    existing = stream.keyframe()
+
+    # Steps without a broadcast, then a client connects: the shared baseline stays put
+    model.step()
+    model.step()
+    frames = stream.connect_frames(model)
+    assert [f["type"] for f in frames] == ["config", "keyframe"]
+    assert frames[1]["step"] == existing["step"] == 1
+    assert frames[1]["agent_visuals"] == existing["agent_visuals"]
+
+    model.step()
+    delta = stream.publish(model, model.get_model_report())[-1]
+    assert delta["type"] == "delta" and delta["base_step"] == 1 and delta["step"] == 4
+
+    replacement = PoliticalModel(num_agents=30)
+    frames = stream.connect_frames(replacement)
+    assert frames[-1]["type"] == "keyframe" and frames[-1]["step"] == 0
+    assert len(frames[-1]["agent_visuals"]) == 30
+    frames = stream.publish(replacement, replacement.get_model_report())
+    assert frames[-1]["type"] == "delta" and frames[-1]["base_step"] == 0
+
+
+def _decode_binary(message: bytes):
+    assert message[:4] == b"ABMC"
+    header_length = int.from_bytes(message[4:8], "little")
+    header = json.loads(message[8:8 + header_length])
+    body_start = 8 + header_length
+    assert body_start % 8 == 0
+    dtypes = {"int32": "<i4", "uint16": "<u2", "float32": "<f4"}
+    columns = {
+        c["name"]: np.frombuffer(message, dtype=dtypes[c["dtype"]], count=header["count"], offset=body_start + c["offset"])
+        for c in header["columns"]
+    }
+    return header, columns
+
+
+def test_binary_agent_frames_match_json_keyframe():
+    """Binary connections get agent-free headers plus columns equal to the JSON agent_visuals"""
+    model = PoliticalModel(num_agents=40)
+    model.step()
+    stream = ReportStream()
+    frames = stream.connect_frames(model)
+    keyframe = frames[1]
+
+    assert stream.for_agent_format(frames, "json") is frames
+    adapted = stream.for_agent_format(frames, "binary")
+    assert [type(f) for f in adapted] == [dict, dict, bytes]
+    assert adapted[1]["agent_format"] == "binary" and "agent_visuals" not in adapted[1]
+
+    # The payload was encoded with the frames: later publishes don't change it
+    model.step()
+    stream.publish(model, model.get_model_report())
+    assert stream.for_agent_format(frames, "binary")[2] == adapted[2]
+
+    header, columns = _decode_binary(adapted[2])
+    assert header["step"] == 1 and header["count"] == 40
+    visuals = keyframe["agent_visuals"]
+    np.testing.assert_array_equal(columns["id"], [a["id"] for a in visuals])
+    np.testing.assert_allclose(columns["x"], [a["position"][0] for a in visuals], rtol=1e-6)
+    np.testing.assert_allclose(columns["b"], [a["political_position"]["b"] for a in visuals], rtol=1e-6)
+    np.testing.assert_allclose(columns["vermoegen"], [a["vermoegen"] for a in visuals], rtol=1e-6)
+    milieus = [header["categories"]["milieu"][code] for code in columns["milieu"]]
+    assert milieus == [a["milieu"] for a in visuals]
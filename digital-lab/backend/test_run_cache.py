@@ -0,0 +1,82 @@
+"""
+Tests for the content-addressed experiment run cache
+"""
+
+import os
+
+import experiment_service as experiment_service_module
+from config.experiment_models import CreateExperimentRequest, TreatmentConfig
+from experiment_service import ExperimentService
+from run_cache import RunCache, run_key
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = RunCache(tmp_path, max_bytes=250)
+    entry = {"values": "x" * 80}
+    for i, key in enumerate(("a", "b")):
+        cache.put(key, entry)
+        os.utime(tmp_path / f"{key}.json", (i, i))
+
+    assert cache.get("a") == entry  # refreshes "a", so "b" is now least recently used
+    cache.put("c", entry)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == entry and cache.get("c") == entry
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= 250
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+
+
+def test_run_key_covers_every_input():
+    base = run_key({"num_agents": 30}, 10, 1, {"code_version": "v1"})
+    assert base == run_key({"num_agents": 30}, 10, 1, {"code_version": "v1"})
+    assert len({
+        base,
+        run_key({"num_agents": 31}, 10, 1, {"code_version": "v1"}),
+        run_key({"num_agents": 30}, 11, 1, {"code_version": "v1"}),
+        run_key({"num_agents": 30}, 10, 2, {"code_version": "v1"}),
+        run_key({"num_agents": 30}, 10, 1, {"code_version": "v2"}),
+    }) == 5
+
+
+def test_unseeded_rerun_is_served_from_cache(tmp_path, monkeypatch):
+    """Without an explicit seed, run seeds follow the definition's content, not its ID"""
+    service = ExperimentService(tmp_path, max_workers=1, run_cache=RunCache(tmp_path / "cache", 10**7))
+    request = CreateExperimentRequest(
+        name="Baseline",
+        description="Unseeded rerun",
+        baseline_config={"num_agents": 30},
+        treatments=[TreatmentConfig(name="Baseline", config_modifications={}, num_runs=2)],
+        target_steps=3,
+    )
+    first = service.run_experiment(service.create_experiment(request).id)
+    renamed = request.model_copy(update={"name": "Baseline again"})
+    second = service.run_experiment(service.create_experiment(renamed).id)
+
+    assert [r.seed for r in second.treatments[0].runs] == [r.seed for r in first.treatments[0].runs]
+    assert service.cache_stats()["hits"] == 2
+    longer = request.model_copy(update={"target_steps": 4})
+    third = service.run_experiment(service.create_experiment(longer).id)
+    assert [r.seed for r in third.treatments[0].runs] != [r.seed for r in first.treatments[0].runs]
+
+
+def test_rerun_is_served_from_cache(tmp_path, monkeypatch):
+    service = ExperimentService(tmp_path, max_workers=1, run_cache=RunCache(tmp_path / "cache", 10**7))
+    request = CreateExperimentRequest(
+        name="Baseline",
+        description="Cached rerun",
+        baseline_config={"num_agents": 30},
+        treatments=[TreatmentConfig(name="Baseline", config_modifications={}, num_runs=2)],
+        target_steps=3,
+        seed=21,
+    )
+    first = service.run_experiment(service.create_experiment(request).id)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached run was simulated again")
+
+    monkeypatch.setattr(experiment_service_module, "execute_run", fail)
+    second = service.run_experiment(service.create_experiment(request).id)
+
+    assert [r.model_dump() for r in second.treatments[0].runs] == [r.model_dump() for r in first.treatments[0].runs]
+    assert service.cache_stats()["hits"] == 2 and service.cache_stats()["misses"] == 2
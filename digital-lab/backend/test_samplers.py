@@ -0,0 +1,49 @@
+"""
+Tests for compiled distribution samplers
+"""
+
+import numpy as np
+import pytest
+
+from config.models import DistributionConfig
+from political_abm.samplers import compile_sampler
+from political_abm.model import PoliticalModel
+
+CONFIGS = [
+    DistributionConfig(type='beta', alpha=2.0, beta=5.0),
+    DistributionConfig(type='uniform_int', min=18, max=65),
+    DistributionConfig(type='uniform_float', min=-1.0, max=1.0),
+    DistributionConfig(type='normal', mean=0.5, std_dev=0.4, min=0.0, max=1.0),
+    DistributionConfig(type='lognormal', mean=10.0, std_dev=0.5),
+    DistributionConfig(type='pareto', alpha=2.5),
+]
+
+
+@pytest.mark.parametrize("config", CONFIGS, ids=lambda c: c.type)
+def test_batch_draw_matches_sequential_draws(config):
+    sampler = compile_sampler(config)
+    batch = sampler.sample(np.random.default_rng(3), 200)
+    rng = np.random.default_rng(3)
+    sequential = [sampler.sample_one(rng) for _ in range(200)]
+
+    assert batch.shape == (200,)
+    np.testing.assert_allclose(batch, sequential)
+    if config.type == 'normal':
+        assert batch.min() >= 0.0 and batch.max() <= 1.0
+    if config.type == 'uniform_int':
+        assert isinstance(sequential[0], int) and 18 <= batch.min() and batch.max() <= 65
+
+
+def test_compiled_once_per_parameter_set():
+    a = compile_sampler(DistributionConfig(type='normal', mean=0.3, std_dev=0.1))
+    b = compile_sampler(DistributionConfig(type='normal', mean=0.3, std_dev=0.1))
+    c = compile_sampler(DistributionConfig(type='normal', mean=0.4, std_dev=0.1))
+    assert a is b
+    assert a is not c
+
+
+def test_biome_table_shares_income_samplers():
+    model = PoliticalModel(num_agents=20, seed=6)
+    table = model.biome_table
+    for biome, sampler in zip(table.biomes, table.income_samplers):
+        assert sampler is compile_sampler(biome.einkommen_verteilung)
@@ -0,0 +1,42 @@
+"""
+Tests for the precomputed output Schablonen classification index
+"""
+
+import numpy as np
+
+from backend.config.models import OutputSchabloneConfig
+from political_abm.schablonen_index import SchablonenIndex
+
+
+def _first_match(schablonen, x, y):
+    for i, s in enumerate(schablonen):
+        if s.x_min <= x <= s.x_max and s.y_min <= y <= s.y_max:
+            return i
+    return SchablonenIndex.NO_MATCH
+
+
+def test_index_matches_first_match_scan_including_bounds():
+    """Overlapping rectangles resolve to the first configured one, bounds are inclusive"""
+    schablonen = [
+        OutputSchabloneConfig(name="Centrist", x_min=-0.3, x_max=0.3, y_min=-0.3, y_max=0.3),
+        OutputSchabloneConfig(name="Left-Wing", x_min=-1.0, x_max=-0.3, y_min=-1.0, y_max=1.0),
+        OutputSchabloneConfig(name="Libertarian", x_min=-1.0, x_max=1.0, y_min=0.3, y_max=1.0),
+        OutputSchabloneConfig(name="Corner", x_min=0.5, x_max=0.5, y_min=-0.8, y_max=-0.2),
+    ]
+    index = SchablonenIndex(schablonen)
+
+    rng = np.random.default_rng(0)
+    bounds = np.array([-1.0, -0.8, -0.3, -0.2, 0.3, 0.5, 1.0])
+    positions = np.vstack([
+        rng.uniform(-1.2, 1.2, size=(5000, 2)),
+        rng.choice(bounds, size=(500, 2)),
+        np.column_stack([rng.choice(bounds, 500), rng.uniform(-1, 1, 500)]),
+    ])
+
+    expected = [_first_match(schablonen, x, y) for x, y in positions]
+    np.testing.assert_array_equal(index.classify(positions), expected)
+
+
+def test_empty_config_classifies_nothing():
+    index = SchablonenIndex([])
+    assert index.classify(np.zeros((3, 2))).tolist() == [-1, -1, -1]
@@ -0,0 +1,92 @@
+"""
+Tests for the background SimulationRunner
+"""
+
+import asyncio
+
+from report_stream import ReportStream
+from simulation_manager import SimulationManager
+from simulation_runner import SimulationRunner
+
+
+class RecordingBroadcaster:
+    def __init__(self):
+        self.frames = []
+
+    async def broadcast_report(self, frames, adapt):
+        self.frames.extend(adapt(frames, "json"))
+
+
+def test_runner_steps_off_loop_and_publishes_at_frame_rate():
+    """Steps run in the worker; frames arrive at the UI rate and the last one is the final state"""
+    async def scenario():
+        manager = SimulationManager()
+        manager.reset_model(num_agents=50)
+        broadcaster = RecordingBroadcaster()
+        runner = SimulationRunner(manager, broadcaster, ReportStream(), ui_fps=20)
+
+        runner.start(steps_per_second=200, max_steps=40)
+        await asyncio.sleep(0.05)
+        paused = runner.pause()
+        await asyncio.sleep(0.1)
+        steps_while_paused = manager.model.step_count
+        await asyncio.sleep(0.1)
+        assert manager.model.step_count == steps_while_paused
+        runner.resume()
+
+        for _ in range(200):
+            if runner.state == 'stopped':
+                break
+            await asyncio.sleep(0.05)
+        status = await runner.stop()
+        return manager, broadcaster, paused, status
+
+    manager, broadcaster, paused, status = asyncio.run(scenario())
+    assert paused['state'] == 'paused'
+    assert status['state'] == 'stopped' and status['steps_run'] == 40
+    assert manager.model.step_count == 40
+
+    steps = [f['step'] for f in broadcaster.frames if f['type'] in ('keyframe', 'delta')]
+    assert steps == sorted(steps) and steps[-1] == 40
+    # Frames are decoupled from steps: fewer frames than steps, each recorded in the history
+    assert len(steps) < 40
+    assert manager.history.step_list()[1:] == steps
+
+
+def test_runner_rejects_invalid_transitions():
+    async def scenario():
+        manager = SimulationManager()
+        manager.reset_model(num_agents=10)
+        runner = SimulationRunner(manager, RecordingBroadcaster(), ReportStream(), ui_fps=20)
+        errors = []
+        for action in (runner.pause, runner.resume):
+            try:
+                action()
+            except RuntimeError as e:
+                errors.append(str(e))
+        runner.start(steps_per_second=100)
+        try:
+            runner.start()
+        except RuntimeError as e:
+            errors.append(str(e))
+        await runner.stop()
+        return errors
+
+    assert len(asyncio.run(scenario())) == 3
+
+
+def test_run_steps_samples_history_and_broadcasts():
+    """Only sampled steps build reports; the final step is always stored and broadcast"""
+    manager = SimulationManager()
+    manager.reset_model(num_agents=30)
+    broadcast_steps = []
+
+    final = manager.run_steps(10, history_every=4, broadcast_every=3,
+                              on_broadcast=lambda report: broadcast_steps.append(report['step']))
+
+    assert final['step'] == 10 and manager.model.step_count == 10
+    assert manager.history.step_list() == [0, 4, 8, 10]
+    assert broadcast_steps == [3, 6, 9, 10]
+
+    manager.run_steps(5)
+    assert manager.history.latest_step() == 15 and len(manager.history) == 5
@@ -0,0 +1,51 @@
+"""
+Tests for the CSR social network and its neighbor aggregations
+"""
+
+import numpy as np
+import pytest
+
+from political_abm.model import PoliticalModel
+from political_abm.social_network import SocialNetwork
+
+
+def test_from_edges_symmetric_without_loops_or_duplicates():
+    net = SocialNetwork.from_edges(4, [0, 1, 0, 2, 3], [1, 0, 2, 2, 1])
+    assert net.num_edges == 3
+    assert net.neighbors(0).tolist() == [1, 2]
+    assert net.neighbors(1).tolist() == [0, 3]
+    assert net.degree.tolist() == [2, 2, 1, 1]
+
+
+def test_preferential_attachment_graph():
+    nx = pytest.importorskip("networkx")  # Optional: only used for export and checks
+    net = SocialNetwork.preferential_attachment(3000, 4, np.random.default_rng(5))
+    graph = net.to_networkx()
+
+    assert nx.is_connected(graph)
+    assert net.degree.sum() == 2 * net.num_edges
+    assert np.mean(net.degree) > 7
+    # Heavy tail: early nodes collect far more than m edges
+    assert net.degree.max() > 10 * 4
+    again = SocialNetwork.preferential_attachment(3000, 4, np.random.default_rng(5))
+    np.testing.assert_array_equal(net.indices, again.indices)
+
+
+def test_neighbor_aggregation_matches_graph():
+    pytest.importorskip("networkx")
+    net = SocialNetwork.preferential_attachment(300, 3, np.random.default_rng(2))
+    graph = net.to_networkx()
+    values = np.random.default_rng(0).random((300, 2))
+
+    expected = np.array([values[list(graph.neighbors(i))].mean(axis=0) for i in range(300)])
+    np.testing.assert_allclose(net.neighbor_mean(values), expected)
+    mask = values[:, 0] > 0.5
+    assert net.neighbor_count(mask)[7] == mask[list(graph.neighbors(7))].sum()
+
+
+def test_model_network_over_agent_rows():
+    model = PoliticalModel(num_agents=120, network_connections=3, seed=9)
+    net = model.network
+    assert net.num_nodes == len(model.agent_store)
+    opinion = net.neighbor_mean(model.agent_store.political_positions())
+    assert opinion.shape == (120, 2)
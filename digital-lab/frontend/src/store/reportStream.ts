@@ -0,0 +1,178 @@
+import { AgentVisual, ModelReport, ReportDelta, ReportFrame, ReportKeyframe, SimulationUpdatePayload } from '../types';
+
+type AgentColumn = Int32Array | Uint16Array | Float32Array;
+
+export interface AgentColumns {
+  step: number;
+  count: number;
+  columns: Record<string, AgentColumn>;
+  categories: Record<string, string[]>;
+}
+
+const COLUMN_TYPES: Record<string, any> = { int32: Int32Array, uint16: Uint16Array, float32: Float32Array };
+const CATEGORICAL_FIELDS = ['region', 'schablone', 'initial_milieu', 'milieu'];
+const FLAT_FIELDS = [
+  'alter', 'einkommen', 'vermoegen', 'sozialleistungen', 'ersparnis', 'risikoaversion',
+  'effektive_kognitive_kapazitaet', 'kognitive_kapazitaet_basis', 'politische_wirksamkeit',
+  'sozialkapital', 'konsumquote',
+];
+
+/**
+ * Maps a binary agent frame ("ABMC" | uint32 header length | JSON header | body) onto
+ * typed arrays without copying. Column buffers are little-endian and 8-byte aligned.
+ */
+export const decodeAgentColumns = (buffer: ArrayBuffer): AgentColumns => {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+  if (magic !== 'ABMC') throw new Error(`Unknown binary frame: ${magic}`);
+  const headerLength = view.getUint32(4, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+  const bodyStart = 8 + headerLength;
+
+  const columns: Record<string, AgentColumn> = {};
+  header.columns.forEach((column: { name: string; dtype: string; offset: number }) => {
+    columns[column.name] = new COLUMN_TYPES[column.dtype](buffer, bodyStart + column.offset, header.count);
+  });
+  return { step: header.step, count: header.count, columns, categories: header.categories };
+};
+
+export interface ReportFrameResult {
+  payload: SimulationUpdatePayload | null; // Reconstructed full state, if the frame produced one
+  resync: boolean;                          // True if the client is out of sync and must request a keyframe
+}
+
+/**
+ * Rebuilds full SimulationUpdatePayloads from the backend's keyframe/delta stream.
+ * Only agents touched by a delta get new objects; all others are shared with the
+ * previous payload.
+ */
+export class ReportStreamDecoder {
+  private config: Partial<ModelReport> = {};
+  private configVersion = -1;
+  private current: SimulationUpdatePayload | null = null;
+  private indexById: Record<number, number> = {};
+  // Keyframe/delta header waiting for its binary agent columns
+  private pending: ReportKeyframe | ReportDelta | null = null;
+
+  apply(frame: ReportFrame): ReportFrameResult {
+    if (frame.type === 'config') {
+      this.config = frame.config;
+      this.configVersion = frame.config_version;
+      if (!this.current) return { payload: null, resync: false };
+      this.current = { ...this.current, model_report: { ...this.current.model_report, ...this.config } };
+      return { payload: this.current, resync: false };
+    }
+
+    if (frame.config_version !== this.configVersion) {
+      return { payload: null, resync: true };
+    }
+
+    if (frame.agent_format === 'binary') {
+      if (frame.type === 'delta' && (!this.current || this.current.step !== frame.base_step)) {
+        this.pending = null;
+        return { payload: null, resync: true };
+      }
+      this.pending = frame;
+      return { payload: null, resync: false };
+    }
+
+    if (frame.type === 'keyframe') {
+      const visuals = frame.agent_visuals || [];
+      this.indexById = {};
+      visuals.forEach((agent, i) => { this.indexById[agent.id] = i; });
+      this.current = {
+        step: frame.step,
+        model_report: { ...frame.model_report, ...this.config } as ModelReport,
+        agent_visuals: visuals,
+      };
+      return { payload: this.current, resync: false };
+    }
+
+    // Delta: only valid on top of the step it was computed against
+    if (!this.current || this.current.step !== frame.base_step) {
+      return { payload: null, resync: true };
+    }
+
+    const agents: AgentVisual[] = this.current.agent_visuals.slice();
+    const copied: Record<number, boolean> = {};
+    const editable = (index: number): any => {
+      if (!copied[index]) {
+        agents[index] = { ...agents[index] };
+        copied[index] = true;
+      }
+      return agents[index];
+    };
+
+    const changes = frame.agents || {};
+    Object.keys(changes).forEach(field => {
+      const { ids, values } = changes[field];
+      for (let i = 0; i < ids.length; i++) {
+        const index = this.indexById[ids[i]];
+        if (index === undefined) continue;
+        const value = values[i];
+        editable(index)[field] = field === 'political_position' ? { a: value[0], b: value[1] } : value;
+      }
+    });
+
+    // Every agent records its (updated) position once per simulated step
+    const { append, max_length } = frame.history;
+    if (append > 0) {
+      for (let index = 0; index < agents.length; index++) {
+        const agent = editable(index);
+        const history = (agent.position_history || []).slice();
+        for (let k = 0; k < append; k++) history.push(agent.position);
+        agent.position_history = history.slice(-max_length);
+      }
+    }
+
+    this.current = {
+      step: frame.step,
+      model_report: { ...this.current.model_report, ...frame.model_report } as ModelReport,
+      agent_visuals: agents,
+    };
+    return { payload: this.current, resync: false };
+  }
+
+  /** Completes the pending binary-format keyframe/delta with its agent columns. */
+  applyBinary(buffer: ArrayBuffer): ReportFrameResult {
+    const header = this.pending;
+    this.pending = null;
+    if (!header) return { payload: null, resync: true };
+
+    const { count, columns, categories } = decodeAgentColumns(buffer);
+    const previous = header.type === 'delta' && this.current ? this.current.agent_visuals : [];
+    const append = header.type === 'delta' ? header.history.append : 0;
+    const maxLength = header.type === 'delta' ? header.history.max_length : 0;
+
+    const agents: AgentVisual[] = new Array(count);
+    const indexById: Record<number, number> = {};
+    for (let i = 0; i < count; i++) {
+      const id = columns.id[i];
+      const agent: any = {
+        id,
+        position: [columns.x[i], columns.y[i]],
+        political_position: { a: columns.a[i], b: columns.b[i] },
+      };
+      CATEGORICAL_FIELDS.forEach(field => { agent[field] = categories[field][columns[field][i]]; });
+      FLAT_FIELDS.forEach(field => { agent[field] = columns[field][i]; });
+
+      // Position history is not part of the binary frame; extend the one we have
+      const before = this.indexById[id] !== undefined ? previous[this.indexById[id]] : undefined;
+      const history = before && before.position_history ? before.position_history.slice() : [];
+      for (let k = 0; k < append; k++) history.push(agent.position);
+      agent.position_history = maxLength ? history.slice(-maxLength) : history;
+
+      agents[i] = agent;
+      indexById[id] = i;
+    }
+    this.indexById = indexById;
+
+    const baseReport = header.type === 'delta' && this.current ? this.current.model_report : {};
+    this.current = {
+      step: header.step,
+      model_report: { ...baseReport, ...header.model_report, ...this.config } as ModelReport,
+      agent_visuals: agents,
+    };
+    return { payload: this.current, resync: false };
+  }
+}
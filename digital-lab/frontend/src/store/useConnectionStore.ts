@@ -1,6 +1,7 @@
 import { create } from 'zustand';
 import { apiClient } from '../api/axiosConfig';
-import { SimulationUpdatePayload } from '../types';
+import { ReportFrame, SimulationUpdatePayload } from '../types';
+import { ReportFrameResult, ReportStreamDecoder } from './reportStream';
 
 interface ConnectionState {
   isConnected: boolean;
@@ -21,9 +22,14 @@ export const useConnectionStore = create<ConnectionState>((set, get) => ({
     if (ws) return; // Already connected or connecting
 
     const httpApiUrl = process.env.REACT_APP_API_BASE_URL || 'http://localhost:8000';
-    const wsApiUrl = httpApiUrl.replace(/^http/, 'ws') + '/ws';
+    // Opt-in binary columnar agent frames (JSON stays the default)
+    const agentFormat = process.env.REACT_APP_WS_AGENT_FORMAT === 'binary' ? 'binary' : 'json';
+    const wsApiUrl = httpApiUrl.replace(/^http/, 'ws') + '/ws' + (agentFormat === 'binary' ? '?agent_format=binary' : '');
     
     ws = new WebSocket(wsApiUrl);
+    ws.binaryType = 'arraybuffer';
+    // Keyframe on connect, per-step deltas afterwards
+    const decoder = new ReportStreamDecoder();
 
     ws.onopen = () => {
       set({ isConnected: true });
@@ -42,10 +48,28 @@ export const useConnectionStore = create<ConnectionState>((set, get) => ({
     };
     fetchInitialData();
 
+    const handleResult = ({ payload, resync }: ReportFrameResult) => {
+      if (resync && ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'resync' }));
+      }
+      if (payload && setSimulationData) {
+        setSimulationData(payload);
+      }
+    };
+
     ws.onmessage = (event) => {
       try {
-        const data: SimulationUpdatePayload | { message: string } = JSON.parse(event.data);
-        
+        if (event.data instanceof ArrayBuffer) {
+          handleResult(decoder.applyBinary(event.data));
+          return;
+        }
+        const data: ReportFrame | SimulationUpdatePayload | { message: string } = JSON.parse(event.data);
+
+        if ('type' in data) {
+          handleResult(decoder.apply(data));
+          return;
+        }
+
         // Filter out ping messages and update simulation store
         if ('step' in data) {
           if (setSimulationData) {
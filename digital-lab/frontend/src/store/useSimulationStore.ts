@@ -17,40 +17,35 @@ interface SimulationState {
   addToHistory: (data: SimulationUpdatePayload) => void;
 }
 
-let simulationInterval: NodeJS.Timeout | null = null;
-
 export const useSimulationStore = create<SimulationState>((set, get) => ({
   isRunning: false,
   simulationData: null,
   history: [],
 
-  runSimulation: () => {
+  runSimulation: async () => {
     if (get().isRunning) return;
     set({ isRunning: true });
-    
-    const step = async () => {
-        try {
-            await apiClient.post('/api/simulation/step');
-        } catch (error) {
-            console.error("Simulation step failed:", error);
-            get().stopSimulation(); // Stop on error
-        }
-    };
-    
-    step(); // Run first step immediately
-    simulationInterval = setInterval(step, 500); // Step every 500ms
+    try {
+        // The backend steps continuously and pushes frames over the WebSocket
+        await apiClient.post('/api/simulation/start', {});
+    } catch (error) {
+        console.error("Simulation start failed:", error);
+        set({ isRunning: false });
+    }
   },
 
-  stopSimulation: () => {
-    if (simulationInterval) {
-        clearInterval(simulationInterval);
-        simulationInterval = null;
-    }
+  stopSimulation: async () => {
+    if (!get().isRunning) return;
     set({ isRunning: false });
+    try {
+        await apiClient.post('/api/simulation/stop');
+    } catch (error) {
+        console.error("Simulation stop failed:", error);
+    }
   },
 
   resetSimulation: async () => {
-    get().stopSimulation();
+    await get().stopSimulation();
     set({ history: [], simulationData: null });
     try {
         await apiClient.post('/api/simulation/reset', {
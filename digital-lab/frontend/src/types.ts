@@ -228,3 +228,32 @@ export interface InitialMilieu {
     attribute_distributions: Record<string, DistributionConfig>;
 }
 
+
+// --- Incremental WebSocket report protocol (see backend/report_stream.py) ---
+export interface ReportConfigFrame {
+  type: 'config';
+  config_version: number;
+  config: Partial<ModelReport>; // layout, milieus_config
+}
+
+export interface ReportKeyframe {
+  type: 'keyframe';
+  step: number;
+  config_version: number;
+  model_report: Partial<ModelReport>;
+  agent_visuals?: AgentVisual[]; // Omitted for binary connections
+  agent_format?: 'binary';       // Agent columns follow as a binary message
+}
+
+export interface ReportDelta {
+  type: 'delta';
+  step: number;
+  base_step: number;
+  config_version: number;
+  model_report: Partial<ModelReport>; // only changed top-level keys
+  agents?: Record<string, { ids: number[]; values: any[] }>; // only changed agents per field (JSON connections)
+  history: { append: number; max_length: number };
+  agent_format?: 'binary';
+}
+
+export type ReportFrame = ReportConfigFrame | ReportKeyframe | ReportDelta;
@@ -5,7 +5,8 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 try:
-    from backend.political_abm.model import PoliticalModel, gini
+    from backend.political_abm.model import PoliticalModel
+    from backend.political_abm.inequality import gini
     import numpy as np
     import json
     
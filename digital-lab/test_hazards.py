@@ -6,15 +6,11 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 try:
     from backend.political_abm.model import PoliticalModel
-    import random
     
     print("Testing HazardManager Implementation...")
     
-    # Set seed for reproducible testing
-    random.seed(42)
-    
     # Create model with more agents for better statistical testing
-    model = PoliticalModel(num_agents=100)
+    model = PoliticalModel(num_agents=100, seed=42)  # Seeded for reproducible testing
     print(f"✓ Model created with {len(model.agent_set)} agents")
     
     # Count agents by biome
@@ -42,10 +38,8 @@ try:
     total_events_by_biome = {biome: 0 for biome in biome_counts.keys()}
     
     for step in range(20):
-        # Clear previous events
-        model.hazard_manager.events_this_step.clear()
-        
-        # Run just Phase 3 (Hazards) for isolated testing
+        # Run just Phase 3 (Hazards) for isolated testing; each call replaces
+        # hazard_manager.events, so there is nothing to clear between steps
         model.hazard_manager.trigger_events()
         
         # Count events by biome
@@ -6,15 +6,11 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 try:
     from backend.political_abm.model import PoliticalModel
-    import random
     
     print("Testing Risk-Based Investment Decision Logic...")
     
-    # Set seed for reproducible testing
-    random.seed(42)
-    
     # Create model with fewer agents for detailed testing
-    model = PoliticalModel(num_agents=20)
+    model = PoliticalModel(num_agents=20, seed=42)  # Seeded for reproducible testing
     print(f"✓ Model created with {len(model.agent_set)} agents")
     
     # Create test agents with specific psychological profiles
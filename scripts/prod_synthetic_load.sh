@@ -11,12 +11,12 @@ run_case() {
   # baseline
   curl -fsS -X PUT "$URL/api/pins" -H 'Content-Type: application/json' -H 'X-User-Role: operator' -d '{"pins":{}}'
   curl -fsS -X POST "$URL/api/simulation/reset" -H 'Content-Type: application/json' -d '{"num_agents":'"$agents"',"network_connections":5}' >/dev/null
-  T0=$(date +%s%3N); for i in $(seq 1 "$steps"); do curl -fsS -X POST "$URL/api/simulation/step" >/dev/null; done; T1=$(date +%s%3N)
+  T0=$(date +%s%3N); curl -fsS -X POST "$URL/api/simulation/run?steps=$steps" >/dev/null; T1=$(date +%s%3N)
   # registry
   CURR=$(curl -fsS "$URL/api/pins" | jq -c '.pins')
   curl -fsS -X PUT "$URL/api/pins" -H 'Content-Type: application/json' -H 'X-User-Role: operator' -d '{"pins":'$CURR'}'
   curl -fsS -X POST "$URL/api/simulation/reset" -H 'Content-Type: application/json' -d '{"num_agents":'"$agents"',"network_connections":5}' >/dev/null
-  T2=$(date +%s%3N); for i in $(seq 1 "$steps"); do curl -fsS -X POST "$URL/api/simulation/step" >/dev/null; done; T3=$(date +%s%3N)
+  T2=$(date +%s%3N); curl -fsS -X POST "$URL/api/simulation/run?steps=$steps" >/dev/null; T3=$(date +%s%3N)
   BASE_MS=$((T1-T0)); REG_MS=$((T3-T2)); OVER=$(python - <<PY "$BASE_MS" "$REG_MS"
 import sys
 B=int(sys.argv[1]); R=int(sys.argv[2])